@@ -7,6 +7,248 @@ import pytest
 from src.utils.dashboard import create_dashboard
 
 
+# Interfaces only this machine can reach
+LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+
+def parse_block_presets(value):
+    """
+    Split the --block option into a list of preset names
+    
+    Args:
+        value: Comma-separated preset names or None
+    
+    Returns:
+        List of preset names (empty if nothing should be blocked)
+    """
+    return [p.strip() for p in value.split(",") if p.strip()] if value else []
+
+
+def collect_urls(args):
+    """
+    Collect the URLs to scan for the direct scan engine
+    
+    Args:
+        args: Parsed command line arguments
+    
+    Returns:
+        List of URLs
+    """
+    urls = []
+    
+    if args.url:
+        urls.extend(u.strip() for u in args.url.split(",") if u.strip())
+    
+    if args.urls_file:
+        with open(args.urls_file) as f:
+            urls.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+    
+    if not urls:
+        # Default to the same pages the test suite uses
+        from tests.config import TEST_URLS
+        from tests.sites.test_sites import create_test_pages
+        urls = list(TEST_URLS["public"])
+        urls.extend(f"file://{os.path.abspath(path)}" for path in create_test_pages())
+    
+    return urls
+
+
+def run_static_triage(args):
+    """
+    Check local HTML files without a browser and list the pages that need a full scan
+    
+    The list is written to static_triage.txt in the output directory, one
+    file:// URL per line, so it can be passed back in with --urls-file.
+    
+    Args:
+        args: Parsed command line arguments
+    
+    Returns:
+        Exit code (0)
+    """
+    import time
+    from src.core.static_scanner import scan_files, triage
+    
+    paths = []
+    for url in collect_urls(args):
+        if url.startswith("file://"):
+            paths.append(url[len("file://"):])
+        elif "://" not in url:
+            paths.append(url)
+        else:
+            print(f"Skipping {url}: the static pre-scan only reads local files")
+    
+    started = time.time()
+    results = scan_files(paths, workers=args.workers or None)
+    elapsed = time.time() - started
+    picked = triage(results)
+    
+    for path in picked:
+        result = results[path]
+        print(f"{path}: {result.get('error') or str(result['issue_count']) + ' static issues'}")
+    print(f"Checked {len(paths)} files in {elapsed:.2f}s, {len(picked)} need a browser scan")
+    
+    os.makedirs(args.output, exist_ok=True)
+    triage_file = os.path.join(args.output, "static_triage.txt")
+    with open(triage_file, "w") as f:
+        f.writelines(f"file://{os.path.abspath(path)}\n" for path in picked)
+    print(f"Pages to scan written to {triage_file}")
+    
+    return 0
+
+
+def open_baseline(args):
+    """
+    Open the baseline store named by --baseline
+    
+    Args:
+        args: Parsed command line arguments
+    
+    Returns:
+        BaselineStore, or None without --baseline
+    """
+    if not args.baseline:
+        return None
+    from src.core.baseline_store import BaselineStore
+    return BaselineStore(args.baseline)
+
+
+def finish_baseline(args, baseline, summary):
+    """
+    Gate on violations that aren't in the baseline
+    
+    Args:
+        args: Parsed command line arguments
+        baseline: BaselineStore or None
+        summary: Run summary from write_run_reports()
+    
+    Returns:
+        Exit code (1 if the run has violations that aren't in the baseline)
+    """
+    if baseline is None:
+        return 0
+    
+    try:
+        if summary["New violations"]:
+            print(f"{summary['New violations']} violations on {summary['Pages with new violations']} pages "
+                  f"are not in the baseline (see {os.path.join(args.output, 'new_violations.json')})")
+            return 1
+        print("No violations outside the baseline")
+        return 0
+    finally:
+        baseline.close()
+
+
+def accept_baseline(args):
+    """
+    Accept the results of the last run in the output directory as the new baseline, without scanning
+    
+    Args:
+        args: Parsed command line arguments
+    
+    Returns:
+        Exit code (1 if there are no results to accept)
+    """
+    from src.core.scan_engine import RESULTS_FILE, load_records
+    
+    results_file = os.path.join(args.output, RESULTS_FILE)
+    if not os.path.exists(results_file):
+        print(f"No results to accept in {results_file}, run a scan with --workers or --coordinator-port first")
+        return 1
+    
+    records = load_records(results_file)
+    print(f"Accepting {len(records)} pages from {results_file}")
+    baseline = open_baseline(args)
+    try:
+        baseline.accept(records)
+    finally:
+        baseline.close()
+    return 0
+
+
+def run_direct_scan(args):
+    """
+    Scan URLs with the parallel scan engine instead of pytest
+    
+    Args:
+        args: Parsed command line arguments
+    
+    Returns:
+        Exit code (1 if any page failed to scan or has violations outside the baseline)
+    """
+    from src.core.scan_engine import build_axe_options, run_parallel_scan
+    
+    urls = collect_urls(args)
+    rules = args.rules.split(",") if args.rules else None
+    options = build_axe_options(args.wcag, rules, args.rule_timings)
+    baseline = open_baseline(args)
+    
+    print(f"Scanning {len(urls)} pages with {args.workers} workers...")
+    run = run_parallel_scan(
+        urls,
+        workers=args.workers,
+        browser=args.browser,
+        headless=args.headless,
+        options=options,
+        output_dir=args.output,
+        block=parse_block_presets(args.block),
+        cache_dir=args.cache_dir,
+        cache_max_bytes=args.cache_size * 1024 * 1024,
+        baseline=baseline
+    )
+    
+    for label, value in run["summary"].items():
+        print(f"{label}: {value}")
+    
+    gate = finish_baseline(args, baseline, run["summary"])
+    return 1 if run["summary"]["Pages failed"] else gate
+
+
+def run_coordinator(args):
+    """
+    Serve the URL queue to remote workers and write the reports at the end
+    
+    Args:
+        args: Parsed command line arguments
+    
+    Returns:
+        Exit code (1 if any page failed to scan or has violations outside the baseline)
+    """
+    import time
+    from src.core.coordinator import CoordinatorServer, ScanCoordinator
+    from src.core.scan_engine import RESULTS_FILE, build_axe_options, write_run_reports
+    
+    urls = collect_urls(args)
+    rules = args.rules.split(",") if args.rules else None
+    os.makedirs(args.output, exist_ok=True)
+    
+    coordinator = ScanCoordinator(
+        urls,
+        lease_timeout=args.lease_timeout,
+        options=build_axe_options(args.wcag, rules, args.rule_timings),
+        results_file=os.path.join(args.output, RESULTS_FILE)
+    )
+    server = CoordinatorServer(coordinator, args.coordinator_host, args.coordinator_port, args.coordinator_token)
+    
+    started = time.time()
+    print(f"Coordinator serving {len(urls)} URLs at {server.start()}")
+    try:
+        server.wait_until_done()
+    finally:
+        server.stop()
+    
+    records = coordinator.results()
+    baseline = open_baseline(args)
+    summary = write_run_reports(records, args.output, {
+        "Elapsed": f"{time.time() - started:.1f}s"
+    }, baseline=baseline)
+    for label, value in summary.items():
+        print(f"{label}: {value}")
+    
+    gate = finish_baseline(args, baseline, summary)
+    return 1 if summary["Pages failed"] else gate
+
+
 def main():
     """
     Command line interface for running accessibility tests
@@ -20,7 +262,7 @@ def main():
     # Add arguments
     parser.add_argument(
         "--url", "-u",
-        help="URL to test for accessibility issues",
+        help="URL to test for accessibility issues (comma-separated with --workers)",
         default=None
     )
     
@@ -56,6 +298,110 @@ def main():
         default="reports"
     )
     
+    parser.add_argument(
+        "--driver-path",
+        help="Path to the chromedriver/geckodriver binary (skips driver lookup)",
+        default=None
+    )
+    
+    parser.add_argument(
+        "--pool-size",
+        help="Reuse this many warm browser sessions across tests (0 starts a new browser per test)",
+        type=int,
+        default=0
+    )
+    
+    parser.add_argument(
+        "--workers",
+        help="Scan pages directly in this many parallel worker processes instead of running pytest",
+        type=int,
+        default=0
+    )
+    
+    parser.add_argument(
+        "--urls-file",
+        help="File with one URL per line to scan (used with --workers)",
+        default=None
+    )
+    
+    parser.add_argument(
+        "--coordinator-port",
+        help="Serve the URL queue to remote workers on this port instead of running pytest",
+        type=int,
+        default=None
+    )
+    
+    parser.add_argument(
+        "--coordinator-host",
+        help="Interface the coordinator listens on",
+        default="127.0.0.1"
+    )
+    
+    parser.add_argument(
+        "--coordinator-token",
+        help="Shared token workers must send to the coordinator (default: $A11Y_COORDINATOR_TOKEN); "
+             "required when the coordinator listens on a non-loopback interface",
+        default=os.environ.get("A11Y_COORDINATOR_TOKEN")
+    )
+    
+    parser.add_argument(
+        "--lease-timeout",
+        help="Seconds before a silent worker's URL is handed to another worker",
+        type=int,
+        default=60
+    )
+    
+    parser.add_argument(
+        "--join",
+        help="Run as a worker for the coordinator at this URL (e.g. http://10.0.0.5:8765)",
+        default=None
+    )
+    
+    parser.add_argument(
+        "--block",
+        help="Block resources during scans (Chrome only), comma-separated presets: media, fonts, ads-social, analytics, third-party",
+        default=None
+    )
+    
+    parser.add_argument(
+        "--cache-dir",
+        help="Reuse stored results for pages whose DOM hasn't changed, kept in this directory",
+        default=None
+    )
+    
+    parser.add_argument(
+        "--cache-size",
+        help="Maximum size of the scan cache in MB (least recently used results are evicted)",
+        type=int,
+        default=200
+    )
+    
+    parser.add_argument(
+        "--rule-timings",
+        help="Record how long each axe rule takes and list the slowest rules on the dashboard",
+        action="store_true"
+    )
+    
+    parser.add_argument(
+        "--baseline",
+        help="SQLite baseline of accepted violations; fail only on violations that aren't in it "
+             "(with --workers or --coordinator-port)",
+        default=None
+    )
+    
+    parser.add_argument(
+        "--accept-baseline",
+        help="Store the violations of the last --workers or --coordinator-port run (results.jsonl in --output) "
+             "as the new baseline, without scanning again",
+        action="store_true"
+    )
+    
+    parser.add_argument(
+        "--static",
+        help="Check local HTML files (--url/--urls-file) without a browser and list the ones that need a full scan",
+        action="store_true"
+    )
+    
     parser.add_argument(
         "--dashboard",
         help="Generate dashboard after tests",
@@ -85,6 +431,60 @@ def main():
     if args.output:
         os.environ["TEST_OUTPUT"] = args.output
     
+    if args.driver_path:
+        # The driver resolver picks this up for the selected browser
+        env_name = "GECKODRIVER_PATH" if args.browser == "firefox" else "CHROMEDRIVER_PATH"
+        os.environ[env_name] = args.driver_path
+    
+    if args.block:
+        os.environ["TEST_BLOCK_RESOURCES"] = args.block
+    
+    if args.pool_size:
+        os.environ["TEST_POOL_SIZE"] = str(args.pool_size)
+    
+    if args.cache_dir:
+        os.environ["TEST_SCAN_CACHE"] = args.cache_dir
+        os.environ["TEST_SCAN_CACHE_MB"] = str(args.cache_size)
+    
+    if args.accept_baseline and not args.baseline:
+        parser.error("--accept-baseline needs --baseline")
+    
+    if args.accept_baseline:
+        return accept_baseline(args)
+    
+    # Only the scan engine and the coordinator write the records the baseline gates on
+    if args.baseline and args.workers <= 0 and args.coordinator_port is None:
+        parser.error("--baseline works with --workers or --coordinator-port, not with pytest, --join or --static runs")
+    
+    # Anyone who can reach the coordinator can record results, so it needs a token off this machine
+    if (args.coordinator_port is not None and args.coordinator_host not in LOOPBACK_HOSTS
+            and not args.coordinator_token):
+        parser.error("--coordinator-host other than localhost needs --coordinator-token")
+    
+    # Browser-free triage of local files
+    if args.static:
+        return run_static_triage(args)
+    
+    # Distributed mode: either hand out URLs or scan them for a coordinator
+    if args.coordinator_port is not None:
+        return run_coordinator(args)
+    
+    if args.join:
+        from src.core.coordinator import run_worker
+        scanned = run_worker(
+            args.join, args.browser, args.headless,
+            block=parse_block_presets(args.block),
+            cache_dir=args.cache_dir,
+            cache_max_bytes=args.cache_size * 1024 * 1024,
+            token=args.coordinator_token
+        )
+        print(f"Worker finished after scanning {scanned} pages")
+        return 0
+    
+    # The direct scan engine writes its own reports and dashboard
+    if args.workers > 0:
+        return run_direct_scan(args)
+    
     # Prepare pytest arguments
     pytest_args = ["-v"]
     
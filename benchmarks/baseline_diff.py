@@ -0,0 +1,102 @@
+# Benchmark: "new violations only" diff of a large run against the baseline
+# Compares the SQLite baseline store with diffing one JSON results file per page
+#
+# Usage: python -m benchmarks.baseline_diff [--pages 10000] [--new-share 0.05]
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.result_memory import make_page
+from src.core.baseline_store import BaselineStore
+from src.core.issue_index import fingerprint_node
+from src.core.results import ScanResult
+
+
+def add_new_violation(results, rng):
+    """
+    Give a page one violation node that isn't in the baseline
+    """
+    violation = rng.choice(results["violations"])
+    node = dict(violation["nodes"][0], target=[f"#new-{rng.random()}"])
+    violation["nodes"].append(node)
+
+
+def json_diff(directory, records):
+    """
+    The diff without an index: load each page's accepted results and compare nodes
+
+    Returns:
+        Number of new violation nodes
+    """
+    new = 0
+    for index, record in enumerate(records):
+        with open(os.path.join(directory, f"{index}.json")) as f:
+            accepted = json.load(f)
+        known = [(v["id"], node["target"]) for v in accepted["violations"] for node in v["nodes"]]
+        for violation in record["results"].violations:
+            for node in violation.nodes:
+                if (violation.id, node.to_axe()["target"]) not in known:
+                    new += 1
+    return new
+
+
+def main():
+    """
+    Time the baseline diff for a synthetic run
+    """
+    parser = argparse.ArgumentParser(description="Baseline diff benchmark")
+    parser.add_argument("--pages", type=int, default=10000, help="Pages in the run")
+    parser.add_argument("--new-share", type=float, default=0.05, help="Share of pages with a new violation")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    pages = [json.loads(make_page(index, rng)) for index in range(args.pages)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        # The accepted run, as a baseline and as one JSON file per page
+        records = [{"url": page["url"], "results": ScanResult.from_axe(page), "error": None} for page in pages]
+        with BaselineStore(os.path.join(directory, "baseline.sqlite")) as baseline:
+            started = time.time()
+            baseline.accept(records)
+            accept_time = time.time() - started
+        for index, page in enumerate(pages):
+            with open(os.path.join(directory, f"{index}.json"), "w") as f:
+                json.dump(page, f)
+
+        # The next run: same pages, a few with a new violation
+        changed = rng.sample(range(args.pages), int(args.pages * args.new_share))
+        for index in changed:
+            add_new_violation(pages[index], rng)
+        records = [{"url": page["url"], "results": ScanResult.from_axe(page), "error": None} for page in pages]
+
+        # Fingerprinting is the same work either way, so time it separately
+        started = time.time()
+        for record in records:
+            for violation in record["results"].violations:
+                for node in violation.nodes:
+                    fingerprint_node(violation.id, node)
+        fingerprint_time = time.time() - started
+
+        with BaselineStore(os.path.join(directory, "baseline.sqlite")) as baseline:
+            started = time.time()
+            new = baseline.diff(records)
+            store_time = time.time() - started
+
+        started = time.time()
+        json_new = json_diff(directory, records)
+        json_time = time.time() - started
+
+    new_nodes = sum(len(page_new) for page_new in new.values())
+    print(f"Accepted {args.pages} pages in {accept_time:.2f}s")
+    print(f"SQLite baseline diff: {store_time:.2f}s ({fingerprint_time:.2f}s of it fingerprinting), "
+          f"{new_nodes} new violations on {len(new)} pages")
+    print(f"JSON per-page diff:   {json_time:.2f}s, {json_new} new violations "
+          f"({json_time / max(store_time, 1e-6):.1f}x slower)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# Benchmark: batched contrast engine vs axe's color-contrast rule
+# Times both on the contrast fixture page and on a big copy of it, and checks they agree
+#
+# Usage: python -m benchmarks.contrast_timing [--copies 500] [--repeat 3]
+
+import argparse
+import os
+import tempfile
+import time
+
+from src.core.accessibility_scanner import AccessibilityScanner
+from src.core.contrast_engine import compare_with_axe, run_contrast_check
+from src.core.webdriver_manager import setup_driver, teardown_driver
+from tests.sites.test_sites import CONTRAST_ISSUES_HTML
+
+CONTRAST_ONLY = {"runOnly": {"type": "rule", "values": ["color-contrast"]}}
+
+
+def big_page(copies):
+    """
+    Repeat the body of the contrast fixture to get a page with many text elements
+    """
+    head, rest = CONTRAST_ISSUES_HTML.split("<body>")
+    body, tail = rest.split("</body>")
+    return head + "<body>" + body * copies + "</body>" + tail
+
+
+def time_page(driver, scanner, url, repeat):
+    """
+    Time axe and the contrast engine on one page
+
+    Returns:
+        (best axe seconds, best engine seconds, comparison of the last runs)
+    """
+    driver.get(url)
+    scanner.inject_axe()
+
+    axe_times, engine_times = [], []
+    for _ in range(repeat):
+        start = time.time()
+        axe_results = scanner.run_custom_scan(options=CONTRAST_ONLY)
+        axe_times.append(time.time() - start)
+
+        start = time.time()
+        engine_results = run_contrast_check(driver)
+        engine_times.append(time.time() - start)
+
+    return min(axe_times), min(engine_times), compare_with_axe(driver, engine_results, axe_results)
+
+
+def main():
+    """
+    Compare the contrast engine with axe and print the timings
+    """
+    parser = argparse.ArgumentParser(description="Contrast engine timing benchmark")
+    parser.add_argument("--copies", type=int, default=500, help="Copies of the fixture body on the big page")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per page (the best is kept)")
+    parser.add_argument("--browser", default="chrome", choices=["chrome", "firefox"])
+    args = parser.parse_args()
+
+    driver = setup_driver(args.browser, headless=True)
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            pages = {"contrast_issues.html": CONTRAST_ISSUES_HTML, f"x{args.copies}": big_page(args.copies)}
+            for name, html in pages.items():
+                path = os.path.join(directory, "page.html")
+                with open(path, "w") as f:
+                    f.write(html)
+
+                scanner = AccessibilityScanner(driver)
+                axe_time, engine_time, comparison = time_page(driver, scanner, f"file://{path}", args.repeat)
+                print(f"{name}: axe {axe_time:.2f}s, engine {engine_time:.2f}s "
+                      f"({axe_time / max(engine_time, 1e-6):.1f}x), agreement {comparison['agreement']:.0%}")
+                if comparison["engine_only"] or comparison["axe_only"]:
+                    print(f"  engine only: {comparison['engine_only'][:5]}")
+                    print(f"  axe only:    {comparison['axe_only'][:5]}")
+    finally:
+        teardown_driver(driver)
+
+
+if __name__ == "__main__":
+    main()
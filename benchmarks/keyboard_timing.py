@@ -0,0 +1,52 @@
+# Benchmark: computed tab order vs pressing Tab once per element
+# Times both keyboard navigation modes on a page with many links
+#
+# Usage: python -m benchmarks.keyboard_timing [--links 1500] [--sample 10]
+
+import argparse
+import os
+import tempfile
+import time
+
+from src.core.webdriver_manager import setup_driver, teardown_driver
+from src.pages.accessibility_test_page import AccessibilityTestPage, DEFAULT_TAB_SAMPLE
+
+
+def many_links_page(links):
+    """
+    A page with one positive-tabindex button and a long list of links
+    """
+    items = "".join(f'<li><a href="#item{i}">Item {i}</a></li>' for i in range(links))
+    return (f'<!DOCTYPE html><html lang="en"><head><title>Links</title></head>'
+            f'<body><button tabindex="1">First</button><ul>{items}</ul></body></html>')
+
+
+def main():
+    """
+    Time both keyboard navigation modes and print the results
+    """
+    parser = argparse.ArgumentParser(description="Keyboard navigation timing benchmark")
+    parser.add_argument("--links", type=int, default=1500, help="Links on the page")
+    parser.add_argument("--sample", type=int, default=DEFAULT_TAB_SAMPLE, help="Tab presses in computed mode")
+    parser.add_argument("--browser", default="chrome", choices=["chrome", "firefox"])
+    args = parser.parse_args()
+
+    driver = setup_driver(args.browser, headless=True)
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "many_links.html")
+            with open(path, "w") as f:
+                f.write(many_links_page(args.links))
+
+            page = AccessibilityTestPage(driver)
+            for mode in ("computed", "keys"):
+                page.open(f"file://{path}")
+                start = time.time()
+                results = page.test_keyboard_navigation(mode=mode, sample=args.sample)
+                print(f"{mode}: {results['focusable_elements']} elements in {time.time() - start:.2f}s")
+    finally:
+        teardown_driver(driver)
+
+
+if __name__ == "__main__":
+    main()
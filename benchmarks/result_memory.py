@@ -0,0 +1,144 @@
+# Benchmark: memory held by a run's results as raw axe dicts vs ScanResult
+# Uses synthetic pages shaped like real axe output, no browser needed
+#
+# Usage: python -m benchmarks.result_memory [--pages 5000]
+
+import argparse
+import json
+import random
+import tracemalloc
+
+from src.core.results import ScanResult
+
+
+# A realistic mix of rules found on content pages
+RULES = [
+    ("color-contrast", "serious", ["cat.color", "wcag2aa", "wcag143"]),
+    ("image-alt", "critical", ["cat.text-alternatives", "wcag2a", "wcag111", "section508"]),
+    ("label", "critical", ["cat.forms", "wcag2a", "wcag332", "wcag131", "section508"]),
+    ("link-name", "serious", ["cat.name-role-value", "wcag2a", "wcag412", "wcag244", "section508"]),
+    ("region", "moderate", ["cat.keyboard", "best-practice"]),
+    ("heading-order", "moderate", ["cat.semantics", "best-practice"]),
+    ("duplicate-id", "minor", ["cat.parsing", "wcag2a", "wcag411"]),
+    ("button-name", "critical", ["cat.name-role-value", "wcag2a", "wcag412", "section508"]),
+]
+
+PASSED_RULES = [f"passed-rule-{i}" for i in range(40)]
+
+
+def make_node(rule, impact, index):
+    """
+    Build a node like the ones axe reports, with check details
+    """
+    check = {
+        "id": rule,
+        "impact": impact,
+        "message": f"Element fails the {rule} check",
+        "data": {"fgColor": "#777777", "bgColor": "#ffffff", "contrastRatio": 4.48},
+        "relatedNodes": [],
+    }
+    return {
+        "html": f'<div class="card card--{index}"><a href="/products/{index}">' + "Product text " * 20 + "</a></div>",
+        "target": [f".card--{index} > a"],
+        "impact": impact,
+        "failureSummary": f"Fix any of the following:\n  Element fails the {rule} check",
+        "any": [check],
+        "all": [],
+        "none": [],
+    }
+
+
+def make_rule(rule_id, impact, tags, nodes):
+    """
+    Build an axe rule result
+    """
+    return {
+        "id": rule_id,
+        "impact": impact,
+        "tags": tags,
+        "description": f"Ensures every element passes {rule_id}",
+        "help": f"Elements must pass {rule_id}",
+        "helpUrl": f"https://dequeuniversity.com/rules/axe/3.1/{rule_id}?application=axeAPI",
+        "nodes": nodes,
+    }
+
+
+def make_page(index, rng):
+    """
+    Build the JSON text axe would send back for one page
+    """
+    violations = []
+    for rule_id, impact, tags in rng.sample(RULES, 4):
+        nodes = [make_node(rule_id, impact, n) for n in range(rng.randint(1, 8))]
+        violations.append(make_rule(rule_id, impact, tags, nodes))
+
+    passes = [make_rule(rule_id, None, ["wcag2a"], [make_node(rule_id, None, 0)])
+              for rule_id in PASSED_RULES]
+
+    return json.dumps({
+        "url": f"https://shop.example.com/products/{index}",
+        "timestamp": "2024-01-01T00:00:00.000Z",
+        "testEngine": {"name": "axe-core", "version": "3.1.1"},
+        "violations": violations,
+        "incomplete": [],
+        "passes": passes,
+        "inapplicable": [],
+    })
+
+
+def compact_dict(results):
+    """
+    Shrink raw results the way compact scans do, but keep them as dicts
+    """
+    for key in ("passes", "inapplicable"):
+        for rule in results[key]:
+            rule["nodeCount"] = len(rule["nodes"])
+            rule["nodes"] = []
+    for rule in results["violations"] + results["incomplete"]:
+        for node in rule["nodes"]:
+            node["html"] = node["html"][:300]
+    return results
+
+
+def measure(pages, convert):
+    """
+    Load every page and keep it, like a run aggregating its results
+
+    Args:
+        pages: Number of pages
+        convert: Function applied to each parsed page before it is kept
+
+    Returns:
+        Bytes still allocated once all pages are held
+    """
+    rng = random.Random(42)
+    tracemalloc.start()
+    kept = []
+    for index in range(pages):
+        # Parse every page separately, as results arrive from the browser
+        kept.append(convert(json.loads(make_page(index, rng))))
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current
+
+
+def main():
+    """
+    Compare the memory held by raw results and by the result model
+    """
+    parser = argparse.ArgumentParser(description="Result model memory benchmark")
+    parser.add_argument("--pages", type=int, default=5000, help="Number of pages in the run")
+    args = parser.parse_args()
+
+    raw = measure(args.pages, lambda results: results)
+    compact = measure(args.pages, compact_dict)
+    model = measure(args.pages, ScanResult.from_axe)
+
+    print(f"Raw axe dicts:     {raw / 1e6:.1f} MB for {args.pages} pages")
+    print(f"Compact axe dicts: {compact / 1e6:.1f} MB ({(1 - compact / raw):.0%} less)")
+    print(f"ScanResult:        {model / 1e6:.1f} MB ({(1 - model / raw):.0%} less, "
+          f"{(1 - model / compact):.0%} less than compact dicts)")
+
+
+if __name__ == "__main__":
+    main()
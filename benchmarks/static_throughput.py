@@ -0,0 +1,42 @@
+# Benchmark: documents per second for the browser-free static pre-scanner
+# Copies the fixture pages many times and scans them with a process pool
+#
+# Usage: python -m benchmarks.static_throughput [--copies 2000] [--workers N]
+
+import argparse
+import os
+import tempfile
+import time
+
+from src.core.static_scanner import scan_files
+from tests.sites.test_sites import TEST_PAGES
+
+
+def main():
+    """
+    Time the static pre-scan over copies of the fixture pages
+    """
+    parser = argparse.ArgumentParser(description="Static pre-scan throughput benchmark")
+    parser.add_argument("--copies", type=int, default=2000, help="Copies of each fixture page")
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for name, html in TEST_PAGES.items():
+            for copy in range(args.copies):
+                path = os.path.join(directory, f"{copy}_{name}")
+                with open(path, "w") as f:
+                    f.write(html)
+                paths.append(path)
+
+        for workers in sorted({1, args.workers or os.cpu_count() or 1}):
+            started = time.time()
+            scan_files(paths, workers=workers)
+            elapsed = time.time() - started
+            print(f"{workers} process(es): {len(paths)} documents in {elapsed:.2f}s "
+                  f"({len(paths) / elapsed:.0f} documents/s)")
+
+
+if __name__ == "__main__":
+    main()
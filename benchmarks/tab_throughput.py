@@ -0,0 +1,57 @@
+# Benchmark: pages per browser per minute with tab multiplexing
+# Compares TabScheduler against the one-page-per-session test flow
+#
+# Usage: python -m benchmarks.tab_throughput [--tabs 4] [--repeat 5] [URL ...]
+
+import argparse
+import os
+from urllib.parse import urlsplit, urlunsplit
+
+from src.core.tab_scheduler import compare_throughput
+from tests.sites.test_sites import create_test_pages
+
+
+def repeat_urls(urls, repeat):
+    """
+    Repeat the URL list, giving every copy its own URL
+
+    scan_urls() returns results keyed by URL, so plain copies would overwrite
+    each other. A query string (not a fragment) keeps each copy a full page load.
+
+    Args:
+        urls: URLs to repeat
+        repeat: How many times to repeat the list
+
+    Returns:
+        List of len(urls) * repeat distinct URLs
+    """
+    repeated = []
+    for copy in range(repeat):
+        for url in urls:
+            parts = urlsplit(url)
+            query = f"{parts.query}&repeat={copy}" if parts.query else f"repeat={copy}"
+            repeated.append(urlunsplit(parts._replace(query=query)))
+    return repeated
+
+
+def main():
+    """
+    Run the throughput comparison and print the results
+    """
+    parser = argparse.ArgumentParser(description="Tab multiplexing throughput benchmark")
+    parser.add_argument("urls", nargs="*", help="URLs to scan (defaults to the local test pages)")
+    parser.add_argument("--tabs", type=int, default=4, help="Tabs per browser session")
+    parser.add_argument("--repeat", type=int, default=5, help="How many times to repeat the URL list")
+    parser.add_argument("--browser", default="chrome", choices=["chrome", "firefox"])
+    args = parser.parse_args()
+
+    urls = args.urls or [f"file://{os.path.abspath(path)}" for path in create_test_pages()]
+    urls = repeat_urls(urls, args.repeat)
+
+    comparison = compare_throughput(urls, tabs=args.tabs, browser=args.browser, headless=True)
+    if "speedup" in comparison:
+        print(f"Speedup: {comparison['speedup']}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,276 @@
 # This file is for the main accessibility scanner
 # It uses axe-selenium-python to run accessibility checks
 
+import copy
+import itertools
+import json
+import threading
+import time
+
 from axe_selenium_python import Axe
+from selenium.common.exceptions import TimeoutException
+from src.core.axe_scripts import (
+    CHUNK_REGIONS_SCRIPT,
+    COLLECT_CHANGES_SCRIPT,
+    DOM_FINGERPRINT_SCRIPT,
+    FIND_MAIN_CONTEXT_SCRIPT,
+    FRAME_INVENTORY_SCRIPT,
+    RUN_AXE_SCRIPT,
+    TRACK_CHANGES_SCRIPT,
+)
+from src.core.resource_blocker import annotate_blocked_resources
+from src.core.results import DEFAULT_MAX_HTML_LENGTH, ScanResult, as_axe_results
+from src.core.scan_cache import make_cache_key
+
+
+# axe-core source, read from disk once per process
+_axe_sources = {}
+_axe_lock = threading.Lock()
+
+# Seconds a budgeted scan may take before falling back to a smaller scan
+DEFAULT_SCAN_BUDGET = 60
+
+# Lists of rule results in an axe result set
+RESULT_TYPES = ('violations', 'passes', 'incomplete', 'inapplicable')
+
+# Result types whose nodes are tracked for incremental scans
+TRACKED_RESULT_TYPES = ('violations', 'incomplete')
+
+# Changed subtrees above which an incremental scan falls back to a full scan
+MAX_INCREMENTAL_SUBTREES = 25
+
+# Tabs used at most to scan frames next to the main document
+DEFAULT_FRAME_TABS = 4
+
+# Elements per chunk in chunked scans
+DEFAULT_CHUNK_NODES = 2000
+
+# Rules that look at the document as a whole, run once per chunked scan
+PAGE_LEVEL_RULES = [
+    "document-title", "html-has-lang", "html-lang-valid", "html-xml-lang-mismatch",
+    "landmark-one-main", "page-has-heading-one", "bypass", "region", "skip-link",
+    "duplicate-id", "duplicate-id-active", "duplicate-id-aria", "frame-title-unique",
+    "landmark-no-duplicate-banner", "landmark-no-duplicate-contentinfo",
+    "landmark-banner-is-top-level", "landmark-contentinfo-is-top-level", "landmark-main-is-top-level",
+    "meta-viewport", "meta-viewport-large", "meta-refresh",
+]
+
+# Page-level rules that still apply inside a frame, because IDs and frame
+# titles only need to be unique within one document
+PER_DOCUMENT_RULES = ["duplicate-id", "duplicate-id-active", "duplicate-id-aria", "frame-title-unique"]
+
+# Rules axe never runs inside frames, left out when a frame is scanned in its own tab
+FRAME_EXCLUDED_RULES = [rule for rule in PAGE_LEVEL_RULES if rule not in PER_DOCUMENT_RULES]
+
+# Rules on containers that need all of their children, which a chunk may split up
+CONTAINER_RULES = [
+    "td-headers-attr", "th-has-data-cells", "td-has-header", "layout-table",
+    "table-duplicate-name", "table-fake-caption", "list", "definition-list",
+    "aria-required-children",
+]
+
+# Rules that dominate scan time on large pages, dropped first when over budget
+SLOW_RULES = ["color-contrast", "duplicate-id", "region"]
+
+# Ways axe's runOnly.type can name a list of rules (anything else is tags)
+RULE_SELECTION_TYPES = ('rule', 'rules')
+
+AXE_PRESENT_SCRIPT = "return typeof window.axe === 'object' && typeof window.axe.run === 'function';"
+
+
+def load_axe_source(script_path):
+    """
+    Read the axe-core script, caching it in memory for the whole process
+    
+    Args:
+        script_path: Path to axe.min.js
+    
+    Returns:
+        The axe-core JavaScript source
+    """
+    with _axe_lock:
+        if script_path not in _axe_sources:
+            with open(script_path, encoding="utf8") as f:
+                _axe_sources[script_path] = f.read()
+        return _axe_sources[script_path]
+
+
+def normalize_run_only(run_only):
+    """
+    Bring the forms axe accepts for runOnly into one shape
+    
+    axe takes a list of tags, a single tag, or a dictionary whose type is
+    "rule"/"rules" or "tag"/"tags", with its list in "values" ("value" in
+    older axe versions).
+    
+    Args:
+        run_only: The runOnly option, or None
+    
+    Returns:
+        ("rule" or "tag", list of values), or (None, []) without runOnly
+    """
+    if not run_only:
+        return None, []
+    if isinstance(run_only, str):
+        return 'tag', [run_only]
+    if isinstance(run_only, (list, tuple)):
+        return 'tag', list(run_only)
+    
+    values = run_only.get('values', run_only.get('value', []))
+    if isinstance(values, str):
+        values = [values]
+    return ('rule' if run_only.get('type') in RULE_SELECTION_TYPES else 'tag'), list(values)
+
+
+def without_rules(options, rules):
+    """
+    Copy axe options with some rules left out of the scan
+    
+    Args:
+        options: Dictionary of axe options
+        rules: Rule IDs to leave out
+    
+    Returns:
+        Dictionary of axe options, or None if only those rules were selected
+    """
+    options = copy.deepcopy(options or {})
+    kind, values = normalize_run_only(options.get('runOnly'))
+    
+    if kind == 'rule':
+        # axe ignores "rules" when runOnly lists rules, so take them out of the list
+        values = [rule for rule in values if rule not in rules]
+        if not values:
+            return None
+        options['runOnly'] = {'type': 'rule', 'values': values}
+        return options
+    
+    if kind == 'tag':
+        options['runOnly'] = {'type': 'tag', 'values': values}
+    disabled = dict(options.get('rules', {}))
+    disabled.update({rule: {'enabled': False} for rule in rules})
+    options['rules'] = disabled
+    return options
+
+
+def split_context(context):
+    """
+    Split an axe context into top-document root selectors and exclusions
+    
+    Args:
+        context: CSS selector, or an axe context dictionary with "include"
+            and "exclude" lists
+    
+    Returns:
+        (list of root selectors, list of excluded entries) tuple. Include
+        entries that reach into frames are left out of the roots
+    """
+    if not isinstance(context, dict):
+        return [context], []
+    
+    roots = []
+    for entry in context.get('include', []):
+        if isinstance(entry, str):
+            roots.append(entry)
+        elif len(entry) == 1:
+            roots.append(entry[0])
+    return roots, list(context.get('exclude', []))
 
 
 class AccessibilityScanner:
-    def __init__(self, driver):
+    def __init__(self, driver, compact=False, max_html_length=DEFAULT_MAX_HTML_LENGTH, track_changes=False,
+                 cache=None, rule_timings=False):
         """
         Initialize the accessibility scanner
         
         Args:
             driver: Selenium WebDriver instance
+            compact: Only send violation details back from the browser.
+                Passes and inapplicable rules come back as counts and node
+                HTML is truncated, which keeps big pages from sending
+                megabytes of JSON over the WebDriver connection
+            max_html_length: Characters of node HTML kept in compact mode
+            track_changes: Watch the DOM for changes after each full or
+                custom scan so run_incremental_scan() can rescan only the
+                parts that changed
+            cache: Optional ScanCache. Full, custom and budgeted scans of a page
+                whose DOM, axe version, viewport and options match a stored
+                scan return the stored results without running axe
+            rule_timings: Turn on axe's performanceTimer and add the time
+                spent in each rule to scanStats["ruleTimings"]. The same
+                happens for any scan whose options set performanceTimer
         """
         self.driver = driver
         self.axe = Axe(self.driver)
+        self.compact = compact
+        self.max_html_length = max_html_length
+        self.track_changes = track_changes
+        self.cache = cache
+        self.rule_timings = rule_timings
+        
+        # (context, options, results) of the scan that change tracking started from
+        self._tracked_scan = None
     
-    def inject_axe(self):
+    def inject_axe(self, frames=False):
         """
         Inject the axe-core javascript into the page
+        
+        Args:
+            frames: Also have Chrome load axe into every new document of this
+                window, iframes included, before their own scripts run. Scans
+                need that to reach cross-origin iframes, but axe is then
+                evaluated in every frame (ads too) until reset_driver_state(),
+                so it is off unless asked for
         """
-        # Need to inject axe-core js before we can use it
-        self.axe.inject()
+        if frames:
+            self._register_axe_for_new_documents()
+        
+        # Skip the ~300 KB upload if axe is already on the page
+        if self.is_axe_loaded():
+            return
+        
+        self.driver.execute_script(load_axe_source(self.axe.script_url))
         print("Axe-core successfully injected")
     
+    def is_axe_loaded(self):
+        """
+        Check if axe-core is available on the current page
+        
+        Returns:
+            True if window.axe is ready to use
+        """
+        try:
+            return bool(self.driver.execute_script(AXE_PRESENT_SCRIPT))
+        except Exception:
+            return False
+    
+    def _register_axe_for_new_documents(self):
+        """
+        Have Chrome evaluate axe-core before any page script in new documents
+        
+        The script id is kept in driver.axe_script_ids by window handle, so
+        reset_driver_state() can remove it again.
+        """
+        if not hasattr(self.driver, "execute_cdp_cmd"):
+            return
+        
+        script_ids = getattr(self.driver, "axe_script_ids", None)
+        if script_ids is None:
+            script_ids = self.driver.axe_script_ids = {}
+        handle = self.driver.current_window_handle
+        if handle in script_ids:
+            return
+        
+        try:
+            registered = self.driver.execute_cdp_cmd(
+                "Page.addScriptToEvaluateOnNewDocument",
+                {"source": load_axe_source(self.axe.script_url)}
+            )
+            script_ids[handle] = registered.get("identifier")
+        except Exception as e:
+            # Fall back to injecting on every page
+            print(f"Could not register axe-core for new documents: {e}")
+            script_ids[handle] = None
+    
     def run_full_scan(self):
         """
         Run a full accessibility scan with default options
@@ -33,8 +281,12 @@ class AccessibilityScanner:
         # Make sure axe is injected
         try:
             # Run the accessibility scan
-            results = self.axe.run()
-            return results
+            cache_key, results = self._cache_lookup(None, None)
+            if results is None:
+                results = self._run_axe()
+                self._cache_store(cache_key, results)
+            self._start_change_tracking(None, None, results)
+            return annotate_blocked_resources(self.driver, results)
         except Exception as e:
             print(f"Error running accessibility scan: {e}")
             return None
@@ -50,7 +302,592 @@ class AccessibilityScanner:
         Returns:
             Dictionary with accessibility results
         """
-        # Set default values
+        context, options = self._scan_defaults(context, options)
+        
+        # Run the accessibility scan with custom options
+        try:
+            cache_key, results = self._cache_lookup(context, options)
+            if results is None:
+                results = self._run_axe(context, options)
+                self._cache_store(cache_key, results)
+            self._start_change_tracking(context, options, results)
+            return annotate_blocked_resources(self.driver, results)
+        except Exception as e:
+            print(f"Error running custom accessibility scan: {e}")
+            return None
+    
+    def run_incremental_scan(self, max_subtrees=MAX_INCREMENTAL_SUBTREES):
+        """
+        Rescan only the parts of the page that changed since the last scan
+        
+        Needs track_changes=True. Violations in untouched nodes are carried
+        over from the last scan, violations in removed nodes are dropped and
+        the changed subtrees are scanned again and merged in. Falls back to
+        a full scan if the page was reloaded, <body> itself changed or more
+        than max_subtrees separate subtrees changed.
+        
+        Args:
+            max_subtrees: Changed subtrees above which a full scan is cheaper
+        
+        Returns:
+            Dictionary with accessibility results
+        """
+        if self._tracked_scan is None:
+            print("No tracked scan to update, running a custom scan")
+            return self.run_custom_scan()
+        
+        context, options, previous = self._tracked_scan
+        started = time.time()
+        
+        try:
+            changes = self.driver.execute_script(COLLECT_CHANGES_SCRIPT, context, max_subtrees)
+        except Exception as e:
+            print(f"Error collecting DOM changes: {e}")
+            changes = {}
+        
+        if not changes.get('tracking') or changes.get('full'):
+            # Page was reloaded or too much changed, start over
+            if context is None and options is None:
+                results = self.run_full_scan()
+            else:
+                results = self.run_custom_scan(context, options)
+            if results:
+                results['scanStats']['incremental'] = {'fullRescan': True}
+            return results
+        
+        try:
+            roots = changes['roots']
+            if roots:
+                fresh = self._run_axe({'include': [[selector] for selector in roots]}, options)
+            else:
+                fresh = {key: [] for key in RESULT_TYPES}
+                fresh['scanStats'] = {}
+        except Exception as e:
+            print(f"Error running incremental accessibility scan: {e}")
+            return None
+        
+        results = self._merge_incremental(previous, fresh, changes['nodes'])
+        results['scanStats'] = dict(fresh['scanStats'], elapsed=time.time() - started, incremental={
+            'fullRescan': False,
+            'changedSubtrees': len(roots),
+            'carriedOver': sum(1 for node in changes['nodes'] if node['status'] == 'kept'),
+            'dropped': sum(1 for node in changes['nodes'] if node['status'] == 'gone'),
+        })
+        
+        self._start_change_tracking(context, options, results)
+        return annotate_blocked_resources(self.driver, results)
+    
+    def run_async_scan(self, context=None, options=None, budget=DEFAULT_SCAN_BUDGET, retry_budget=None):
+        """
+        Run a scan with a time budget, falling back to a smaller scan if it runs out
+        
+        If the full scan doesn't finish within the budget it is cancelled
+        and retried without the slowest rules, then on the main landmark
+        only. Results from a fallback attempt are marked with "partial": True
+        and a "partialReason".
+        
+        axe can't be interrupted, so a cancelled scan is stopped by reloading
+        the page. Fallback results therefore come from a freshly loaded copy
+        of the URL: state from scripts or earlier interaction (an opened
+        menu, a single-page app route that isn't in the URL) is gone, and
+        scanStats["reloaded"] is True.
+        
+        Args:
+            context: CSS selector to limit scan scope
+            options: Dictionary of axe options
+            budget: Seconds the first attempt may take
+            retry_budget: Seconds each fallback attempt may take (default: half the budget)
+        
+        Returns:
+            Dictionary with accessibility results, or None if every attempt failed
+        """
+        context, options = self._scan_defaults(context, options)
+        retry_budget = retry_budget or budget / 2
+        started = time.time()
+        timed_out = []
+        
+        cache_key, results = self._cache_lookup(context, options)
+        if results is not None:
+            return annotate_blocked_resources(self.driver, results)
+        
+        attempts = self._fallback_scans(context, options)
+        for attempt in itertools.count():
+            try:
+                # The next fallback is worked out on the reloaded page, which can fail too
+                scan = next(attempts, None)
+                if scan is None:
+                    break
+                attempt_context, attempt_options, reason = scan
+                results = self._run_axe(attempt_context, attempt_options, budget if attempt == 0 else retry_budget)
+            except TimeoutException:
+                print(f"axe scan timed out ({reason or 'full scan'}), cancelling")
+                timed_out.append(reason or "full scan")
+                self._cancel_scan()
+                continue
+            except Exception as e:
+                print(f"Error running budgeted accessibility scan: {e}")
+                return None
+            
+            if reason:
+                results['partial'] = True
+                results['partialReason'] = f"Full scan exceeded {budget}s budget; {reason}"
+            results['scanStats']['elapsed'] = time.time() - started
+            results['scanStats']['attempts'] = attempt + 1
+            results['scanStats']['reloaded'] = attempt > 0
+            self._cache_store(cache_key, results)
+            return annotate_blocked_resources(self.driver, results)
+        
+        print(f"Every scan attempt ran out of time: {', '.join(timed_out)}")
+        return None
+    
+    def run_frame_scan(self, context=None, options=None, max_tabs=DEFAULT_FRAME_TABS, page_timeout=30):
+        """
+        Scan independent iframes in parallel tabs instead of inside the main scan
+        
+        A normal axe run walks into every frame one after another, so one slow
+        widget holds up the whole scan. Here every visible frame with its own
+        URL is loaded in an extra tab and scanned there, while the main
+        document is scanned without those frames. The results are merged into
+        one axe-shaped result; nodes found in a frame get the frame's selector
+        in front of their target, like axe does. Frames that share a URL are
+        only scanned once. Open shadow roots are part of the main document,
+        axe scans them in the main pass.
+        
+        Args:
+            context: CSS selector to limit scan scope
+            options: Dictionary of axe options
+            max_tabs: Number of frame tabs to load at the same time
+            page_timeout: Seconds to wait for a frame to load
+        
+        Returns:
+            Dictionary with accessibility results and a "frames" list with
+            the selector, URL, load and scan time of every frame scanned apart
+        """
+        from src.core.tab_scheduler import TabScheduler
+        
+        context, options = self._scan_defaults(context, options)
+        started = time.time()
+        
+        try:
+            inventory = self.driver.execute_script(FRAME_INVENTORY_SCRIPT, context)
+        except Exception as e:
+            print(f"Could not list frames, running a custom scan: {e}")
+            return self.run_custom_scan(context, options)
+        
+        frames = [frame for frame in inventory['frames'] if frame['independent']]
+        if not frames:
+            results = self.run_custom_scan(context, options)
+            if results:
+                results['frames'] = []
+                results['scanStats']['shadowRoots'] = len(inventory['shadowHosts'])
+            return results
+        
+        # Frames that are scanned in their own tab are left out of the main scan
+        exclude = [[frame['selector']] for frame in frames]
+        if isinstance(context, dict):
+            main_context = dict(context, exclude=list(context.get('exclude', [])) + exclude)
+        else:
+            main_context = {'include': [[context]], 'exclude': exclude}
+        
+        main = {}
+        
+        def scan_main_document():
+            # Runs while the frame tabs are loading
+            main['results'] = self.run_custom_scan(main_context, options)
+        
+        frame_options = self._frame_scan_options(options)
+        page_timings = {}
+        if frame_options is None:
+            # Only page-level rules were asked for, and they don't apply inside frames
+            scan_main_document()
+            frame_results = {}
+        else:
+            # Layout-dependent rules (contrast, target size) need the frame's own viewport
+            viewports = {}
+            for frame in frames:
+                viewports.setdefault(frame['src'], tuple(frame.get('size') or ()))
+            scheduler = TabScheduler(self.driver, tabs=min(max_tabs, len(frames)), page_timeout=page_timeout,
+                                     new_tabs=True, compact=self.compact, viewports=viewports)
+            frame_results = dict(scheduler.iter_scan(list(viewports), options=frame_options,
+                                                     while_loading=scan_main_document))
+            page_timings = scheduler.page_timings
+        
+        results = main.get('results')
+        if not results:
+            return None
+        
+        results['frames'] = []
+        for frame in frames:
+            timings = page_timings.get(frame['src'], {})
+            scanned = frame_results.get(frame['src'])
+            results['frames'].append({
+                'selector': frame['selector'],
+                'url': frame['src'],
+                'load': timings.get('load', 0.0),
+                'scan': timings.get('scan', 0.0),
+                'violations': len(scanned['violations']) if scanned else None,
+            })
+            if scanned:
+                self._merge_frame_results(results, scanned, frame['selector'])
+            elif frame_options is not None:
+                print(f"Frame {frame['selector']} ({frame['src']}) could not be scanned")
+        
+        results['scanStats']['elapsed'] = time.time() - started
+        results['scanStats']['shadowRoots'] = len(inventory['shadowHosts'])
+        return results
+    
+    def iter_chunked_scan(self, context=None, options=None, max_nodes=DEFAULT_CHUNK_NODES):
+        """
+        Scan a very large page one chunk at a time, yielding results as they come
+        
+        The scan context is split into chunks of at most max_nodes elements
+        along landmarks and top-level regions, and axe runs on one chunk at
+        a time, so neither the browser nor Python holds the results for the
+        whole page at once. Page-level rules (document title, landmarks,
+        duplicate IDs...) and rules on tables and lists, which need the whole
+        container, run once in a separate pass that is yielded first.
+        Results are always compact.
+        
+        Args:
+            context: CSS selector to limit scan scope
+            options: Dictionary of axe options
+            max_nodes: Elements per chunk
+        
+        Yields:
+            Axe-shaped results for each chunk, with a "chunk" entry holding
+            its index, the number of chunks, its selectors and node count
+        """
+        context, options = self._scan_defaults(context, options)
+        selected = self._selected_rules(options)
+        whole_page = [rule for rule in selected if rule in PAGE_LEVEL_RULES or rule in CONTAINER_RULES]
+        per_chunk = [rule for rule in selected if rule not in whole_page]
+        
+        roots, exclude = split_context(context)
+        layout = self.driver.execute_script(CHUNK_REGIONS_SCRIPT, roots, max_nodes)
+        chunks = layout['chunks'] if per_chunk else []
+        count = len(chunks) + (1 if whole_page else 0)
+        print(f"Scanning {layout['total']} elements in {count} chunks")
+        
+        index = 0
+        if whole_page:
+            yield self._scan_chunk(context, options, whole_page, {
+                'index': index, 'of': count, 'selectors': roots, 'nodes': layout['total'], 'pageLevel': True,
+            })
+            index += 1
+        
+        for chunk in chunks:
+            include = {'include': [[selector] for selector in chunk['selectors']]}
+            if exclude:
+                include['exclude'] = exclude
+            yield self._scan_chunk(include, options, per_chunk, {
+                'index': index, 'of': count, 'selectors': chunk['selectors'], 'nodes': chunk['nodes'],
+                'pageLevel': False,
+            })
+            index += 1
+    
+    def get_available_rules(self, tags=None):
+        """
+        Get the IDs of all rules the injected axe-core knows about
+        
+        Args:
+            tags: Only return rules with at least one of these tags
+        
+        Returns:
+            Set of rule IDs
+        """
+        return set(self.driver.execute_script(
+            "return axe.getRules(arguments[0] || undefined).map(function (r) { return r.ruleId; });", tags
+        ))
+    
+    def run_rule_batch(self, rules, context=None):
+        """
+        Run several rules in one axe pass and split the results per rule
+        
+        Args:
+            rules: List of rule IDs
+            context: CSS selector to limit scan scope
+        
+        Returns:
+            Dictionary of rule ID to axe-shaped results for just that rule
+            (None for rules axe doesn't know or if the scan failed)
+        """
+        # One unknown rule would make axe reject the whole batch
+        known = self.get_available_rules()
+        batch = [rule for rule in dict.fromkeys(rules) if rule in known]
+        for rule in rules:
+            if rule not in known:
+                print(f"Unknown axe rule: {rule}")
+        
+        results = None
+        if batch:
+            options = {'runOnly': {'type': 'rule', 'values': batch}}
+            results = self.run_custom_scan(context=context, options=options)
+        
+        if results is None:
+            return {rule: None for rule in rules}
+        
+        per_rule = self.split_results_by_rule(results, batch)
+        return {rule: per_rule.get(rule) for rule in rules}
+    
+    @staticmethod
+    def split_results_by_rule(results, rules):
+        """
+        Split axe results into one result set per rule
+        
+        Args:
+            results: Results from axe scan
+            rules: Rule IDs to split out
+        
+        Returns:
+            Dictionary of rule ID to results containing only that rule
+        """
+        # Everything that isn't a rule list (url, timestamp, scanStats...) is shared
+        shared = {key: value for key, value in results.items() if key not in RESULT_TYPES}
+        per_rule = {rule: dict(shared, **{key: [] for key in RESULT_TYPES}) for rule in rules}
+        
+        for key in RESULT_TYPES:
+            for item in results.get(key, []):
+                if item.get('id') in per_rule:
+                    per_rule[item['id']][key].append(item)
+        
+        return per_rule
+    
+    def _cache_lookup(self, context, options):
+        """
+        Fingerprint the page and look for stored results
+        
+        Args:
+            context: Scan context
+            options: Dictionary of axe options
+        
+        Returns:
+            (cache key, results) tuple, both None without a cache and
+            results None on a miss
+        """
+        if self.cache is None:
+            return None, None
+        
+        started = time.time()
+        try:
+            fingerprint = self.driver.execute_script(DOM_FINGERPRINT_SCRIPT)
+        except Exception as e:
+            print(f"Could not fingerprint page for the scan cache: {e}")
+            return None, None
+        
+        # Compact settings change what the results contain
+        post = {'compact': self.compact, 'maxHtml': self.max_html_length if self.compact else None}
+        # So does blocking fonts, media or ads (see PRESET_AFFECTED_RULES)
+        blocker = getattr(self.driver, 'resource_blocker', None)
+        if blocker is not None:
+            post['blocking'] = {'presets': sorted(blocker.presets), 'patterns': sorted(blocker.patterns)}
+        key = make_cache_key(fingerprint, context, options, post)
+        results = self.cache.get(key)
+        
+        if results is not None:
+            # The same DOM can be served from more than one URL
+            results['url'] = self.driver.current_url
+            results['scanStats'] = {
+                'elapsed': time.time() - started,
+                'compact': self.compact,
+                'cached': True,
+            }
+        return key, results
+    
+    def _cache_store(self, key, results):
+        """
+        Store fresh results in the cache (if enabled)
+        
+        Args:
+            key: Cache key from _cache_lookup()
+            results: Results of the scan
+        """
+        if key is None or not results:
+            return
+        
+        results['scanStats']['cached'] = False
+        if results.get('partial'):
+            # Partial results would hide violations on every later hit
+            return
+        self.cache.put(key, {k: v for k, v in results.items() if k != 'scanStats'})
+    
+    def _start_change_tracking(self, context, options, results):
+        """
+        Start watching the DOM for changes after a scan (if enabled)
+        
+        Args:
+            context: Context the scan ran with
+            options: Options the scan ran with
+            results: Results of the scan
+        """
+        if not self.track_changes or not results:
+            return
+        
+        # Same order as _merge_incremental walks the nodes
+        targets = [
+            node.get('target', [])
+            for key in TRACKED_RESULT_TYPES
+            for rule in results.get(key, [])
+            for node in rule.get('nodes', [])
+        ]
+        self.driver.execute_script(TRACK_CHANGES_SCRIPT, targets)
+        self._tracked_scan = (context, options, results)
+    
+    def _merge_incremental(self, previous, fresh, node_changes):
+        """
+        Merge a scan of the changed subtrees into the previous results
+        
+        Args:
+            previous: Results of the tracked scan
+            fresh: Results of scanning only the changed subtrees
+            node_changes: Status of every tracked node from COLLECT_CHANGES_SCRIPT
+        
+        Returns:
+            Merged axe-shaped results
+        """
+        merged = {key: value for key, value in previous.items() if key not in RESULT_TYPES}
+        for key in ('url', 'timestamp'):
+            if key in fresh:
+                merged[key] = fresh[key]
+        
+        changes = iter(node_changes)
+        for key in TRACKED_RESULT_TYPES:
+            rules = {}
+            for rule in previous.get(key, []):
+                kept = []
+                for node in rule.get('nodes', []):
+                    change = next(changes, {'status': 'kept'})
+                    if change['status'] != 'kept':
+                        continue
+                    if change.get('selector'):
+                        node = dict(node, target=[change['selector']])
+                    kept.append(node)
+                rules[rule['id']] = dict(rule, nodes=kept)
+            
+            for rule in fresh.get(key, []):
+                if rule['id'] in rules:
+                    rules[rule['id']]['nodes'] = rules[rule['id']]['nodes'] + rule['nodes']
+                else:
+                    rules[rule['id']] = dict(rule)
+            
+            merged[key] = []
+            for rule in rules.values():
+                if 'nodeCount' in rule:
+                    rule['nodeCount'] = len(rule['nodes'])
+                if rule['nodes']:
+                    merged[key].append(rule)
+        
+        # Passes aren't tracked per node, keep every rule that passed anywhere
+        passes = {rule['id']: rule for rule in previous.get('passes', [])}
+        passes.update({rule['id']: rule for rule in fresh.get('passes', [])})
+        merged['passes'] = list(passes.values())
+        
+        applicable = {rule['id'] for key in ('violations', 'passes', 'incomplete') for rule in merged[key]}
+        inapplicable = {rule['id']: rule for rule in previous.get('inapplicable', []) + fresh.get('inapplicable', [])}
+        merged['inapplicable'] = [rule for rule_id, rule in inapplicable.items() if rule_id not in applicable]
+        
+        return merged
+    
+    def _frame_scan_options(self, options):
+        """
+        Axe options for scanning a frame document on its own, without the page-level rules
+        
+        Args:
+            options: Dictionary of axe options for the page
+        
+        Returns:
+            Dictionary of axe options, or None if only page-level rules were asked for
+        """
+        return without_rules(options, FRAME_EXCLUDED_RULES)
+    
+    def _merge_frame_results(self, results, frame_results, frame_selector):
+        """
+        Merge the results of a frame scanned in its own tab into the page results
+        
+        Page-level rules are skipped: the frame was scanned as a top-level
+        document, but axe never runs them inside frames.
+        
+        Args:
+            results: Page results (updated in place)
+            frame_results: Results of scanning the frame's URL
+            frame_selector: Selector of the iframe in the page
+        """
+        for key in RESULT_TYPES:
+            rules = {rule['id']: rule for rule in results.get(key, [])}
+            for rule in frame_results.get(key, []):
+                if rule['id'] in FRAME_EXCLUDED_RULES:
+                    continue
+                nodes = [dict(node, target=[frame_selector] + list(node.get('target', [])))
+                         for node in rule.get('nodes', [])]
+                if rule['id'] not in rules:
+                    rules[rule['id']] = dict(rule, nodes=nodes)
+                    continue
+                merged = rules[rule['id']]
+                merged['nodes'] = merged['nodes'] + nodes
+                if 'nodeCount' in merged:
+                    merged['nodeCount'] += rule.get('nodeCount', len(rule.get('nodes', [])))
+            results[key] = list(rules.values())
+        
+        # A rule that applies somewhere isn't inapplicable for the whole page
+        applicable = {rule['id'] for key in ('violations', 'passes', 'incomplete') for rule in results[key]}
+        results['inapplicable'] = [rule for rule in results['inapplicable'] if rule['id'] not in applicable]
+    
+    def _selected_rules(self, options):
+        """
+        Work out which rules a set of axe options runs
+        
+        Args:
+            options: Dictionary of axe options
+        
+        Returns:
+            List of rule IDs
+        """
+        kind, values = normalize_run_only(options.get('runOnly'))
+        if kind == 'rule':
+            selected = values
+        else:
+            selected = sorted(self.get_available_rules(values or None))
+        
+        disabled = {rule for rule, config in options.get('rules', {}).items() if not config.get('enabled', True)}
+        return [rule for rule in selected if rule not in disabled]
+    
+    def _scan_chunk(self, context, options, rules, chunk):
+        """
+        Run one pass of a chunked scan
+        
+        Args:
+            context: Context of the chunk
+            options: Original axe options (the rule selection is replaced)
+            rules: Rule IDs to run
+            chunk: Description of the chunk, added to the results
+        
+        Returns:
+            Compact axe-shaped results (empty with an error if the pass failed)
+        """
+        chunk_options = {key: value for key, value in options.items() if key not in ('runOnly', 'rules')}
+        chunk_options['runOnly'] = {'type': 'rule', 'values': rules}
+        
+        try:
+            results = self._run_axe(context, chunk_options, compact=True)
+        except Exception as e:
+            print(f"Error scanning chunk {chunk['index'] + 1}/{chunk['of']}: {e}")
+            results = {key: [] for key in RESULT_TYPES}
+            results['scanStats'] = {}
+            chunk['error'] = str(e)
+        
+        results['chunk'] = chunk
+        return annotate_blocked_resources(self.driver, results)
+    
+    def _scan_defaults(self, context, options):
+        """
+        Fill in the default context and options for custom scans
+        
+        Args:
+            context: CSS selector or None
+            options: Dictionary of axe options or None
+        
+        Returns:
+            (context, options) tuple
+        """
         if context is None:
             # Use the document body instead of 'document'
             context = "body"
@@ -63,20 +900,134 @@ class AccessibilityScanner:
                 }
             }
         
-        # Run the accessibility scan with custom options
+        return context, options
+    
+    def _fallback_scans(self, context, options):
+        """
+        Yield progressively cheaper scans to try when the budget runs out
+        
+        Args:
+            context: Original scan context
+            options: Original axe options
+        
+        Yields:
+            (context, options, reason) tuples, reason is None for the full scan
+        """
+        yield context, options, None
+        
+        # Drop the rules that are known to be slow on big pages
+        reduced = without_rules(options, SLOW_RULES)
+        if reduced is None:
+            return
+        yield context, reduced, f"skipped slow rules: {', '.join(SLOW_RULES)}"
+        
+        # Finally only look at the main content
+        main = self.driver.execute_script(FIND_MAIN_CONTEXT_SCRIPT)
+        if main and main != context:
+            yield main, reduced, f"skipped slow rules and scanned {main} only"
+    
+    def _run_axe(self, context=None, options=None, timeout=None, compact=None):
+        """
+        Run axe on the current page and time it
+        
+        Args:
+            context: CSS selector to limit scan scope (None for the whole document)
+            options: Dictionary of axe options
+            timeout: Seconds to wait for the scan (None keeps the driver's script timeout)
+            compact: Override the scanner's compact setting for this run
+        
+        Returns:
+            Dictionary with accessibility results including scanStats
+        """
+        started = time.time()
+        previous_timeout = None
+        post = {}
+        compact = self.compact if compact is None else compact
+        
+        if self.rule_timings:
+            options = dict(options or {}, performanceTimer=True)
+        
+        if compact:
+            # Let axe skip collecting node details for anything but violations
+            options = dict(options or {})
+            options.setdefault('resultTypes', ['violations', 'incomplete'])
+            post = {'compact': True, 'maxHtml': self.max_html_length}
+        
+        if timeout is not None:
+            previous_timeout = self.driver.timeouts.script
+            self.driver.set_script_timeout(timeout)
+        
         try:
-            results = self.axe.run(context=context, options=options)
-            return results
+            payload = self.driver.execute_async_script(RUN_AXE_SCRIPT, context, options, post)
+        finally:
+            if previous_timeout is not None:
+                self.driver.set_script_timeout(previous_timeout)
+        
+        # The browser sends a JSON string so we can see what the transfer costs
+        parse_started = time.time()
+        response = json.loads(payload)
+        deserialize_time = time.time() - parse_started
+        
+        if response.get('error'):
+            raise RuntimeError(response['error'])
+        
+        results = response['results']
+        results['scanStats'] = {
+            'elapsed': time.time() - started,
+            'axeTime': response.get('axeTime', 0) / 1000,
+            # Characters, which is close enough to bytes for mostly-ASCII JSON
+            'transferBytes': len(payload),
+            'deserializeTime': deserialize_time,
+            'compact': compact,
+        }
+        if response.get('ruleTimings') is not None:
+            results['scanStats']['ruleTimings'] = {
+                rule: duration / 1000 for rule, duration in response['ruleTimings'].items()
+            }
+        return results
+    
+    def _cancel_scan(self):
+        """
+        Stop a scan that ran out of time by reloading the page
+        
+        axe is still busy on the page's main thread, so no script is sent
+        first: it would wait for axe until the script timeout. On Chrome the
+        running JavaScript is terminated through DevTools, which doesn't need
+        the main thread, so the reload can start straight away.
+        """
+        try:
+            if hasattr(self.driver, "execute_cdp_cmd"):
+                self.driver.execute_cdp_cmd("Runtime.terminateExecution", {})
+            self.driver.refresh()
+            self.inject_axe()
         except Exception as e:
-            print(f"Error running custom accessibility scan: {e}")
-            return None
+            print(f"Error cancelling accessibility scan: {e}")
     
-    def get_violations(self, results):
+    def get_rule_timings(self, results):
+        """
+        Get the time axe spent in each rule, slowest first
+        
+        Args:
+            results: Results from a scan with rule timings turned on
+                (raw dictionary or ScanResult)
+        
+        Returns:
+            List of (rule ID, seconds) tuples (empty if timings weren't recorded)
+        """
+        if isinstance(results, ScanResult):
+            stats = results.stats
+        else:
+            stats = (results or {}).get('scanStats') or {}
+        timings = stats.get('ruleTimings') or {}
+        return sorted(timings.items(), key=lambda item: item[1], reverse=True)
+    
+    @staticmethod
+    def get_violations(results):
         """
         Extract violations from results
         
         Args:
-            results: Results from axe scan
+            results: Results from axe scan (raw dictionary or ScanResult)
         
         Returns:
             List of violations
@@ -84,7 +1035,7 @@ class AccessibilityScanner:
         if not results:
             return []
         
-        return results.get('violations', [])
+        return as_axe_results(results).get('violations', [])
     
     def get_violation_count(self, results):
         """
@@ -99,14 +1050,15 @@ class AccessibilityScanner:
         violations = self.get_violations(results)
         return len(violations)
     
-    def print_violation_summary(self, results):
+    @staticmethod
+    def print_violation_summary(results):
         """
         Print a summary of violations
         
         Args:
             results: Results from axe scan
         """
-        violations = self.get_violations(results)
+        violations = AccessibilityScanner.get_violations(results)
         
         if not violations:
             print("No accessibility violations found!")
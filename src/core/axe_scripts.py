@@ -0,0 +1,531 @@
+# JavaScript snippets sent to the browser by the accessibility scanner
+# Kept in one place so the Python code stays readable
+
+# Runs axe asynchronously. A token lets an older run be ignored if it
+# finishes after a newer one has started. The results are sent back
+# as a JSON string so the scanner can measure the transfer size, and with
+# post.compact they are shrunk in the browser first: passes and inapplicable
+# rules become counts and node HTML is truncated. With options.performanceTimer
+# the time axe measured for each rule is sent back too, and its marks are
+# cleared so they don't pile up in the page's performance buffer.
+# arguments: context, options, post ({compact, maxHtml}), callback
+RUN_AXE_SCRIPT = """
+var context = arguments[0] || document;
+var options = arguments[1] || {};
+var post = arguments[2] || {};
+var done = arguments[arguments.length - 1];
+var token = String(Math.random());
+window.__a11yScanToken = token;
+var started = performance.now();
+
+function truncate(html) {
+    if (!post.maxHtml || !html || html.length <= post.maxHtml) { return html; }
+    return html.slice(0, post.maxHtml) + '...';
+}
+
+function compactChecks(checks) {
+    return (checks || []).map(function (check) {
+        return {id: check.id, impact: check.impact, message: check.message, data: check.data};
+    });
+}
+
+function compactRule(rule, keepNodes) {
+    var compacted = {
+        id: rule.id, impact: rule.impact, tags: rule.tags, description: rule.description,
+        help: rule.help, helpUrl: rule.helpUrl, nodeCount: rule.nodes.length, nodes: []
+    };
+    if (keepNodes) {
+        compacted.nodes = rule.nodes.map(function (node) {
+            return {
+                html: truncate(node.html), target: node.target, impact: node.impact,
+                failureSummary: node.failureSummary,
+                any: compactChecks(node.any), all: compactChecks(node.all), none: compactChecks(node.none)
+            };
+        });
+    }
+    return compacted;
+}
+
+function ruleTimings() {
+    var timings = {};
+    performance.getEntriesByType('measure').forEach(function (entry) {
+        if (entry.startTime < started) { return; }
+        var match = /^(rule|runchecks)_(.*)$/.exec(entry.name);
+        if (!match) { return; }
+        if (match[1] === 'rule') { timings[match[2]] = (timings[match[2]] || 0) + entry.duration; }
+        performance.clearMeasures(entry.name);
+        performance.clearMarks('mark_' + match[1] + '_start_' + match[2]);
+        performance.clearMarks('mark_' + match[1] + '_end_' + match[2]);
+    });
+    return timings;
+}
+
+function compactResults(results) {
+    ['violations', 'incomplete'].forEach(function (key) {
+        results[key] = results[key].map(function (r) { return compactRule(r, true); });
+    });
+    ['passes', 'inapplicable'].forEach(function (key) {
+        results[key] = results[key].map(function (r) { return compactRule(r, false); });
+    });
+    return results;
+}
+
+axe.run(context, options).then(function (results) {
+    if (window.__a11yScanToken !== token) { return; }
+    var axeTime = performance.now() - started;
+    var timings = options.performanceTimer ? ruleTimings() : null;
+    if (post.compact) { results = compactResults(results); }
+    done(JSON.stringify({results: results, axeTime: axeTime, ruleTimings: timings}));
+}).catch(function (err) {
+    done(JSON.stringify({error: String((err && err.message) || err)}));
+});
+"""
+
+# Finds a narrower context to fall back to when a full scan is too slow
+FIND_MAIN_CONTEXT_SCRIPT = """
+var main = document.querySelector('main, [role="main"]');
+if (!main) { return null; }
+return main.id ? '#' + CSS.escape(main.id) : (main.tagName.toLowerCase() === 'main' ? 'main' : '[role="main"]');
+"""
+
+# Builds a CSS selector that finds an element again from the document.
+# Prepended to scripts that need to send element locations back to Python.
+CSS_PATH_FUNCTION = """
+function a11yCssPath(el) {
+    var parts = [];
+    while (el && el.nodeType === 1) {
+        if (el.id && document.getElementById(el.id) === el) {
+            parts.unshift('#' + CSS.escape(el.id));
+            return parts.join(' > ');
+        }
+        var parent = el.parentElement;
+        if (!parent) {
+            parts.unshift(el.tagName.toLowerCase());
+            break;
+        }
+        var index = Array.prototype.indexOf.call(parent.children, el) + 1;
+        parts.unshift(el.tagName.toLowerCase() + ':nth-child(' + index + ')');
+        el = parent;
+    }
+    return parts.join(' > ');
+}
+"""
+
+# Starts recording which parts of the DOM change after a scan. The nodes
+# reported in the scan are looked up now, while their selectors are still
+# valid, so later changes can be matched against them.
+# arguments: list of axe node targets to track
+TRACK_CHANGES_SCRIPT = """
+var targets = arguments[0] || [];
+
+if (window.__a11yObserver) { window.__a11yObserver.disconnect(); }
+window.__a11yChanged = new Set();
+window.__a11yTrackedSelectors = targets.map(function (target) {
+    return target.length === 1 && typeof target[0] === 'string' ? target[0] : null;
+});
+window.__a11yTracked = targets.map(function (target) {
+    // Targets inside iframes or shadow DOM can't be looked up from here
+    if (target.length !== 1 || typeof target[0] !== 'string') { return null; }
+    try { return document.querySelector(target[0]); } catch (e) { return null; }
+});
+
+window.__a11yObserver = new MutationObserver(function (mutations) {
+    mutations.forEach(function (mutation) {
+        var target = mutation.type === 'characterData' ? mutation.target.parentElement : mutation.target;
+        if (target && target.nodeType === 1) { window.__a11yChanged.add(target); }
+    });
+});
+window.__a11yObserver.observe(document.documentElement, {
+    subtree: true, childList: true, attributes: true, characterData: true
+});
+return window.__a11yTracked.length;
+"""
+
+# Reports the outermost changed subtrees since TRACK_CHANGES_SCRIPT and what
+# happened to every tracked node: "kept" (with a fresh selector), "changed"
+# (inside a changed subtree) or "gone" (removed from the document).
+# arguments: scan context selector (or null), maximum number of subtrees
+COLLECT_CHANGES_SCRIPT = CSS_PATH_FUNCTION + """
+var contextSelector = arguments[0];
+var maxRoots = arguments[1];
+
+if (!window.__a11yObserver) { return {tracking: false}; }
+window.__a11yObserver.takeRecords().forEach(function (mutation) {
+    var target = mutation.type === 'characterData' ? mutation.target.parentElement : mutation.target;
+    if (target && target.nodeType === 1) { window.__a11yChanged.add(target); }
+});
+
+var changed = window.__a11yChanged;
+window.__a11yChanged = new Set();
+var contextEl = contextSelector ? document.querySelector(contextSelector) : document.documentElement;
+
+// Keep only connected elements that aren't inside another changed element
+var roots = [];
+var full = false;
+changed.forEach(function (el) {
+    if (!el.isConnected) { return; }
+    for (var parent = el.parentElement; parent; parent = parent.parentElement) {
+        if (changed.has(parent)) { return; }
+    }
+    if (el === document.documentElement || el === document.body || el.contains(contextEl)) {
+        full = true;
+    } else if (contextEl && contextEl.contains(el)) {
+        roots.push(el);
+    }
+});
+
+if (roots.length > maxRoots) { full = true; }
+
+var selectors = window.__a11yTrackedSelectors || [];
+var nodes = (window.__a11yTracked || []).map(function (el, index) {
+    if (!el) { return {status: 'kept'}; }
+    if (!el.isConnected) { return {status: 'gone'}; }
+    for (var i = 0; i < roots.length; i++) {
+        if (roots[i].contains(el)) { return {status: 'changed'}; }
+    }
+    // Only send a new selector if the old one now finds something else
+    try {
+        if (document.querySelector(selectors[index]) === el) { return {status: 'kept'}; }
+    } catch (e) {}
+    return {status: 'kept', selector: a11yCssPath(el)};
+});
+
+return {
+    tracking: true,
+    full: full,
+    roots: full ? [] : roots.map(a11yCssPath),
+    nodes: nodes
+};
+"""
+
+# Fingerprints the page for the scan cache: two cyrb53 hashes (106 bits) of
+# the serialised DOM with comments, script bodies and nonces stripped and
+# whitespace collapsed, plus the axe version and viewport size.
+DOM_FINGERPRINT_SCRIPT = """
+function cyrb53(str, seed) {
+    var h1 = 0xdeadbeef ^ seed, h2 = 0x41c6ce57 ^ seed;
+    for (var i = 0, ch; i < str.length; i++) {
+        ch = str.charCodeAt(i);
+        h1 = Math.imul(h1 ^ ch, 2654435761);
+        h2 = Math.imul(h2 ^ ch, 1597334677);
+    }
+    h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507);
+    h1 ^= Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+    h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507);
+    h2 ^= Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+    var hex = (2097152 * (h2 >>> 0) + (h1 >>> 0)).toString(16);
+    return ('00000000000000' + hex).slice(-14);
+}
+
+var html = document.documentElement.outerHTML
+    .replace(/<!--[\\s\\S]*?-->/g, '')
+    .replace(/(<script\\b[^>]*>)[\\s\\S]*?<\\/script>/gi, '$1</script>')
+    .replace(/\\snonce="[^"]*"/gi, '')
+    .replace(/\\s+/g, ' ');
+
+return {
+    hash: cyrb53(html, 1) + cyrb53(html, 2),
+    length: html.length,
+    axeVersion: window.axe ? window.axe.version : null,
+    viewport: [window.innerWidth, window.innerHeight]
+};
+"""
+
+# Lists the frames and open shadow roots inside the scan context. A frame is
+# independent if it loads its own http(s) or file URL and is visible, so it
+# can be scanned on its own in another tab. Frames built by the parent page
+# (srcdoc, about:blank) and hidden frames are left to the main scan. size is
+# the frame's viewport in CSS pixels.
+# arguments: scan context selector (or null)
+FRAME_INVENTORY_SCRIPT = CSS_PATH_FUNCTION + """
+var contextEl = arguments[0] ? document.querySelector(arguments[0]) : document.documentElement;
+if (!contextEl) { return {frames: [], shadowHosts: []}; }
+
+var frames = [];
+Array.prototype.forEach.call(document.querySelectorAll('iframe, frame'), function (frame) {
+    if (!contextEl.contains(frame)) { return; }
+    var src = frame.src || '';
+    frames.push({
+        selector: a11yCssPath(frame),
+        src: src,
+        independent: /^(https?|file):/.test(src) && !frame.hasAttribute('srcdoc') &&
+            frame.getClientRects().length > 0,
+        size: [frame.clientWidth, frame.clientHeight]
+    });
+});
+
+var shadowHosts = [];
+var walker = document.createTreeWalker(contextEl, NodeFilter.SHOW_ELEMENT);
+for (var el = walker.currentNode; el; el = walker.nextNode()) {
+    if (el.shadowRoot) { shadowHosts.push(a11yCssPath(el)); }
+}
+
+return {frames: frames, shadowHosts: shadowHosts};
+"""
+
+# Splits the scan context into chunks of at most maxNodes elements for
+# chunked scans. Children of the context are grouped in document order;
+# a child that is too big on its own is split into its children, and
+# landmarks that fit get a chunk of their own. Paths are built from the
+# parent's path so long lists don't cost a sibling lookup per element.
+# arguments: root selectors of the scan context (or null), maximum elements per chunk
+CHUNK_REGIONS_SCRIPT = CSS_PATH_FUNCTION + """
+var roots = arguments[0] ? arguments[0].map(function (selector) {
+    return document.querySelector(selector);
+}).filter(Boolean) : [document.body];
+var maxNodes = arguments[1];
+var LANDMARKS = 'header, nav, main, aside, footer, form, [role="banner"], [role="navigation"], ' +
+    '[role="main"], [role="complementary"], [role="contentinfo"], [role="search"], [role="region"]';
+if (!roots.length) { return {total: 0, chunks: []}; }
+
+var chunks = [];
+var current = [];
+var currentSize = 0;
+
+function flush() {
+    if (current.length) { chunks.push({selectors: current, nodes: currentSize}); }
+    current = [];
+    currentSize = 0;
+}
+
+function childPath(parentPath, child, index) {
+    if (child.id && document.getElementById(child.id) === child) { return '#' + CSS.escape(child.id); }
+    return parentPath + ' > ' + child.tagName.toLowerCase() + ':nth-child(' + (index + 1) + ')';
+}
+
+function visit(parent, parentPath) {
+    var children = parent.children;
+    for (var i = 0; i < children.length; i++) {
+        var child = children[i];
+        var path = childPath(parentPath, child, i);
+        var size = child.getElementsByTagName('*').length + 1;
+        if (size > maxNodes && child.children.length) {
+            flush();
+            visit(child, path);
+            flush();
+            continue;
+        }
+        var landmark = child.matches(LANDMARKS);
+        if (landmark || currentSize + size > maxNodes) { flush(); }
+        current.push(path);
+        currentSize += size;
+        if (landmark) { flush(); }
+    }
+}
+
+var total = 0;
+roots.forEach(function (root) {
+    var before = chunks.length;
+    visit(root, a11yCssPath(root));
+    flush();
+    if (chunks.length === before) { chunks.push({selectors: [a11yCssPath(root)], nodes: 1}); }
+    total += root.getElementsByTagName('*').length + 1;
+});
+return {total: total, chunks: chunks};
+"""
+
+# Collects what the batched contrast engine needs for every element with
+# visible text, in one call. Colours are sent as one flat list of numbers
+# (foreground r, g, b, a then background r, g, b per element) so the
+# ratios can be worked out in Python in a single pass. The background is
+# found by blending background colours up the ancestors until one is
+# opaque; each element's background is remembered, so shared ancestors
+# are only looked at once. Backgrounds behind images or gradients can't be
+# known and are reported with a reason instead, like axe's incomplete
+# results.
+# arguments: scan context selector (or null), characters of HTML to keep
+COLLECT_TEXT_STYLES_SCRIPT = CSS_PATH_FUNCTION + """
+var root = arguments[0] ? document.querySelector(arguments[0]) : document.body;
+var maxHtml = arguments[1];
+var SKIPPED = {SCRIPT: 1, STYLE: 1, NOSCRIPT: 1, TEMPLATE: 1, OPTION: 1};
+var styles = {selectors: [], html: [], colors: [], fontSize: [], fontWeight: [], unknown: []};
+if (!root) { return styles; }
+
+function parseColor(value) {
+    var parts = /rgba?\\(([^)]+)\\)/.exec(value);
+    if (!parts) { return null; }
+    var numbers = parts[1].split(',').map(parseFloat);
+    return [numbers[0], numbers[1], numbers[2], numbers.length > 3 ? numbers[3] : 1];
+}
+
+var backgrounds = new Map();
+
+function background(el) {
+    if (!el || el.nodeType !== 1) { return {color: [255, 255, 255], unknown: null}; }
+    if (backgrounds.has(el)) { return backgrounds.get(el); }
+    var style = window.getComputedStyle(el);
+    var result;
+    var image = style.getPropertyValue('background-image');
+    if (image !== 'none') {
+        result = {color: null, unknown: image.indexOf('gradient') !== -1 ? 'bgGradient' : 'bgImage'};
+    } else {
+        var own = parseColor(style.getPropertyValue('background-color')) || [0, 0, 0, 0];
+        var below = own[3] >= 1 ? null : background(el.parentElement);
+        if (!below) {
+            result = {color: own.slice(0, 3), unknown: null};
+        } else if (!below.color) {
+            result = below;
+        } else {
+            var alpha = own[3];
+            result = {color: [0, 1, 2].map(function (i) {
+                return own[i] * alpha + below.color[i] * (1 - alpha);
+            }), unknown: null};
+        }
+    }
+    backgrounds.set(el, result);
+    return result;
+}
+
+var seen = new Set();
+var walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT);
+for (var text = walker.nextNode(); text; text = walker.nextNode()) {
+    var el = text.parentElement;
+    if (!el || seen.has(el) || SKIPPED[el.tagName] || !text.nodeValue.trim()) { continue; }
+    seen.add(el);
+    var style = window.getComputedStyle(el);
+    if (style.getPropertyValue('visibility') !== 'visible' || !el.getClientRects().length) { continue; }
+    var color = parseColor(style.getPropertyValue('color'));
+    if (!color || color[3] === 0) { continue; }
+
+    var bg = background(el);
+    var html = el.outerHTML;
+    styles.selectors.push(a11yCssPath(el));
+    styles.html.push(maxHtml && html.length > maxHtml ? html.slice(0, maxHtml) + '...' : html);
+    styles.colors.push.apply(styles.colors, color.concat(bg.color || [0, 0, 0]));
+    styles.fontSize.push(parseFloat(style.getPropertyValue('font-size')));
+    styles.fontWeight.push(parseFloat(style.getPropertyValue('font-weight')) || 400);
+    styles.unknown.push(bg.unknown);
+}
+return styles;
+"""
+
+# Finds the elements of single-selector axe targets and returns their
+# a11yCssPath, so axe results can be matched with the contrast engine's
+# arguments: list of axe node targets
+AXE_TARGET_PATHS_SCRIPT = CSS_PATH_FUNCTION + """
+return (arguments[0] || []).map(function (target) {
+    if (target.length !== 1 || typeof target[0] !== 'string') { return null; }
+    var el = document.querySelector(target[0]);
+    return el ? a11yCssPath(el) : null;
+});
+"""
+
+# Works out the order the Tab key moves through the page, without pressing
+# it: elements with a positive tabindex first (lowest first, then document
+# order), then the rest in document order. Disabled, inert, hidden and
+# tabindex="-1" elements are left out, and only one radio button per group
+# can be tabbed to (the checked one, or the first). Shadow DOM and iframe
+# contents are not included.
+# arguments: none
+TAB_SEQUENCE_SCRIPT = CSS_PATH_FUNCTION + """
+var CANDIDATES = 'a[href], area[href], button, input, select, textarea, iframe, summary, ' +
+    '[tabindex], [contenteditable]:not([contenteditable="false"]), audio[controls], video[controls]';
+var candidates = document.querySelectorAll(CANDIDATES);
+var positive = [];
+var normal = [];
+var radioGroups = {};
+
+for (var i = 0; i < candidates.length; i++) {
+    var el = candidates[i];
+    if (el.tabIndex < 0 || el.disabled || (el.matches && el.matches(':disabled'))) { continue; }
+    if (el.type === 'hidden' || el.closest('[inert]')) { continue; }
+    if (!el.getClientRects().length || window.getComputedStyle(el).visibility !== 'visible') { continue; }
+    if (el.type === 'radio' && el.name) {
+        var key = (el.form ? 'form' + Array.prototype.indexOf.call(document.forms, el.form) : '') + ':' + el.name;
+        var group = radioGroups[key];
+        if (group) {
+            // Keep the checked radio button in place of the first one
+            if (el.checked && !group.el.checked) {
+                group.list[group.index] = el;
+                group.el = el;
+            }
+            continue;
+        }
+        var list = el.tabIndex > 0 ? positive : normal;
+        radioGroups[key] = {el: el, list: list, index: list.length};
+    }
+    (el.tabIndex > 0 ? positive : normal).push(el);
+}
+
+// Array.prototype.sort is stable, so document order is kept within a tabindex
+positive.sort(function (a, b) { return a.tabIndex - b.tabIndex; });
+var sequence = positive.concat(normal);
+window.__a11yTabSequence = sequence;
+return {sequence: sequence.map(a11yCssPath), positiveTabindex: positive.length};
+"""
+
+# Reports which element of the computed tab sequence has focus, then moves
+# focus to another element of it, so key presses can be checked in pairs of
+# calls. Index -1 for the focused element means it isn't in the sequence
+# (or nothing has focus).
+# arguments: index of the element to focus next (or -1 to leave focus)
+TAB_FOCUS_STEP_SCRIPT = """
+var sequence = window.__a11yTabSequence || [];
+var active = document.activeElement;
+var current = active && active !== document.body ? sequence.indexOf(active) : -1;
+var onElement = !!active && active !== document.body && active !== document.documentElement;
+var next = arguments[0];
+if (next >= 0 && sequence[next]) { sequence[next].focus(); }
+return {index: current, onElement: onElement};
+"""
+
+# Collects everything the manual checks need in one call, as compact rows:
+#   images:   [has alt, alt, selector, HTML]
+#   fields:   [id, label source, label text, selector, HTML]
+#   headings: [level, text, selector]
+#   links:    [href, text, selector, HTML]
+#   tables:   [selector, caption, header cells, rows]
+# Field labels are found in the order browsers use for the accessible name:
+# aria-labelledby (pointing at elements that exist), aria-label, then
+# <label> elements (label[for] and wrapping labels, via field.labels).
+# Hidden inputs are skipped, they never need a label. HTML is truncated.
+# arguments: characters of HTML to keep
+DOM_SNAPSHOT_SCRIPT = CSS_PATH_FUNCTION + """
+var maxHtml = arguments[0];
+
+function text(el) { return (el.textContent || '').replace(/\\s+/g, ' ').trim(); }
+function html(el) {
+    var outer = el.outerHTML;
+    return maxHtml && outer.length > maxHtml ? outer.slice(0, maxHtml) + '...' : outer;
+}
+function rows(selector, row) {
+    return Array.prototype.map.call(document.querySelectorAll(selector), row);
+}
+
+function fieldLabel(field) {
+    var labelledBy = (field.getAttribute('aria-labelledby') || '').split(/\\s+/)
+        .map(function (id) { return id && document.getElementById(id); })
+        .filter(Boolean);
+    if (labelledBy.length) { return ['aria-labelledby', labelledBy.map(text).join(' ')]; }
+    var ariaLabel = (field.getAttribute('aria-label') || '').trim();
+    if (ariaLabel) { return ['aria-label', ariaLabel]; }
+    if (field.labels && field.labels.length) {
+        return ['label', Array.prototype.map.call(field.labels, text).join(' ')];
+    }
+    return [null, ''];
+}
+
+return {
+    url: location.href,
+    title: document.title,
+    images: rows('img', function (img) {
+        return [img.hasAttribute('alt'), img.getAttribute('alt'), a11yCssPath(img), html(img)];
+    }),
+    fields: rows('input, select, textarea', function (field) {
+        if (field.tagName === 'INPUT' && field.type === 'hidden') { return null; }
+        var label = fieldLabel(field);
+        return [field.id || null, label[0], label[1], a11yCssPath(field), html(field)];
+    }).filter(Boolean),
+    headings: rows('h1, h2, h3, h4, h5, h6', function (heading) {
+        return [parseInt(heading.tagName.charAt(1), 10), text(heading), a11yCssPath(heading)];
+    }),
+    links: rows('a[href]', function (link) {
+        return [link.getAttribute('href'), text(link) || (link.getAttribute('aria-label') || '').trim(),
+                a11yCssPath(link), html(link)];
+    }),
+    tables: rows('table', function (table) {
+        return [a11yCssPath(table), table.caption ? text(table.caption) : null,
+                table.querySelectorAll('th').length, table.rows.length];
+    })
+};
+"""
@@ -0,0 +1,216 @@
+# SQLite store of accepted violations, for failing CI only on new ones
+# Violations are kept by page URL and fingerprint so a page is checked with one indexed lookup
+
+import os
+import sqlite3
+import time
+
+from src.core.issue_index import fingerprint_node
+from src.core.results import Violation
+
+
+# Default location of the baseline database
+DEFAULT_BASELINE_PATH = os.path.join("reports", "baseline.sqlite")
+
+# Rows written per executemany call when accepting a run
+INSERT_BATCH_SIZE = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS baseline (
+    url TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    rule TEXT NOT NULL,
+    PRIMARY KEY (url, fingerprint)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _violation_nodes(results):
+    """
+    Yield (rule ID, node) for every violation node of a page's results
+    """
+    if results is None:
+        return
+    if isinstance(results, dict):
+        violations = [Violation.from_axe(violation) for violation in results.get("violations", [])]
+    else:
+        violations = results.violations
+    for violation in violations:
+        for node in violation.nodes:
+            yield violation.id, node
+
+
+class BaselineStore:
+    """
+    Accepted violations of a site, keyed by page URL and violation fingerprint
+
+    Fingerprints are the ones IssueIndex uses (rule ID plus normalised
+    target), so a violation stays accepted when unrelated parts of the page
+    change.
+    """
+
+    def __init__(self, path=DEFAULT_BASELINE_PATH):
+        """
+        Open (or create) a baseline database
+
+        Args:
+            path: Path to the SQLite file
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        Close the database
+        """
+        self._conn.close()
+
+    def accept(self, records, replace_all=False):
+        """
+        Accept the violations of a run as the new baseline
+
+        Pages in the run get exactly the violations they have now; pages
+        that weren't scanned keep their baseline unless replace_all is set.
+        Pages that failed to scan are left as they were.
+
+        Args:
+            records: Scan records ({url, results, error}) from the scan engine
+            replace_all: Drop the baseline of pages that aren't in the run
+
+        Returns:
+            Number of violations accepted (nodes with the same fingerprint on
+            a page count once)
+        """
+        started = time.time()
+        accepted = 0
+        with self._conn:
+            if replace_all:
+                self._conn.execute("DELETE FROM baseline")
+
+            rows = []
+            for record in records:
+                if record.get("error") or not record.get("results"):
+                    continue
+                url = record["url"]
+                if not replace_all:
+                    self._conn.execute("DELETE FROM baseline WHERE url = ?", (url,))
+                rows.extend((url, fingerprint_node(rule_id, node), rule_id)
+                            for rule_id, node in _violation_nodes(record["results"]))
+                if len(rows) >= INSERT_BATCH_SIZE:
+                    accepted += self._insert(rows)
+                    rows = []
+            accepted += self._insert(rows)
+
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('accepted_at', ?)",
+                               (time.strftime("%Y-%m-%d %H:%M:%S"),))
+
+        print(f"Baseline updated with {accepted} violations in {time.time() - started:.2f}s ({self.path})")
+        return accepted
+
+    def _insert(self, rows):
+        """
+        Insert baseline rows, ignoring duplicates on the same page
+
+        Returns:
+            Number of rows actually inserted
+        """
+        if not rows:
+            return 0
+        # rowcount adds up the rows executemany changed, skipped duplicates aren't counted
+        return self._conn.executemany("INSERT OR IGNORE INTO baseline VALUES (?, ?, ?)", rows).rowcount
+
+    def page_fingerprints(self, url):
+        """
+        Get the accepted fingerprints of a page
+
+        Args:
+            url: Page URL
+
+        Returns:
+            Set of fingerprints (empty for pages without a baseline)
+        """
+        cursor = self._conn.execute("SELECT fingerprint FROM baseline WHERE url = ?", (url,))
+        return {row[0] for row in cursor}
+
+    def contains(self, url, fingerprint):
+        """
+        Check if one violation of a page is in the baseline
+
+        Args:
+            url: Page URL
+            fingerprint: Violation fingerprint from fingerprint_node()
+
+        Returns:
+            True if the violation is accepted
+        """
+        cursor = self._conn.execute("SELECT 1 FROM baseline WHERE url = ? AND fingerprint = ?", (url, fingerprint))
+        return cursor.fetchone() is not None
+
+    def new_violations(self, url, results):
+        """
+        Get the violations of a page that aren't in the baseline
+
+        The page's baseline is read with one indexed query, then every node
+        is checked against it in memory.
+
+        Args:
+            url: Page URL
+            results: Results of the page (dictionary or ScanResult)
+
+        Returns:
+            List of {rule, fingerprint, target, html} dictionaries
+        """
+        accepted = self.page_fingerprints(url)
+        new = []
+        for rule_id, node in _violation_nodes(results):
+            fingerprint = fingerprint_node(rule_id, node)
+            if fingerprint not in accepted:
+                new.append({"rule": rule_id, "fingerprint": fingerprint,
+                            "target": [part if isinstance(part, str) else list(part) for part in node.target],
+                            "html": node.html})
+        return new
+
+    def diff(self, records):
+        """
+        Get the new violations of every page of a run
+
+        Args:
+            records: Scan records ({url, results, error}) from the scan engine
+
+        Returns:
+            Dictionary of URL to new violations, only pages that have some
+        """
+        new = {}
+        for record in records:
+            if record.get("results"):
+                page_new = self.new_violations(record["url"], record["results"])
+                if page_new:
+                    new[record["url"]] = page_new
+        return new
+
+    def summary(self):
+        """
+        Describe the baseline
+
+        Returns:
+            Dictionary with the number of pages and violations and when it was accepted
+        """
+        pages, violations = self._conn.execute("SELECT COUNT(DISTINCT url), COUNT(*) FROM baseline").fetchone()
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'accepted_at'").fetchone()
+        return {"pages": pages, "violations": violations, "acceptedAt": row[0] if row else None}
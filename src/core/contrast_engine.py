@@ -0,0 +1,262 @@
+# Batched colour contrast engine (WCAG 1.4.3)
+# Collects text colours in one browser call and works out every contrast ratio in one NumPy pass
+
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    # Optional dependency, only needed for the contrast engine
+    np = None
+
+from src.core.axe_scripts import AXE_TARGET_PATHS_SCRIPT, COLLECT_TEXT_STYLES_SCRIPT
+from src.core.results import DEFAULT_MAX_HTML_LENGTH, as_axe_results
+
+
+# Contrast ratios WCAG 1.4.3 asks for (Level AA)
+NORMAL_TEXT_RATIO = 4.5
+LARGE_TEXT_RATIO = 3.0
+
+# Large text is 18pt, or 14pt when bold; axe counts 600 and up as bold
+LARGE_TEXT_PT = 18
+LARGE_BOLD_TEXT_PT = 14
+BOLD_FONT_WEIGHT = 600
+
+# Rule texts used by axe 3.1 for color-contrast, so reports treat both the same
+CONTRAST_RULE = {
+    "id": "color-contrast",
+    "impact": "serious",
+    "tags": ["cat.color", "wcag2aa", "wcag143"],
+    "description": "Ensures the contrast between foreground and background colors meets WCAG 2 AA contrast ratio thresholds",
+    "help": "Elements must have sufficient color contrast",
+    "helpUrl": "https://dequeuniversity.com/rules/axe/3.1/color-contrast?application=axeAPI",
+}
+
+# Messages axe gives when it can't tell the background colour
+UNKNOWN_BACKGROUND_MESSAGES = {
+    "bgImage": "Element's background color could not be determined due to a background image",
+    "bgGradient": "Element's background color could not be determined due to a background gradient",
+}
+
+
+def _require_numpy():
+    """
+    Raise a helpful error when NumPy isn't installed
+    """
+    if np is None:
+        raise ImportError("The contrast engine needs NumPy, install it with: pip install numpy")
+
+
+def collect_text_styles(driver, context=None, max_html_length=DEFAULT_MAX_HTML_LENGTH):
+    """
+    Collect colours and font details for every element with visible text
+
+    Args:
+        driver: WebDriver instance
+        context: CSS selector of the part of the page to check (default: body)
+        max_html_length: Characters of element HTML to keep
+
+    Returns:
+        Dictionary of lists: selectors, html, colors (7 numbers per element),
+        fontSize (px), fontWeight and unknown (reason the background is unknown, or None)
+    """
+    return driver.execute_script(COLLECT_TEXT_STYLES_SCRIPT, context, max_html_length)
+
+
+def relative_luminance(rgb):
+    """
+    Relative luminance of sRGB colours, as defined by WCAG
+
+    Args:
+        rgb: Array of shape (n, 3) with channels from 0 to 255
+
+    Returns:
+        Array of n luminances from 0 to 1
+    """
+    _require_numpy()
+    channels = np.asarray(rgb, dtype=np.float64) / 255
+    linear = np.where(channels <= 0.03928, channels / 12.92, ((channels + 0.055) / 1.055) ** 2.4)
+    return linear @ np.array([0.2126, 0.7152, 0.0722])
+
+
+def compute_contrast(styles):
+    """
+    Work out the contrast ratio of every collected element at once
+
+    Args:
+        styles: Dictionary from collect_text_styles()
+
+    Returns:
+        Dictionary of arrays: fg and bg (blended colours, shape (n, 3)),
+        ratio, expected (ratio WCAG asks for) and passed
+    """
+    _require_numpy()
+    colors = np.asarray(styles["colors"], dtype=np.float64).reshape(-1, 7)
+    foreground, alpha, bg = colors[:, :3], colors[:, 3:4], colors[:, 4:]
+
+    # A see-through text colour is blended with the background, like axe does
+    fg = foreground * alpha + bg * (1 - alpha)
+
+    fg_luminance = relative_luminance(fg)
+    bg_luminance = relative_luminance(bg)
+    ratio = ((np.maximum(fg_luminance, bg_luminance) + 0.05)
+             / (np.minimum(fg_luminance, bg_luminance) + 0.05))
+
+    # Pixels to points the way axe does it: Math.ceil(px * 72) / 96, so sizes round up to 1/96 pt
+    points = np.ceil(np.asarray(styles["fontSize"], dtype=np.float64) * 72) / 96
+    bold = np.asarray(styles["fontWeight"], dtype=np.float64) >= BOLD_FONT_WEIGHT
+    large = np.where(bold, points >= LARGE_BOLD_TEXT_PT, points >= LARGE_TEXT_PT)
+    expected = np.where(large, LARGE_TEXT_RATIO, NORMAL_TEXT_RATIO)
+
+    return {"fg": fg, "bg": bg, "ratio": ratio, "expected": expected, "passed": ratio > expected}
+
+
+def _hex(rgb):
+    """
+    Format an RGB colour the way axe does (#rrggbb)
+    """
+    return "#" + "".join(f"{int(round(channel)):02x}" for channel in rgb)
+
+
+def _contrast_node(styles, contrast, index):
+    """
+    Build an axe-shaped node for an element with too little contrast
+    """
+    ratio = round(float(contrast["ratio"][index]), 2)
+    data = {
+        "fgColor": _hex(contrast["fg"][index]),
+        "bgColor": _hex(contrast["bg"][index]),
+        "contrastRatio": ratio,
+        "fontSize": f"{styles['fontSize'][index] * 72 / 96:.1f}pt",
+        "fontWeight": "bold" if styles["fontWeight"][index] >= BOLD_FONT_WEIGHT else "normal",
+        "expectedContrastRatio": f"{contrast['expected'][index]:g}:1",
+    }
+    message = (f"Element has insufficient color contrast of {ratio} (foreground color: {data['fgColor']}, "
+               f"background color: {data['bgColor']}, font size: {data['fontSize']}, "
+               f"font weight: {data['fontWeight']}). Expected contrast ratio of {data['expectedContrastRatio']}")
+    return _node(styles, index, message, data)
+
+
+def _node(styles, index, message, data=None):
+    """
+    Build an axe-shaped node with one failed check
+    """
+    return {
+        "html": styles["html"][index],
+        "target": [styles["selectors"][index]],
+        "impact": CONTRAST_RULE["impact"],
+        "failureSummary": f"Fix any of the following:\n  {message}",
+        "any": [{"id": "color-contrast", "impact": CONTRAST_RULE["impact"], "message": message, "data": data}],
+        "all": [],
+        "none": [],
+    }
+
+
+def contrast_results(styles, contrast, url=None):
+    """
+    Turn computed contrast ratios into axe-shaped results
+
+    Elements with too little contrast become color-contrast violations,
+    elements whose background can't be known become incomplete results and
+    passing elements are only counted, like a compact scan.
+
+    Args:
+        styles: Dictionary from collect_text_styles()
+        contrast: Dictionary from compute_contrast()
+        url: Page URL to put in the results
+
+    Returns:
+        Results dictionary with the same shape as axe's
+    """
+    violations, incomplete, passed = [], [], 0
+    for index, unknown in enumerate(styles["unknown"]):
+        if unknown:
+            message = UNKNOWN_BACKGROUND_MESSAGES.get(unknown, "Element's background color could not be determined")
+            incomplete.append(_node(styles, index, message, {"missingData": unknown}))
+        elif contrast["passed"][index]:
+            passed += 1
+        else:
+            violations.append(_contrast_node(styles, contrast, index))
+
+    def rule(nodes, count=None):
+        result = dict(CONTRAST_RULE, nodes=nodes)
+        if count is not None:
+            result.update(impact=None, nodeCount=count)
+        return [result] if nodes or count else []
+
+    return {
+        "url": url,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime()),
+        "violations": rule(violations),
+        "incomplete": rule(incomplete),
+        "passes": rule([], passed),
+        "inapplicable": [] if styles["selectors"] else [dict(CONTRAST_RULE, impact=None, nodes=[])],
+    }
+
+
+def run_contrast_check(driver, context=None, max_html_length=DEFAULT_MAX_HTML_LENGTH):
+    """
+    Check the colour contrast of every text element on the current page
+
+    Args:
+        driver: WebDriver instance
+        context: CSS selector of the part of the page to check (default: body)
+        max_html_length: Characters of element HTML to keep
+
+    Returns:
+        Results dictionary with the same shape as axe's, with scanStats giving
+        the time spent collecting in the browser and computing in Python
+    """
+    _require_numpy()
+    start_time = time.time()
+    styles = collect_text_styles(driver, context, max_html_length)
+    collected_time = time.time()
+    results = contrast_results(styles, compute_contrast(styles), driver.current_url)
+    end_time = time.time()
+
+    results["scanStats"] = {
+        "elapsed": end_time - start_time,
+        "collectTime": collected_time - start_time,
+        "computeTime": end_time - collected_time,
+        "textElements": len(styles["selectors"]),
+    }
+    failing = sum(len(rule["nodes"]) for rule in results["violations"])
+    print(f"Contrast check: {failing} of {len(styles['selectors'])} text elements fail "
+          f"({end_time - start_time:.2f}s)")
+    return results
+
+
+def compare_with_axe(driver, engine_results, axe_results):
+    """
+    Compare contrast engine results with axe's color-contrast results
+
+    Both must come from the page the driver is still on, because axe's
+    selectors are looked up again to match the engine's.
+
+    Args:
+        driver: WebDriver instance
+        engine_results: Results from run_contrast_check()
+        axe_results: Results from an axe scan (dictionary or ScanResult)
+
+    Returns:
+        Dictionary with matched, engine_only and axe_only element selectors,
+        and agreement (matched share of all elements flagged by either)
+    """
+    def flagged(results):
+        return [node["target"] for rule in results.get("violations", [])
+                if rule["id"] == "color-contrast" for node in rule["nodes"]]
+
+    engine = {target[0] for target in flagged(engine_results)}
+    axe_targets = flagged(as_axe_results(axe_results))
+    paths = driver.execute_script(AXE_TARGET_PATHS_SCRIPT, axe_targets)
+    # Targets that can't be looked up (frames, shadow DOM) are kept as axe wrote them
+    axe = {path or " ".join(map(str, target)) for path, target in zip(paths, axe_targets)}
+
+    matched = engine & axe
+    flagged_by_either = len(engine | axe)
+    return {
+        "matched": sorted(matched),
+        "engine_only": sorted(engine - axe),
+        "axe_only": sorted(axe - engine),
+        "agreement": len(matched) / flagged_by_either if flagged_by_either else 1.0,
+    }
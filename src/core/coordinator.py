@@ -0,0 +1,533 @@
+# Coordinator/worker mode for spreading a crawl over several machines
+# The coordinator owns the URL queue and hands out leases over HTTP,
+# workers on any node scan the leased URLs and post the results back
+
+import hmac
+import json
+import os
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ScanCoordinator:
+    """
+    Holds the URL queue and tracks leases and results
+
+    Every URL is leased to one worker at a time. Leases that are not renewed
+    with a heartbeat before they time out are put back on the queue, so a
+    dead worker never loses a page. The first result posted for a URL is
+    recorded and any later duplicates are ignored.
+    """
+
+    def __init__(self, urls, lease_timeout=60, max_attempts=3, context=None, options=None,
+                 results_file=None, clock=time.monotonic):
+        """
+        Initialize the coordinator
+
+        Args:
+            urls: List of URLs to scan
+            lease_timeout: Seconds a lease stays valid without a heartbeat
+            max_attempts: Leases per URL before it is recorded as failed
+            context: CSS selector workers should limit the scan to
+            options: Dictionary of axe options workers should use
+            results_file: Optional JSON lines file results are appended to
+            clock: Time function, replaceable in tests
+        """
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.context = context
+        self.options = options
+        self.results_file = results_file
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._results = {}
+        self._attempts = {}
+        self._leases = {}
+
+        # Resume: URLs already in the results file are not scanned again
+        if results_file and os.path.exists(results_file):
+            self._resume(results_file)
+
+        # Keep the original order but drop duplicates and finished URLs
+        self._total = len(dict.fromkeys(urls))
+        self._pending = deque(url for url in dict.fromkeys(urls) if url not in self._results)
+
+    def lease(self, worker_id):
+        """
+        Hand the next URL to a worker
+
+        Args:
+            worker_id: Name of the worker asking for work
+
+        Returns:
+            Dictionary with lease_id and url, or {"wait": seconds} while other
+            leases are still open, or {"done": True} when everything is recorded
+        """
+        with self._lock:
+            self._expire_leases()
+
+            while self._pending:
+                url = self._pending.popleft()
+                if url in self._results:
+                    continue
+
+                lease_id = uuid.uuid4().hex
+                self._attempts[url] = self._attempts.get(url, 0) + 1
+                self._leases[lease_id] = {
+                    "url": url,
+                    "worker": worker_id,
+                    "expires": self._clock() + self.lease_timeout,
+                }
+                return {
+                    "lease_id": lease_id,
+                    "url": url,
+                    "lease_timeout": self.lease_timeout,
+                    "context": self.context,
+                    "options": self.options,
+                }
+
+            if self._leases:
+                # Nothing to hand out now, but an open lease may still expire
+                return {"wait": min(5, self.lease_timeout)}
+
+            return {"done": True}
+
+    def heartbeat(self, lease_id):
+        """
+        Extend a lease while the worker is still scanning
+
+        Args:
+            lease_id: Lease to extend
+
+        Returns:
+            True if the lease is still valid
+        """
+        with self._lock:
+            lease = self._leases.get(lease_id)
+            if lease is None:
+                return False
+            lease["expires"] = self._clock() + self.lease_timeout
+            return True
+
+    def complete(self, lease_id, record):
+        """
+        Record the result for a leased URL
+
+        Args:
+            lease_id: Lease the result belongs to
+            record: Scan record with at least a "url" key
+
+        Returns:
+            True if the result was recorded, False if it was a duplicate
+        """
+        with self._lock:
+            lease = self._leases.pop(lease_id, None)
+            url = lease["url"] if lease else record.get("url")
+
+            # Results for URLs we never handed out are rejected
+            if url is None or url not in self._attempts:
+                return False
+
+            # Exactly once: the first result for a URL wins
+            if url in self._results:
+                return False
+
+            record = dict(record, url=url)
+            self._record(record)
+
+            # A late result for a requeued URL means it doesn't need another lease
+            if url in self._pending:
+                self._pending.remove(url)
+
+            # Other leases for the same URL (after a requeue) are now moot
+            for other_id in [i for i, l in self._leases.items() if l["url"] == url]:
+                del self._leases[other_id]
+            return True
+
+    def is_done(self):
+        """
+        Check if every URL has a recorded result
+
+        Returns:
+            True when the crawl is finished
+        """
+        with self._lock:
+            self._expire_leases()
+            return not self._pending and not self._leases
+
+    def results(self):
+        """
+        Get the recorded results
+
+        Returns:
+            List of scan records
+        """
+        with self._lock:
+            return list(self._results.values())
+
+    def status(self):
+        """
+        Get a progress summary
+
+        Returns:
+            Dictionary with total, recorded, pending and leased counts
+        """
+        with self._lock:
+            self._expire_leases()
+            return {
+                "total": self._total,
+                "recorded": len(self._results),
+                "pending": len(self._pending),
+                "leased": len(self._leases),
+            }
+
+    def _expire_leases(self):
+        """
+        Put URLs from timed-out leases back on the queue (lock must be held)
+        """
+        now = self._clock()
+        for lease_id in [i for i, l in self._leases.items() if l["expires"] <= now]:
+            url = self._leases.pop(lease_id)["url"]
+            if url in self._results:
+                continue
+
+            if self._attempts.get(url, 0) >= self.max_attempts:
+                print(f"Giving up on {url} after {self.max_attempts} expired leases")
+                self._record({
+                    "url": url,
+                    "results": None,
+                    "error": f"lease expired {self.max_attempts} times",
+                    "elapsed": 0.0,
+                })
+            else:
+                print(f"Lease for {url} expired, requeueing")
+                # Requeued URLs go to the front so they don't wait for the whole crawl
+                self._pending.appendleft(url)
+
+    def _resume(self, results_file):
+        """
+        Load the results a previous coordinator recorded
+
+        A coordinator killed in the middle of an append leaves half a line at
+        the end of the file. That line is cut off, so the next append starts
+        on a fresh line and the URL is scanned again.
+
+        Args:
+            results_file: JSON lines file written by _record()
+        """
+        with open(results_file, "rb") as f:
+            lines = f.readlines()
+
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            record = self._parse_record(line)
+            if record is None:
+                print(f"Skipping unreadable line {number} of {results_file}")
+                continue
+            self._results[record["url"]] = record
+
+        # The last append may have been cut off: drop a broken last line and
+        # make sure the next record starts on a line of its own
+        if lines and not lines[-1].endswith(b"\n"):
+            with open(results_file, "r+b") as f:
+                if lines[-1].strip() and self._parse_record(lines[-1]) is None:
+                    print(f"Dropping unfinished last line of {results_file}")
+                    f.truncate(sum(map(len, lines[:-1])))
+                else:
+                    f.seek(0, os.SEEK_END)
+                    f.write(b"\n")
+
+    @staticmethod
+    def _parse_record(line):
+        """
+        Read a results file line, or None if it doesn't hold a whole scan record
+        """
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return None
+        return record if isinstance(record, dict) and "url" in record else None
+
+    def _record(self, record):
+        """
+        Store a result and append it to the results file (lock must be held)
+
+        Args:
+            record: Scan record to store
+        """
+        self._results[record["url"]] = record
+
+        if self.results_file:
+            with open(self.results_file, "a") as f:
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+
+class _CoordinatorHandler(BaseHTTPRequestHandler):
+    """
+    JSON over HTTP front end for a ScanCoordinator
+    """
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        if self.path == "/status":
+            self._send(self.server.coordinator.status())
+        else:
+            self._send({"error": "not found"}, 404)
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        coordinator = self.server.coordinator
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send({"error": "invalid JSON"}, 400)
+            return
+        if not isinstance(body, dict):
+            self._send({"error": "expected a JSON object"}, 400)
+            return
+
+        if self.path == "/lease":
+            self._send(coordinator.lease(body.get("worker", "unknown")))
+        elif self.path == "/heartbeat":
+            self._send({"valid": coordinator.heartbeat(body.get("lease_id"))})
+        elif self.path == "/complete":
+            self._send({"recorded": coordinator.complete(body.get("lease_id"), body.get("record", {}))})
+        else:
+            self._send({"error": "not found"}, 404)
+
+    def _authorized(self):
+        """
+        Check the shared token, if the server has one, and answer 401 if it is wrong
+        """
+        token = self.server.token
+        if token and not hmac.compare_digest(self.headers.get("Authorization", ""), f"Bearer {token}"):
+            self._send({"error": "unauthorized"}, 401)
+            return False
+        return True
+
+    def _send(self, payload, status=200):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Keep the console readable, results are printed elsewhere
+        pass
+
+
+class CoordinatorServer:
+    """
+    Serves a ScanCoordinator over HTTP in a background thread
+    """
+
+    def __init__(self, coordinator, host="127.0.0.1", port=0, token=None):
+        """
+        Initialize the server
+
+        Args:
+            coordinator: ScanCoordinator to serve
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+            token: Optional shared token workers must send; anyone who can
+                reach the port can record results without one
+        """
+        self.coordinator = coordinator
+        self.httpd = ThreadingHTTPServer((host, port), _CoordinatorHandler)
+        self.httpd.coordinator = coordinator
+        self.httpd.token = token
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """
+        Start serving in a background thread
+
+        Returns:
+            Base URL of the coordinator
+        """
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        """
+        Stop serving and close the socket
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def wait_until_done(self, poll_interval=1.0):
+        """
+        Block until every URL has a recorded result
+
+        Args:
+            poll_interval: Seconds between progress checks
+        """
+        last = None
+        while not self.coordinator.is_done():
+            status = self.coordinator.status()
+            if status != last:
+                print(f"Progress: {status['recorded']}/{status['total']} recorded, {status['leased']} leased")
+                last = status
+            time.sleep(poll_interval)
+
+
+class CoordinatorClient:
+    """
+    Small HTTP client used by workers to talk to the coordinator
+    """
+
+    def __init__(self, base_url, timeout=30, token=None):
+        """
+        Initialize the client
+
+        Args:
+            base_url: Coordinator URL such as http://127.0.0.1:8765
+            timeout: Seconds to wait for each request
+            token: Shared token of the coordinator, if it has one
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.headers = {"Authorization": f"Bearer {token}"} if token else {}
+
+    def lease(self, worker_id):
+        return self._post("/lease", {"worker": worker_id})
+
+    def heartbeat(self, lease_id):
+        return self._post("/heartbeat", {"lease_id": lease_id}).get("valid", False)
+
+    def complete(self, lease_id, record):
+        return self._post("/complete", {"lease_id": lease_id, "record": record}).get("recorded", False)
+
+    def status(self):
+        request = urllib.request.Request(self.base_url + "/status", headers=self.headers)
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def _post(self, path, payload):
+        request = urllib.request.Request(
+            self.base_url + path,
+            data=json.dumps(payload).encode("utf-8"),
+            headers=dict(self.headers, **{"Content-Type": "application/json"}),
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+
+def run_worker(coordinator_url, browser="chrome", headless=True, worker_id=None, max_retries=5, block=None,
+               cache_dir=None, cache_max_bytes=None, token=None):
+    """
+    Scan URLs leased from a coordinator until the crawl is finished
+
+    Args:
+        coordinator_url: Coordinator URL such as http://127.0.0.1:8765
+        browser: Browser to use
+        headless: Run in headless mode or not
+        worker_id: Name reported to the coordinator (defaults to host and pid)
+        max_retries: Consecutive connection failures before giving up
+        block: Optional list of resource blocking presets
+        cache_dir: Optional scan cache directory
+        cache_max_bytes: Size cap for the scan cache (default DEFAULT_MAX_BYTES)
+        token: Shared token of the coordinator, if it has one
+
+    Returns:
+        Number of pages this worker scanned
+    """
+    # Imported here so the coordinator itself doesn't need Selenium
+    from src.core.resource_blocker import ResourceBlocker
+    from src.core.scan_cache import DEFAULT_MAX_BYTES, ScanCache
+    from src.core.scan_engine import scan_page
+    from src.core.webdriver_manager import setup_driver, teardown_driver
+
+    client = CoordinatorClient(coordinator_url, token=token)
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    blocker = ResourceBlocker(block) if block else None
+    cache = ScanCache(cache_dir, cache_max_bytes or DEFAULT_MAX_BYTES) if cache_dir else None
+    driver = setup_driver(browser, headless, resource_blocker=blocker)
+    driver.set_window_size(1366, 768)
+    scanned = 0
+    failures = 0
+
+    try:
+        while True:
+            try:
+                lease = client.lease(worker_id)
+                failures = 0
+            except (urllib.error.URLError, OSError) as e:
+                failures += 1
+                if failures > max_retries:
+                    print(f"Coordinator unreachable, stopping worker: {e}")
+                    break
+                time.sleep(min(2 ** failures, 30))
+                continue
+
+            if lease.get("done"):
+                break
+            if "wait" in lease:
+                time.sleep(lease["wait"])
+                continue
+
+            # Keep the lease alive while the page is being scanned
+            stop = threading.Event()
+            beat = threading.Thread(
+                target=_heartbeat_loop,
+                args=(client, lease["lease_id"], lease["lease_timeout"] / 3, stop),
+                daemon=True,
+            )
+            beat.start()
+            try:
+                record = scan_page(driver, lease["url"], lease.get("context"), lease.get("options"), cache=cache)
+            finally:
+                stop.set()
+                beat.join()
+
+            try:
+                client.complete(lease["lease_id"], record)
+            except (urllib.error.URLError, OSError) as e:
+                # The lease will expire and the URL gets scanned again
+                print(f"Could not send result for {lease['url']}: {e}")
+            scanned += 1
+            print(f"[{worker_id}] {lease['url']}: {'ERROR ' + record['error'] if record['error'] else 'done'}")
+    finally:
+        teardown_driver(driver)
+
+    return scanned
+
+
+def _heartbeat_loop(client, lease_id, interval, stop):
+    """
+    Send heartbeats for a lease until stopped
+
+    Args:
+        client: CoordinatorClient
+        lease_id: Lease to keep alive
+        interval: Seconds between heartbeats
+        stop: threading.Event that ends the loop
+    """
+    while not stop.wait(interval):
+        try:
+            if not client.heartbeat(lease_id):
+                return
+        except (urllib.error.URLError, OSError):
+            pass
@@ -0,0 +1,177 @@
+# Read-only snapshot of the page parts the manual accessibility checks look at
+# Collected in one script call, so the checks can run in Python without touching the browser
+
+import time
+from dataclasses import dataclass
+
+from selenium.webdriver.common.by import By
+from src.core.axe_scripts import DOM_SNAPSHOT_SCRIPT
+from src.core.results import DEFAULT_MAX_HTML_LENGTH
+
+
+class _Frozen:
+    """
+    Base for the frozen snapshot classes, so they can be pickled
+
+    Frozen dataclasses with __slots__ can't restore their fields the
+    default way, so they are rebuilt through the constructor.
+    """
+    __slots__ = ()
+
+    def __reduce__(self):
+        return (self.__class__, tuple(getattr(self, name) for name in self.__slots__))
+
+
+@dataclass(frozen=True)
+class ElementLocator(_Frozen):
+    """
+    Where to find an element again, kept in results instead of a live WebElement
+
+    Holds no driver reference, so results with locators can be pickled, cached
+    and sent between processes. The element is only looked up by resolve().
+    """
+    __slots__ = ('selector', 'html')
+
+    selector: str
+    html: str
+
+    def resolve(self, driver):
+        """
+        Find the element on the page the driver is showing now
+
+        Args:
+            driver: WebDriver instance
+
+        Returns:
+            WebElement, or None if nothing matches the selector any more
+        """
+        elements = driver.find_elements(By.CSS_SELECTOR, self.selector)
+        return elements[0] if elements else None
+
+
+@dataclass(frozen=True)
+class ImageInfo(_Frozen):
+    """
+    An <img> element
+    """
+    __slots__ = ('has_alt', 'alt', 'selector', 'html')
+
+    has_alt: bool
+    alt: str
+    selector: str
+    html: str
+
+
+@dataclass(frozen=True)
+class FieldInfo(_Frozen):
+    """
+    A form field, with the label that names it (label_source is None without one)
+    """
+    __slots__ = ('id', 'label_source', 'label', 'selector', 'html')
+
+    id: str
+    label_source: str
+    label: str
+    selector: str
+    html: str
+
+
+@dataclass(frozen=True)
+class HeadingInfo(_Frozen):
+    """
+    An <h1>-<h6> element
+    """
+    __slots__ = ('level', 'text', 'selector')
+
+    level: int
+    text: str
+    selector: str
+
+
+@dataclass(frozen=True)
+class LinkInfo(_Frozen):
+    """
+    An <a href> element, with its text (or aria-label)
+    """
+    __slots__ = ('href', 'text', 'selector', 'html')
+
+    href: str
+    text: str
+    selector: str
+    html: str
+
+
+@dataclass(frozen=True)
+class TableInfo(_Frozen):
+    """
+    A <table> element, with its caption and the number of header cells and rows
+    """
+    __slots__ = ('selector', 'caption', 'header_cells', 'rows')
+
+    selector: str
+    caption: str
+    header_cells: int
+    rows: int
+
+
+@dataclass(frozen=True)
+class DomSnapshot(_Frozen):
+    """
+    Everything the manual checks need from one page, in document order
+    """
+    __slots__ = ('url', 'title', 'images', 'fields', 'headings', 'links', 'tables', 'elapsed')
+
+    url: str
+    title: str
+    images: tuple
+    fields: tuple
+    headings: tuple
+    links: tuple
+    tables: tuple
+    elapsed: float
+
+    @classmethod
+    def from_script(cls, raw, elapsed=0.0):
+        """
+        Build a snapshot from what DOM_SNAPSHOT_SCRIPT returned
+
+        Args:
+            raw: Dictionary of row lists from the script
+            elapsed: Seconds the snapshot took
+
+        Returns:
+            DomSnapshot
+        """
+        return cls(
+            raw.get('url'),
+            raw.get('title'),
+            tuple(ImageInfo(*row) for row in raw.get('images', ())),
+            tuple(FieldInfo(*row) for row in raw.get('fields', ())),
+            tuple(HeadingInfo(*row) for row in raw.get('headings', ())),
+            tuple(LinkInfo(*row) for row in raw.get('links', ())),
+            tuple(TableInfo(*row) for row in raw.get('tables', ())),
+            elapsed,
+        )
+
+    @classmethod
+    def empty(cls, url=None):
+        """
+        A snapshot with nothing in it (checks return their default results on it)
+        """
+        return cls.from_script({'url': url})
+
+
+def take_snapshot(driver, max_html_length=DEFAULT_MAX_HTML_LENGTH):
+    """
+    Take a snapshot of the current page
+
+    Args:
+        driver: WebDriver instance
+        max_html_length: Characters of element HTML to keep
+
+    Returns:
+        DomSnapshot
+    """
+    start_time = time.time()
+    raw = driver.execute_script(DOM_SNAPSHOT_SCRIPT, max_html_length)
+    return DomSnapshot.from_script(raw, time.time() - start_time)
@@ -0,0 +1,263 @@
+# Resolves the chromedriver / geckodriver binary without hitting the network
+# A local manifest remembers which driver goes with which browser version
+
+import hashlib
+import json
+import os
+import platform
+import re
+import subprocess
+import threading
+from datetime import datetime
+
+
+# Environment variables that point straight at a driver binary
+DRIVER_PATH_ENV = {
+    "chrome": "CHROMEDRIVER_PATH",
+    "firefox": "GECKODRIVER_PATH",
+}
+
+# Commands used to ask the installed browser for its version
+BROWSER_VERSION_COMMANDS = {
+    "chrome": [
+        ["google-chrome", "--version"],
+        ["google-chrome-stable", "--version"],
+        ["chromium", "--version"],
+        ["chromium-browser", "--version"],
+        ["/Applications/Google Chrome.app/Contents/MacOS/Google Chrome", "--version"],
+        ["reg", "query", r"HKEY_CURRENT_USER\Software\Google\Chrome\BLBeacon", "/v", "version"],
+    ],
+    "firefox": [
+        ["firefox", "--version"],
+        ["/Applications/Firefox.app/Contents/MacOS/firefox", "--version"],
+    ],
+}
+
+# Default manifest location, can be moved with A11Y_DRIVER_MANIFEST
+DEFAULT_MANIFEST = os.path.join(os.path.expanduser("~"), ".cache", "a11y-selenium", "drivers.json")
+
+
+def detect_browser_version(browser):
+    """
+    Ask the locally installed browser for its version
+
+    Args:
+        browser: Browser name (chrome or firefox)
+
+    Returns:
+        Version string (e.g. "120.0.6099.109") or None if it can't be detected
+    """
+    for command in BROWSER_VERSION_COMMANDS.get(browser, []):
+        try:
+            output = subprocess.run(
+                command, capture_output=True, text=True, timeout=10
+            ).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+
+        match = re.search(r"(\d+(?:\.\d+)+)", output)
+        if match:
+            return match.group(1)
+
+    return None
+
+
+def file_checksum(path):
+    """
+    Calculate the sha256 checksum of a file
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DriverResolver:
+    """
+    Finds driver binaries using explicit paths, environment overrides and a
+    local manifest, falling back to webdriver_manager only on a cache miss
+    """
+
+    def __init__(self, manifest_path=None):
+        """
+        Initialize the resolver
+
+        Args:
+            manifest_path: Where to keep the manifest JSON file
+        """
+        self.manifest_path = manifest_path or os.environ.get("A11Y_DRIVER_MANIFEST", DEFAULT_MANIFEST)
+        self._lock = threading.Lock()
+        # Paths already resolved by this process, so we only do the work once
+        self._resolved = {}
+
+    def resolve(self, browser, driver_path=None):
+        """
+        Get the driver binary path for a browser
+
+        Args:
+            browser: Browser name (chrome or firefox)
+            driver_path: Explicit driver path that overrides everything else
+
+        Returns:
+            Path to the driver binary
+        """
+        browser = browser.lower()
+
+        # 1. Explicit path or environment override
+        override = driver_path or os.environ.get(DRIVER_PATH_ENV.get(browser, ""))
+        if override:
+            return override
+
+        with self._lock:
+            if browser in self._resolved:
+                return self._resolved[browser]
+
+            # 2. Apple Silicon Macs use the Homebrew chromedriver
+            if browser == "chrome" and platform.system() == "Darwin" and platform.machine() == "arm64":
+                homebrew_path = "/opt/homebrew/bin/chromedriver"
+                if os.path.exists(homebrew_path):
+                    print("Detected Mac with Apple Silicon. Using Homebrew ChromeDriver.")
+                    self._resolved[browser] = homebrew_path
+                    return homebrew_path
+
+            # 3. Manifest entry for the installed browser version
+            version = detect_browser_version(browser)
+            if version is None:
+                # Without a version a cached driver can't be told apart from one
+                # for an older browser, so don't use or fill the manifest
+                print(f"Could not detect the {browser} version, resolving with webdriver_manager...")
+                path = self._install_driver(browser)
+                self._resolved[browser] = path
+                return path
+
+            key = f"{browser}:{version}"
+            manifest = self.load_manifest()
+            path = self._validate_entry(manifest.get(key))
+
+            # 4. Cache miss, let webdriver_manager download or locate the driver
+            if path is None:
+                print(f"No cached driver for {key}, resolving with webdriver_manager...")
+                path = self._install_driver(browser)
+                manifest[key] = self._make_entry(path)
+                self.save_manifest(manifest)
+
+            self._resolved[browser] = path
+            return path
+
+    def load_manifest(self):
+        """
+        Read the manifest from disk
+
+        Returns:
+            Dictionary of "browser:version" keys to driver entries
+        """
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_manifest(self, manifest):
+        """
+        Write the manifest to disk
+
+        Args:
+            manifest: Dictionary of driver entries
+        """
+        try:
+            os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+            # Write to a temp file first so a crash never leaves half a manifest
+            tmp_path = self.manifest_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError as e:
+            print(f"Could not save driver manifest: {e}")
+
+    def _make_entry(self, path):
+        """
+        Build a manifest entry for a driver binary
+
+        Args:
+            path: Path to the driver binary
+
+        Returns:
+            Dictionary with path, checksum and resolve time
+        """
+        stat = os.stat(path)
+        return {
+            "path": path,
+            "sha256": file_checksum(path),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "resolved_at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+    def _validate_entry(self, entry):
+        """
+        Check that a manifest entry still points at the same binary
+
+        Args:
+            entry: Manifest entry or None
+
+        Returns:
+            Driver path if the entry is valid, None otherwise
+        """
+        if not entry:
+            return None
+
+        path = entry.get("path")
+        if not path or not os.path.isfile(path):
+            return None
+
+        # Only re-hash the binary if it looks like it changed on disk
+        stat = os.stat(path)
+        if stat.st_size == entry.get("size") and stat.st_mtime == entry.get("mtime"):
+            return path
+
+        if file_checksum(path) == entry.get("sha256"):
+            return path
+
+        return None
+
+    def _install_driver(self, browser):
+        """
+        Resolve the driver with webdriver_manager (may use the network)
+
+        Args:
+            browser: Browser name (chrome or firefox)
+
+        Returns:
+            Path to the driver binary
+        """
+        if browser == "firefox":
+            from webdriver_manager.firefox import GeckoDriverManager
+            return GeckoDriverManager().install()
+
+        from webdriver_manager.chrome import ChromeDriverManager
+        return ChromeDriverManager().install()
+
+
+# Shared resolver used by setup_driver
+_default_resolver = DriverResolver()
+
+
+def resolve_driver_path(browser, driver_path=None):
+    """
+    Get the driver binary path for a browser using the shared resolver
+
+    Args:
+        browser: Browser name (chrome or firefox)
+        driver_path: Explicit driver path that overrides everything else
+
+    Returns:
+        Path to the driver binary
+    """
+    return _default_resolver.resolve(browser, driver_path)
@@ -0,0 +1,238 @@
+# Groups violations found on many pages into component issues
+# A broken shared header is then reported once with the pages it is on, not once per page
+
+import hashlib
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+from src.core.results import Impact, Node, RuleInfo, Violation, as_axe_results
+
+
+# A violation on at least this many pages counts as a shared component issue
+MIN_SHARED_PAGES = 2
+
+# What a node is recognised by across pages
+FINGERPRINT_MODES = ("target", "html")
+
+
+def normalise_target(target):
+    """
+    Normalise an axe target so the same element gives the same text on every page
+
+    Args:
+        target: axe node target (list of selectors, nested for frames and shadow DOM)
+
+    Returns:
+        Selector string with spacing around combinators made consistent
+    """
+    parts = []
+    for part in target or ():
+        selector = part if isinstance(part, str) else " >>> ".join(part)
+        selector = re.sub(r"\s*([>+~])\s*", r" \1 ", selector)
+        parts.append(" ".join(selector.split()))
+    return " | ".join(parts)
+
+
+def normalise_html(html):
+    """
+    Normalise node HTML so whitespace differences don't count
+    """
+    return " ".join((html or "").split())
+
+
+def fingerprint_node(rule_id, node, by="target"):
+    """
+    Fingerprint a violation node by its rule and element
+
+    Args:
+        rule_id: axe rule ID
+        node: Node dictionary from axe, or a Node
+        by: "target" to recognise the element by its selector, "html" by its HTML
+
+    Returns:
+        Hex fingerprint, the same on every page where the element has the problem
+    """
+    if by not in FINGERPRINT_MODES:
+        raise ValueError(f"Unknown fingerprint mode: {by}")
+    if by == "html":
+        html = node.html if isinstance(node, Node) else node.get("html")
+        return _fingerprint(rule_id, normalise_html(html))
+
+    target = node.target if isinstance(node, Node) else tuple(
+        part if isinstance(part, str) else tuple(part) for part in node.get("target") or ())
+    return _target_fingerprint(rule_id, target)
+
+
+@lru_cache(maxsize=65536)
+def _target_fingerprint(rule_id, target):
+    """
+    Fingerprint a rule and target; shared components repeat on every page, so this is cached
+    """
+    return _fingerprint(rule_id, normalise_target(target))
+
+
+def _fingerprint(rule_id, element):
+    """
+    Hash a rule ID and a normalised element description
+    """
+    return hashlib.sha1(f"{rule_id}\n{element}".encode("utf8")).hexdigest()[:16]
+
+
+@dataclass
+class ComponentIssue:
+    """
+    One violation node, with every page it was found on
+    """
+    __slots__ = ("fingerprint", "rule", "impact", "node", "pages")
+
+    fingerprint: str
+    rule: RuleInfo
+    impact: Impact
+    node: Node
+    pages: list
+
+    def to_dict(self):
+        """
+        Convert to a dictionary for JSON output
+        """
+        return {
+            "fingerprint": self.fingerprint,
+            "rule": self.rule.id,
+            "impact": self.impact.to_axe(),
+            "help": self.rule.help,
+            "helpUrl": self.rule.help_url,
+            "target": self.node.to_axe()["target"],
+            "html": self.node.html,
+            "failureSummary": self.node.failure_summary,
+            "pages": self.pages,
+        }
+
+    def to_violation(self):
+        """
+        Convert to an axe-shaped violation with this one node
+        """
+        return Violation(self.rule, self.impact, (self.node,), 1).to_axe()
+
+
+class IssueIndex:
+    """
+    Index of violation nodes across the pages of a run
+
+    Every node is stored once per fingerprint, so the index grows with the
+    number of unique issues, not with the number of pages.
+    """
+
+    def __init__(self, by="target"):
+        """
+        Initialize the index
+
+        Args:
+            by: What nodes are fingerprinted by, "target" or "html"
+        """
+        if by not in FINGERPRINT_MODES:
+            raise ValueError(f"Unknown fingerprint mode: {by}")
+        self.by = by
+        self._issues = {}
+
+    def __len__(self):
+        return len(self._issues)
+
+    def add(self, url, results):
+        """
+        Add the violations of one page
+
+        Args:
+            url: Page URL
+            results: Results from the scan (dictionary or ScanResult)
+
+        Returns:
+            Fingerprints of the page's violation nodes
+        """
+        fingerprints = []
+        for violation in self._violations(results):
+            for node in violation.nodes:
+                fingerprint = fingerprint_node(violation.id, node, self.by)
+                issue = self._issues.get(fingerprint)
+                if issue is None:
+                    issue = ComponentIssue(fingerprint, violation.rule, violation.impact, node, [])
+                    self._issues[fingerprint] = issue
+                # Count each page once, even if a node is reported twice on it
+                if not issue.pages or issue.pages[-1] != url:
+                    issue.pages.append(url)
+                fingerprints.append(fingerprint)
+        return fingerprints
+
+    def issues(self, min_pages=1):
+        """
+        Get the issues found on at least min_pages pages
+
+        Args:
+            min_pages: Pages an issue must be on
+
+        Returns:
+            List of ComponentIssue, most pages first, then most severe
+        """
+        found = [issue for issue in self._issues.values() if len(issue.pages) >= min_pages]
+        return sorted(found, key=lambda issue: (-len(issue.pages), -issue.impact, issue.rule.id))
+
+    def shared_issues(self, min_pages=MIN_SHARED_PAGES):
+        """
+        Get the issues found on several pages (shared components)
+        """
+        return self.issues(min_pages)
+
+    def page_results(self, results, min_pages=MIN_SHARED_PAGES):
+        """
+        Take the shared issues out of one page's results
+
+        Args:
+            results: Results of a page already added to the index
+            min_pages: Pages an issue must be on to be taken out
+
+        Returns:
+            (axe-shaped results with only the page's own violation nodes,
+            number of shared issue nodes taken out)
+        """
+        results = as_axe_results(results)
+        own = []
+        shared = 0
+        for violation in results.get("violations", []):
+            nodes = []
+            for node in violation.get("nodes", []):
+                # Fingerprinted like add() does, with the model's truncated HTML
+                issue = self._issues.get(fingerprint_node(violation["id"], Node.from_axe(node), self.by))
+                if issue is not None and len(issue.pages) >= min_pages:
+                    shared += 1
+                else:
+                    nodes.append(node)
+            if nodes:
+                trimmed = dict(violation, nodes=nodes)
+                if "nodeCount" in trimmed:
+                    trimmed["nodeCount"] = len(nodes)
+                own.append(trimmed)
+        return dict(results, violations=own), shared
+
+    def summary(self, min_pages=MIN_SHARED_PAGES):
+        """
+        Count the issues of the run
+
+        Returns:
+            Dictionary with unique issues, shared issues and the page
+            occurrences the shared issues account for
+        """
+        shared = self.shared_issues(min_pages)
+        return {
+            "uniqueIssues": len(self._issues),
+            "sharedIssues": len(shared),
+            "sharedOccurrences": sum(len(issue.pages) for issue in shared),
+        }
+
+    @staticmethod
+    def _violations(results):
+        """
+        Get a page's violations as Violation objects
+        """
+        if isinstance(results, dict):
+            return [Violation.from_axe(violation) for violation in results.get("violations", [])]
+        return results.violations
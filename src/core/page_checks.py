@@ -0,0 +1,184 @@
+# Manual accessibility checks that run on a DomSnapshot, and the registry they are kept in
+# New checks are added with @register_check and run by AccessibilityTestPage.run_manual_accessibility_checks()
+# and by the static pre-scanner
+
+import time
+
+from src.core.dom_snapshot import ElementLocator
+
+
+# Alt texts that say nothing about the image
+GENERIC_ALT_TEXTS = ["image", "photo", "picture", "img"]
+
+# Check name -> function taking a DomSnapshot and returning a results dictionary
+CHECKS = {}
+
+
+def register_check(name):
+    """
+    Register a check that runs on a DomSnapshot
+
+    Use as a decorator; a check with the same name replaces the old one.
+
+    Args:
+        name: Key of the check's results in run_checks()
+
+    Returns:
+        Decorator
+    """
+    def decorator(check):
+        CHECKS[name] = check
+        return check
+    return decorator
+
+
+def run_checks(snapshot, names=None):
+    """
+    Run registered checks on a snapshot and time each one
+
+    Args:
+        snapshot: DomSnapshot of the page
+        names: Checks to run (default: all registered checks)
+
+    Returns:
+        (dictionary of check name to results, dictionary of check name to seconds)
+    """
+    results = {}
+    timings = {}
+    for name in names or list(CHECKS):
+        start_time = time.time()
+        try:
+            results[name] = CHECKS[name](snapshot)
+        except Exception as e:
+            results[name] = {"error": f"Error in check {name}: {str(e)}"}
+        timings[name] = time.time() - start_time
+    return results, timings
+
+
+@register_check("image_alt_text")
+def check_image_alt_text(snapshot):
+    """
+    Check for images without alt text (WCAG 1.1.1)
+
+    Args:
+        snapshot: DomSnapshot of the page
+
+    Returns:
+        Dictionary with results
+    """
+    results = {
+        "total_images": len(snapshot.images),
+        "missing_alt": 0,
+        "empty_alt": 0,
+        "images_with_valid_alt": 0,
+        "problem_images": []
+    }
+
+    for image in snapshot.images:
+        alt = (image.alt or "").strip().lower()
+        if not alt and image.alt:
+            # axe fails whitespace-only alt rather than treating the image as decorative
+            results["missing_alt"] += 1
+            results["problem_images"].append(_problem(image, "Whitespace-only alt text"))
+        elif not alt:
+            if image.has_alt:
+                # Empty alt is ok for decorative images, but we'll count them
+                results["empty_alt"] += 1
+            else:
+                results["missing_alt"] += 1
+                results["problem_images"].append(_problem(image, "Missing alt attribute"))
+        elif alt in GENERIC_ALT_TEXTS:
+            results["missing_alt"] += 1
+            results["problem_images"].append(_problem(image, f"Generic alt text: {alt}"))
+        else:
+            results["images_with_valid_alt"] += 1
+
+    return results
+
+
+@register_check("form_labels")
+def check_form_labels(snapshot):
+    """
+    Check for form controls without labels (WCAG 3.3.2)
+
+    A field counts as labelled by <label for>, a wrapping <label>,
+    aria-label or aria-labelledby pointing at an element on the page.
+
+    Args:
+        snapshot: DomSnapshot of the page
+
+    Returns:
+        Dictionary with results, including field_labels (selector, label
+        source and text of every field)
+    """
+    results = {
+        "total_form_fields": len(snapshot.fields),
+        "fields_without_labels": 0,
+        "fields_with_labels": 0,
+        "problem_fields": [],
+        "field_labels": []
+    }
+
+    for field in snapshot.fields:
+        results["field_labels"].append({"selector": field.selector, "source": field.label_source, "label": field.label})
+
+        if field.label_source:
+            results["fields_with_labels"] += 1
+            continue
+
+        results["fields_without_labels"] += 1
+        if not field.id:
+            # If no ID, can't have a proper label
+            issue = "No ID attribute for label association"
+        else:
+            issue = f"No label found for field with ID '{field.id}'"
+        results["problem_fields"].append(_problem(field, issue))
+
+    return results
+
+
+@register_check("heading_structure")
+def check_heading_structure(snapshot):
+    """
+    Check for proper heading structure (WCAG 1.3.1)
+
+    Args:
+        snapshot: DomSnapshot of the page
+
+    Returns:
+        Dictionary with results
+    """
+    levels = [heading.level for heading in snapshot.headings]
+    results = {
+        "total_headings": len(levels),
+        "heading_levels_used": sorted(set(levels)),
+        "has_h1": 1 in levels,
+        "proper_sequence": True,
+        "issues": []
+    }
+
+    prev_level = 0
+    for i, level in enumerate(levels):
+        if i == 0 and level != 1:
+            results["proper_sequence"] = False
+            results["issues"].append(f"First heading is not h1, found h{level}")
+
+        if level > prev_level + 1 and prev_level > 0:
+            results["proper_sequence"] = False
+            results["issues"].append(f"Heading level jumped from h{prev_level} to h{level}")
+
+        prev_level = level
+
+    return results
+
+
+def _problem(element, issue):
+    """
+    Describe a problem element by its selector and HTML, with a locator to find it again
+    """
+    return {
+        "selector": element.selector,
+        "issue": issue,
+        "html": element.html,
+        "element": ElementLocator(element.selector, element.html)
+    }
@@ -0,0 +1,511 @@
+# Blocks network resources the accessibility scan doesn't need (Chrome only)
+# Uses the DevTools Network.setBlockedURLs command and reads the performance
+# log afterwards to count what was blocked. The third-party preset pauses
+# every request with the DevTools Fetch domain instead, see ThirdPartyInterceptor
+
+import ipaddress
+import json
+import math
+import threading
+import urllib.request
+from urllib.parse import urlsplit
+
+
+# Prefix older chromedrivers put in front of the DevTools target id in window handles
+WINDOW_HANDLE_PREFIX = "CDwindow-"
+
+# Performance log events the counters are built from
+COUNTED_EVENTS = ("Network.loadingFailed", "Network.loadingFinished")
+
+# Events kept per tab until it is collected; tabs that are never collected
+# would otherwise grow the buffer for the whole run
+MAX_PENDING_EVENTS = 5000
+
+# Second-level labels under a country code that are registered like a TLD
+# (example.co.uk). A short list instead of the public suffix list, so rare
+# suffixes can count two sites as one
+SHARED_SECOND_LEVEL = ("ac", "co", "com", "edu", "gov", "net", "org")
+
+# Seconds to wait for the DevTools connection of a third-party interceptor
+INTERCEPTOR_START_TIMEOUT = 10
+
+# Presets that are not URL patterns but handled by ThirdPartyInterceptor
+INTERCEPT_PRESETS = ("third-party",)
+
+# URL patterns for each preset, in Network.setBlockedURLs wildcard syntax
+BLOCK_PRESETS = {
+    "media": [
+        "*.png", "*.png?*", "*.jpg", "*.jpg?*", "*.jpeg", "*.jpeg?*",
+        "*.gif", "*.gif?*", "*.webp", "*.webp?*", "*.avif", "*.avif?*",
+        "*.mp4", "*.mp4?*", "*.webm", "*.webm?*", "*.mov", "*.mov?*",
+        "*.mp3", "*.mp3?*", "*.ogg", "*.ogg?*", "*.wav", "*.wav?*",
+    ],
+    "fonts": [
+        "*.woff", "*.woff?*", "*.woff2", "*.woff2?*",
+        "*.ttf", "*.ttf?*", "*.otf", "*.otf?*", "*.eot", "*.eot?*",
+        "*fonts.googleapis.com*", "*fonts.gstatic.com*", "*use.typekit.net*",
+    ],
+    # Known ad networks and social widgets only. Other cross-origin hosts
+    # (CDNs, APIs) are not blocked
+    "ads-social": [
+        "*doubleclick.net*", "*googlesyndication.com*", "*googleadservices.com*",
+        "*adservice.google.*", "*amazon-adsystem.com*", "*adnxs.com*",
+        "*criteo.com*", "*criteo.net*", "*taboola.com*", "*outbrain.com*",
+        "*connect.facebook.net*", "*platform.twitter.com*", "*platform.linkedin.com*",
+        "*disqus.com*", "*addthis.com*", "*sharethis.com*",
+    ],
+    # Every request to another site than the tab's page, see ThirdPartyInterceptor
+    "third-party": [],
+    "analytics": [
+        "*google-analytics.com*", "*googletagmanager.com*", "*analytics.google.com*",
+        "*hotjar.com*", "*segment.com*", "*segment.io*", "*mixpanel.com*",
+        "*newrelic.com*", "*nr-data.net*", "*clarity.ms*", "*fullstory.com*",
+        "*quantserve.com*", "*scorecardresearch.com*", "*optimizely.com*",
+    ],
+}
+
+# Rules whose results can change when a preset is active
+PRESET_AFFECTED_RULES = {
+    # Missing images/video change layout and what text sits on top of
+    "media": ["color-contrast", "no-autoplay-audio", "video-caption", "audio-caption"],
+    # Fallback fonts change text size and overlap
+    "fonts": ["color-contrast"],
+    # Widgets and embeds injected by blocked scripts are missing from the DOM
+    "ads-social": ["frame-title", "region", "link-name", "button-name", "image-alt", "label"],
+    # Tag managers often inject consent banners and chat widgets
+    "analytics": ["frame-title", "region", "link-name", "button-name"],
+    # All of the above can come from another site (CDN images and fonts too)
+    "third-party": ["color-contrast", "frame-title", "region", "link-name", "button-name", "image-alt", "label",
+                    "video-caption", "audio-caption"],
+}
+
+
+class ResourceBlocker:
+    """
+    Blocks requests matching URL patterns and keeps per-run counters
+
+    Create one per run, pass it to setup_driver(resource_blocker=...) and
+    every scan on that driver is annotated with what was blocked.
+    """
+
+    def __init__(self, presets=None, patterns=None):
+        """
+        Initialize the blocker
+
+        Args:
+            presets: List of preset names from BLOCK_PRESETS
+            patterns: Extra URL patterns to block
+        """
+        self.presets = list(presets or [])
+        unknown = [p for p in self.presets if p not in BLOCK_PRESETS]
+        if unknown:
+            raise ValueError(f"Unknown block presets: {', '.join(unknown)}")
+
+        self.patterns = []
+        for preset in self.presets:
+            self.patterns.extend(BLOCK_PRESETS[preset])
+        self.patterns.extend(patterns or [])
+
+        # Counters for the whole run
+        self.totals = {"blockedRequests": 0, "transferredBytes": 0, "blockedByType": {}}
+        self._attached_windows = set()
+        # Target id -> ThirdPartyInterceptor of that tab
+        self._interceptors = {}
+        # The performance log is shared by all tabs and emptied on every read,
+        # so events of other tabs wait here until their page is collected
+        self._pending_events = {}
+
+    @property
+    def affected_rules(self):
+        """
+        Rule IDs whose results could change because of blocking
+        """
+        rules = set()
+        for preset in self.presets:
+            rules.update(PRESET_AFFECTED_RULES.get(preset, []))
+        if self.patterns and not self.presets:
+            # Custom patterns only: we can't tell what they break
+            rules.add("*")
+        return sorted(rules)
+
+    def configure_options(self, options):
+        """
+        Enable the network performance log needed for the counters
+
+        Args:
+            options: ChromeOptions to update before the browser starts
+        """
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+
+    def attach(self, driver):
+        """
+        Turn on blocking for the driver's current window
+
+        DevTools commands apply to one window, so call this again after
+        opening a new tab.
+
+        Args:
+            driver: Chrome WebDriver instance
+        """
+        handle = driver.current_window_handle
+        if handle in self._attached_windows:
+            return
+
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.patterns})
+        if any(preset in INTERCEPT_PRESETS for preset in self.presets):
+            websocket_url, version = devtools_endpoint(driver)
+            interceptor = ThirdPartyInterceptor(websocket_url, version, target_id(handle))
+            interceptor.start()
+            self._interceptors[interceptor.target_id] = interceptor
+        self._attached_windows.add(handle)
+
+        # Let tab schedulers and scanners find the blocker from the driver
+        driver.resource_blocker = self
+
+    def detach(self, handle):
+        """
+        Forget a tab that is about to be closed
+
+        Stops its third-party interceptor and drops its buffered log events.
+
+        Args:
+            handle: Window handle of the tab
+        """
+        self._attached_windows.discard(handle)
+        self._pending_events.pop(target_id(handle), None)
+        interceptor = self._interceptors.pop(target_id(handle), None)
+        if interceptor is not None:
+            interceptor.stop()
+
+    def close(self):
+        """
+        Stop every third-party interceptor (their connections close with the browser anyway)
+        """
+        for interceptor in self._interceptors.values():
+            interceptor.stop()
+        self._interceptors.clear()
+        self._attached_windows.clear()
+        self._pending_events.clear()
+
+    def collect(self, driver):
+        """
+        Count blocked requests of the current tab since the last call and add them to the totals
+
+        Args:
+            driver: Chrome WebDriver instance
+
+        Returns:
+            Dictionary with the counters for this page
+        """
+        try:
+            entries = driver.get_log("performance")
+        except Exception:
+            # Logging wasn't enabled for this session
+            entries = []
+
+        for entry in entries:
+            try:
+                logged = json.loads(entry["message"])
+                message = logged["message"]
+            except (KeyError, ValueError):
+                continue
+            if message.get("method") in COUNTED_EVENTS:
+                events = self._pending_events.setdefault(logged.get("webview"), [])
+                events.append(message)
+                if len(events) > MAX_PENDING_EVENTS:
+                    del events[:-MAX_PENDING_EVENTS]
+
+        current = target_id(driver.current_window_handle)
+        # Events without a webview come from chromedrivers that don't record it
+        messages = self._pending_events.pop(current, []) + self._pending_events.pop(None, [])
+        page = count_blocked_requests(messages)
+
+        interceptor = self._interceptors.get(current)
+        if interceptor is not None:
+            for resource_type, count in interceptor.take_counts().items():
+                page["blockedRequests"] += count
+                page["blockedByType"][resource_type] = page["blockedByType"].get(resource_type, 0) + count
+
+        self.totals["blockedRequests"] += page["blockedRequests"]
+        self.totals["transferredBytes"] += page["transferredBytes"]
+        for resource_type, count in page["blockedByType"].items():
+            by_type = self.totals["blockedByType"]
+            by_type[resource_type] = by_type.get(resource_type, 0) + count
+
+        return page
+
+    def annotate(self, driver, results):
+        """
+        Add blocking counters and possibly affected rules to scan results
+
+        Args:
+            driver: Chrome WebDriver instance
+            results: Results from axe scan (updated in place)
+
+        Returns:
+            The updated results
+        """
+        if not results:
+            return results
+
+        affected = self.affected_rules
+        found_rules = {
+            item.get('id')
+            for key in ('violations', 'incomplete', 'passes')
+            for item in results.get(key, [])
+        }
+
+        info = self.collect(driver)
+        info["presets"] = self.presets
+        # Only flag rules that actually ran on this page
+        info["affectedRules"] = sorted(found_rules) if "*" in affected else sorted(found_rules.intersection(affected))
+        results["resourceBlocking"] = info
+        return results
+
+
+class ThirdPartyInterceptor:
+    """
+    Fails every request to another site than the tab's top-level page
+
+    Network.setBlockedURLs only matches URL patterns, so the third-party
+    preset pauses each request with the DevTools Fetch domain and decides
+    per request. The tab's page is the last main-frame document it loaded.
+    Each interceptor listens on its own DevTools connection in a background
+    thread. Every request waits for that round trip, which costs a little
+    load time on pages with many requests.
+    """
+
+    def __init__(self, websocket_url, devtools_version, target_id):
+        """
+        Initialize the interceptor
+
+        Args:
+            websocket_url: Browser DevTools websocket URL
+            devtools_version: Chrome major version, picks Selenium's DevTools bindings
+            target_id: DevTools target id of the tab (also its main frame id)
+        """
+        self.websocket_url = websocket_url
+        self.devtools_version = devtools_version
+        self.target_id = target_id
+        self.page_url = None
+        self.error = None
+        self._blocked = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread = None
+        self._cancel_scope = None
+        self._trio_token = None
+
+    def should_block(self, url, resource_type, frame_id):
+        """
+        Decide on a paused request and count it if it is blocked
+
+        Args:
+            url: Request URL
+            resource_type: DevTools resource type (Document, Script, Image, ...)
+            frame_id: Frame that made the request
+
+        Returns:
+            True if the request is to another site than the tab's page
+        """
+        if resource_type == "Document" and frame_id == self.target_id:
+            # A top-level navigation is never blocked, it defines the site
+            self.page_url = url
+            return False
+        if not is_third_party(url, self.page_url):
+            return False
+        with self._lock:
+            self._blocked[resource_type] = self._blocked.get(resource_type, 0) + 1
+        return True
+
+    def take_counts(self):
+        """
+        Get the blocked requests by resource type since the last call
+
+        Returns:
+            Dictionary of resource type to count
+        """
+        with self._lock:
+            counts, self._blocked = self._blocked, {}
+        return counts
+
+    def start(self):
+        """
+        Connect to DevTools and start intercepting requests
+
+        Raises:
+            RuntimeError: If the interception could not be set up
+        """
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        if not self._ready.wait(INTERCEPTOR_START_TIMEOUT) or self.error:
+            self.stop()
+            raise RuntimeError(f"Could not intercept third-party requests: {self.error or 'timed out'}")
+
+    def stop(self):
+        """
+        Stop intercepting (requests are released when the connection closes)
+        """
+        if self._cancel_scope is None:
+            return
+        import trio
+
+        try:
+            trio.from_thread.run_sync(self._cancel_scope.cancel, trio_token=self._trio_token)
+        except (RuntimeError, trio.RunFinishedError):
+            # The event loop already ended with the browser connection
+            pass
+        self._cancel_scope = None
+
+    def _run(self):
+        """
+        Thread body: run the listener in its own trio event loop
+        """
+        import trio
+
+        try:
+            trio.run(self._listen)
+        except Exception as e:
+            self.error = e
+        finally:
+            self._ready.set()
+
+    async def _listen(self):
+        """
+        Answer Fetch.requestPaused events until stopped or the browser goes away
+        """
+        import trio
+        from selenium.webdriver.common.bidi import cdp
+
+        devtools = cdp.import_devtools(self.devtools_version)
+        async with cdp.open_cdp(self.websocket_url) as connection:
+            async with connection.open_session(devtools.target.TargetID(self.target_id)) as session:
+                with trio.CancelScope() as scope:
+                    self._cancel_scope = scope
+                    self._trio_token = trio.lowlevel.current_trio_token()
+                    # Listen before enabling, a dropped event would leave its request paused
+                    events = session.listen(devtools.fetch.RequestPaused, buffer_size=math.inf)
+                    await session.execute(devtools.fetch.enable(
+                        patterns=[devtools.fetch.RequestPattern(url_pattern="*")]
+                    ))
+                    self._ready.set()
+
+                    async for event in events:
+                        if self.should_block(event.request.url, event.resource_type.value, event.frame_id):
+                            await session.execute(devtools.fetch.fail_request(
+                                event.request_id, devtools.network.ErrorReason.BLOCKED_BY_CLIENT
+                            ))
+                        else:
+                            await session.execute(devtools.fetch.continue_request(event.request_id))
+
+
+def target_id(handle):
+    """
+    Turn a window handle into the DevTools target id of the tab
+
+    Args:
+        handle: WebDriver window handle
+
+    Returns:
+        Target id string
+    """
+    return handle[len(WINDOW_HANDLE_PREFIX):] if handle.startswith(WINDOW_HANDLE_PREFIX) else handle
+
+
+def devtools_endpoint(driver):
+    """
+    Find the DevTools websocket of a Chrome session
+
+    Args:
+        driver: Chrome WebDriver instance
+
+    Returns:
+        (websocket URL, Chrome major version) tuple
+    """
+    address = driver.capabilities["goog:chromeOptions"]["debuggerAddress"]
+    with urllib.request.urlopen(f"http://{address}/json/version", timeout=10) as response:
+        info = json.loads(response.read())
+    version = info.get("Browser", "").split("/")[-1].split(".")[0]
+    return info["webSocketDebuggerUrl"], version
+
+
+def registrable_domain(host):
+    """
+    Get the part of a host name a site registers (www.shop.example.co.uk -> example.co.uk)
+
+    Args:
+        host: Host name or IP address
+
+    Returns:
+        Registrable domain (IP addresses and single labels are returned as they are)
+    """
+    host = (host or "").lower().rstrip(".")
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+        return host
+    except ValueError:
+        pass
+
+    labels = host.split(".")
+    if len(labels) > 2 and len(labels[-1]) == 2 and labels[-2] in SHARED_SECOND_LEVEL:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def is_third_party(url, page_url):
+    """
+    Check if a request goes to another site than the page
+
+    Args:
+        url: Request URL
+        page_url: URL of the top-level page (None before the first navigation)
+
+    Returns:
+        True for http(s) and ws(s) requests to another registrable domain.
+        data:, blob: and other local URLs are never third-party
+    """
+    request = urlsplit(url)
+    if request.scheme not in ("http", "https", "ws", "wss") or not page_url:
+        return False
+    return registrable_domain(request.hostname) != registrable_domain(urlsplit(page_url).hostname)
+
+
+def count_blocked_requests(messages):
+    """
+    Count blocked requests and transferred bytes in DevTools network events
+
+    Args:
+        messages: Network event messages ({"method": ..., "params": ...})
+
+    Returns:
+        Dictionary with blockedRequests, transferredBytes and blockedByType
+    """
+    page = {"blockedRequests": 0, "transferredBytes": 0, "blockedByType": {}}
+    for message in messages:
+        params = message.get("params", {})
+        if message.get("method") == "Network.loadingFailed" and params.get("blockedReason") == "inspector":
+            resource_type = params.get("type", "Other")
+            page["blockedRequests"] += 1
+            page["blockedByType"][resource_type] = page["blockedByType"].get(resource_type, 0) + 1
+        elif message.get("method") == "Network.loadingFinished":
+            page["transferredBytes"] += int(params.get("encodedDataLength", 0))
+    return page
+
+
+def annotate_blocked_resources(driver, results):
+    """
+    Annotate scan results if the driver was set up with a ResourceBlocker
+
+    Args:
+        driver: WebDriver instance
+        results: Results from axe scan
+
+    Returns:
+        The (possibly updated) results
+    """
+    blocker = getattr(driver, "resource_blocker", None)
+    if blocker is None:
+        return results
+    return blocker.annotate(driver, results)
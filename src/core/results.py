@@ -0,0 +1,315 @@
+# Compact typed model for axe results
+# Keeps what the reports need, with rule texts shared between all pages of a run
+
+import sys
+from dataclasses import dataclass
+from enum import IntEnum
+
+
+# Characters of node HTML kept per node
+DEFAULT_MAX_HTML_LENGTH = 300
+
+# Top-level axe keys that are turned into fields (the rest goes into ScanResult.extra)
+RESULT_LISTS = ('violations', 'incomplete', 'passes', 'inapplicable')
+
+# Engine details axe repeats on every page, not kept
+AXE_METADATA_KEYS = ('testEngine', 'testRunner', 'testEnvironment', 'toolOptions')
+
+# Check lists of a node, kept as (id, impact, message) tuples
+CHECK_LISTS = ('any', 'all', 'none')
+
+
+class Impact(IntEnum):
+    """
+    axe impact levels, ordered so they can be compared
+    """
+    NONE = 0
+    MINOR = 1
+    MODERATE = 2
+    SERIOUS = 3
+    CRITICAL = 4
+
+    @classmethod
+    def from_axe(cls, value):
+        """
+        Convert an axe impact string (or None) to an Impact
+        """
+        return cls[value.upper()] if value else cls.NONE
+
+    def to_axe(self):
+        """
+        Convert back to the axe impact string (None for NONE)
+        """
+        return None if self is Impact.NONE else self.name.lower()
+
+
+def _intern(value):
+    """
+    Intern a string so equal strings share one object (None passes through)
+    """
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+@dataclass(frozen=True)
+class RuleInfo:
+    """
+    Texts describing an axe rule, shared by every result for that rule
+    """
+    __slots__ = ('id', 'description', 'help', 'help_url', 'tags')
+
+    id: str
+    description: str
+    help: str
+    help_url: str
+    tags: tuple
+
+    def __reduce__(self):
+        # Frozen slotted dataclasses can't be unpickled field by field, and an
+        # unpickled rule should be the shared one of the receiving process
+        return (_shared_rule_info, (self.id, self.description, self.help, self.help_url, self.tags))
+
+
+# (id, description, help, helpUrl, tags) -> RuleInfo
+_rule_infos = {}
+
+
+def rule_info(raw):
+    """
+    Get the shared RuleInfo for a raw axe rule result
+
+    Args:
+        raw: Rule result dictionary from axe
+
+    Returns:
+        RuleInfo, the same object for every page with the same rule texts
+    """
+    key = (raw.get('id'), raw.get('description'), raw.get('help'), raw.get('helpUrl'), tuple(raw.get('tags', ())))
+    info = _rule_infos.get(key)
+    if info is None:
+        info = RuleInfo(*(_intern(value) for value in key[:4]), tuple(_intern(tag) for tag in key[4]))
+        _rule_infos[key] = info
+    return info
+
+
+# (id, impact, message) -> the shared tuple for that check result
+_check_infos = {}
+
+
+def check_info(raw):
+    """
+    Get the shared (id, impact, message) tuple for a raw axe check result
+
+    Args:
+        raw: Check dictionary from a node's any/all/none list
+
+    Returns:
+        Tuple, the same object for every node with the same check result
+    """
+    key = (raw.get('id'), raw.get('impact'), raw.get('message'))
+    info = _check_infos.get(key)
+    if info is None:
+        info = tuple(_intern(value) for value in key)
+        _check_infos[key] = info
+    return info
+
+
+def _shared_rule_info(rule_id, description, help, help_url, tags):
+    """
+    Get the shared RuleInfo for rule texts (used when unpickling)
+    """
+    return rule_info({'id': rule_id, 'description': description, 'help': help, 'helpUrl': help_url, 'tags': tags})
+
+
+@dataclass
+class Node:
+    """
+    One element a rule found something on
+
+    checks holds the node's any, all and none check results, each a tuple
+    of shared (id, impact, message) tuples.
+    """
+    __slots__ = ('target', 'html', 'impact', 'failure_summary', 'checks')
+
+    target: tuple
+    html: str
+    impact: Impact
+    failure_summary: str
+    checks: tuple
+
+    @classmethod
+    def from_axe(cls, raw, max_html_length=DEFAULT_MAX_HTML_LENGTH):
+        """
+        Convert a raw axe node
+
+        Args:
+            raw: Node dictionary from axe
+            max_html_length: Characters of HTML to keep (None keeps all of it)
+
+        Returns:
+            Node
+        """
+        html = raw.get('html') or ''
+        if max_html_length is not None and len(html) > max_html_length:
+            html = html[:max_html_length] + '...'
+
+        # Targets in frames or shadow DOM are lists of selectors
+        target = tuple(
+            _intern(part) if isinstance(part, str) else tuple(part)
+            for part in raw.get('target', ())
+        )
+        checks = tuple(tuple(check_info(check) for check in raw.get(kind) or ()) for kind in CHECK_LISTS)
+        return cls(target, html, Impact.from_axe(raw.get('impact')), _intern(raw.get('failureSummary')), checks)
+
+    def to_axe(self):
+        """
+        Convert back to an axe node dictionary
+
+        Check results come back with their id, impact and message. Their
+        data and relatedNodes are not kept, and node HTML may be truncated.
+        """
+        raw = {
+            'html': self.html,
+            'target': [part if isinstance(part, str) else list(part) for part in self.target],
+            'impact': self.impact.to_axe(),
+            'failureSummary': self.failure_summary,
+        }
+        for kind, checks in zip(CHECK_LISTS, self.checks):
+            raw[kind] = [{'id': check_id, 'impact': impact, 'message': message}
+                         for check_id, impact, message in checks]
+        return raw
+
+
+@dataclass
+class Violation:
+    """
+    Result of one rule on a page
+
+    Used for incomplete, passed and inapplicable rules too; those usually
+    keep only their node count.
+    """
+    __slots__ = ('rule', 'impact', 'nodes', 'node_count')
+
+    rule: RuleInfo
+    impact: Impact
+    nodes: tuple
+    node_count: int
+
+    @property
+    def id(self):
+        """
+        Rule ID
+        """
+        return self.rule.id
+
+    @classmethod
+    def from_axe(cls, raw, keep_nodes=True, max_html_length=DEFAULT_MAX_HTML_LENGTH):
+        """
+        Convert a raw axe rule result
+
+        Args:
+            raw: Rule result dictionary from axe
+            keep_nodes: Keep the nodes or only count them
+            max_html_length: Characters of node HTML to keep
+
+        Returns:
+            Violation
+        """
+        raw_nodes = raw.get('nodes', [])
+        nodes = tuple(Node.from_axe(node, max_html_length) for node in raw_nodes) if keep_nodes else ()
+        # Compact scans send a count instead of the nodes
+        node_count = raw.get('nodeCount', len(raw_nodes))
+        return cls(rule_info(raw), Impact.from_axe(raw.get('impact')), nodes, node_count)
+
+    def to_axe(self):
+        """
+        Convert back to an axe rule result dictionary
+        """
+        raw = {
+            'id': self.rule.id,
+            'impact': self.impact.to_axe(),
+            'tags': list(self.rule.tags),
+            'description': self.rule.description,
+            'help': self.rule.help,
+            'helpUrl': self.rule.help_url,
+            'nodes': [node.to_axe() for node in self.nodes],
+        }
+        if self.node_count != len(self.nodes):
+            raw['nodeCount'] = self.node_count
+        return raw
+
+
+@dataclass
+class ScanResult:
+    """
+    Results of one scan
+
+    Violations and incomplete rules keep their nodes, passed and
+    inapplicable rules only their node counts. scanStats goes into stats and
+    other framework entries (resourceBlocking, partial, frames...) into extra.
+    """
+    __slots__ = ('url', 'timestamp', 'violations', 'incomplete', 'passes', 'inapplicable', 'stats', 'extra')
+
+    url: str
+    timestamp: str
+    violations: tuple
+    incomplete: tuple
+    passes: tuple
+    inapplicable: tuple
+    stats: dict
+    extra: dict
+
+    @classmethod
+    def from_axe(cls, raw, max_html_length=DEFAULT_MAX_HTML_LENGTH):
+        """
+        Convert raw axe results
+
+        Args:
+            raw: Results dictionary from axe (or AccessibilityScanner)
+            max_html_length: Characters of node HTML to keep
+
+        Returns:
+            ScanResult
+        """
+        def convert(key, keep_nodes):
+            return tuple(Violation.from_axe(rule, keep_nodes, max_html_length) for rule in raw.get(key, []))
+
+        extra = {
+            key: value for key, value in raw.items()
+            if key not in RESULT_LISTS and key not in AXE_METADATA_KEYS
+            and key not in ('url', 'timestamp', 'scanStats')
+        }
+        return cls(
+            raw.get('url'),
+            raw.get('timestamp'),
+            convert('violations', True),
+            convert('incomplete', True),
+            convert('passes', False),
+            convert('inapplicable', False),
+            raw.get('scanStats') or {},
+            extra,
+        )
+
+    def to_axe(self):
+        """
+        Convert back to an axe-shaped results dictionary
+        """
+        raw = {'url': self.url, 'timestamp': self.timestamp}
+        for key in RESULT_LISTS:
+            raw[key] = [rule.to_axe() for rule in getattr(self, key)]
+        if self.stats:
+            raw['scanStats'] = self.stats
+        raw.update(self.extra)
+        return raw
+
+
+def as_axe_results(results):
+    """
+    Get axe-shaped results from either a ScanResult or a raw dictionary
+
+    Args:
+        results: ScanResult, raw results dictionary or None
+
+    Returns:
+        Raw results dictionary (or None)
+    """
+    return results.to_axe() if isinstance(results, ScanResult) else results
@@ -0,0 +1,172 @@
+# On-disk cache of axe results keyed by a fingerprint of the page
+# Unchanged pages return their stored results without running axe again
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "a11y-selenium", "scans")
+
+# 200 MB is a few thousand uncompacted results
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+def make_cache_key(fingerprint, context, options, extra=None):
+    """
+    Build the cache key for a scan
+
+    Args:
+        fingerprint: Result of DOM_FINGERPRINT_SCRIPT (DOM hash, axe version, viewport)
+        context: Scan context
+        options: Dictionary of axe options
+        extra: Anything else that changes the results (e.g. compact settings)
+
+    Returns:
+        Hex digest to use as the cache key
+    """
+    material = json.dumps([fingerprint, context, options, extra], sort_keys=True, default=str)
+    return hashlib.sha256(material.encode("utf8")).hexdigest()
+
+
+class ScanCache:
+    """
+    Content-addressed store of scan results, one JSON file per key
+
+    Least recently used entries are evicted once the directory grows past
+    max_bytes. A hit touches the file, so the modification time doubles as
+    the last-used time and several processes can share one directory.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialize the cache
+
+        Args:
+            cache_dir: Directory to keep the results in
+            max_bytes: Size the directory is trimmed back to when it grows past it
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        # Counters for this process
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._size = sum(size for _, size, _ in self._entries())
+
+    def get(self, key):
+        """
+        Look up the results stored for a key
+
+        Args:
+            key: Cache key from make_cache_key()
+
+        Returns:
+            Stored results, or None on a miss
+        """
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf8") as f:
+                results = json.load(f)
+            # Mark as recently used
+            os.utime(path)
+        except (OSError, ValueError):
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        return results
+
+    def put(self, key, results):
+        """
+        Store results under a key, evicting old entries if needed
+
+        Args:
+            key: Cache key from make_cache_key()
+            results: JSON-serialisable scan results
+        """
+        data = json.dumps(results).encode("utf8")
+
+        # Write to a temporary file first so readers never see half an entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"Could not store scan results in cache: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        self.stats["stores"] += 1
+        self._size += len(data)
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def clear(self):
+        """
+        Remove every stored entry
+        """
+        for path, _, _ in self._entries():
+            path.unlink(missing_ok=True)
+        self._size = 0
+
+    def summary(self):
+        """
+        Hit/miss counters for run summaries
+
+        Returns:
+            Dictionary with hits, misses, stores, evictions and hit rate
+        """
+        lookups = self.stats["hits"] + self.stats["misses"]
+        summary = dict(self.stats)
+        summary["hitRate"] = round(self.stats["hits"] / lookups, 3) if lookups else 0.0
+        return summary
+
+    def _path(self, key):
+        """
+        File that holds the entry for a key
+        """
+        return self.cache_dir / f"{key}.json"
+
+    def _entries(self):
+        """
+        List the stored entries
+
+        Returns:
+            List of (path, size, mtime) tuples
+        """
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                # Removed by another process in the meantime
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict(self):
+        """
+        Delete least recently used entries until the cache fits again
+        """
+        # Other processes may share the directory, so look at what is really there
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        size = sum(size for _, size, _ in entries)
+
+        # Trim to 90% so every store after a full cache doesn't evict again
+        target = self.max_bytes * 0.9
+        for path, entry_size, _ in entries:
+            if size <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            size -= entry_size
+            self.stats["evictions"] += 1
+
+        self._size = size
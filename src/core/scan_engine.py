@@ -0,0 +1,415 @@
+# Direct scan engine that runs axe scans without going through pytest
+# URLs are spread over several worker processes, each with its own browser
+
+import json
+import multiprocessing
+import os
+import queue
+import re
+import time
+from pathlib import Path
+
+from src.core.accessibility_scanner import AccessibilityScanner, DEFAULT_SCAN_BUDGET
+from src.core.issue_index import MIN_SHARED_PAGES, IssueIndex
+from src.core.resource_blocker import ResourceBlocker
+from src.core.results import ScanResult
+from src.core.scan_cache import DEFAULT_MAX_BYTES, ScanCache
+from src.core.webdriver_manager import setup_driver, teardown_driver
+from src.pages.base_page import BasePage
+from src.utils.dashboard import create_dashboard
+from src.utils.report_utils import COMPONENT_REPORT_FILE, generate_component_report, generate_simple_report
+
+
+# Scan records of a run, one JSON object per line, next to the reports
+RESULTS_FILE = "results.jsonl"
+
+# axe tags for each WCAG conformance level
+WCAG_LEVEL_TAGS = {
+    "A": ["wcag2a"],
+    "AA": ["wcag2a", "wcag2aa"],
+    "AAA": ["wcag2a", "wcag2aa", "wcag2aaa"],
+}
+
+
+def save_record(record, results_file):
+    """
+    Append a scan record to a JSON lines results file
+
+    Args:
+        record: Scan record with results as a dictionary
+        results_file: Path to the results file
+    """
+    with open(results_file, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def load_records(results_file):
+    """
+    Read the scan records of a run from its JSON lines results file
+
+    Args:
+        results_file: Path written by a direct scan or a coordinator
+
+    Returns:
+        List of scan records (the last one wins if a URL is in the file twice)
+    """
+    records = {}
+    with open(results_file) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                records[record["url"]] = record
+    return list(records.values())
+
+
+def build_axe_options(wcag_level="AA", rules=None, rule_timings=False):
+    """
+    Build axe options for a WCAG level or a list of rules
+
+    Args:
+        wcag_level: WCAG level to test (A, AA or AAA)
+        rules: Optional list of rule IDs, overrides the WCAG level
+        rule_timings: Record how long each rule takes (axe performanceTimer)
+
+    Returns:
+        Dictionary of axe options
+    """
+    if rules:
+        options = {'runOnly': {'type': 'rule', 'values': list(rules)}}
+    else:
+        options = {'runOnly': {'type': 'tag', 'values': WCAG_LEVEL_TAGS.get(wcag_level, WCAG_LEVEL_TAGS["AA"])}}
+
+    if rule_timings:
+        options['performanceTimer'] = True
+    return options
+
+
+def page_report_name(url):
+    """
+    Turn a URL into the report file name used by the test suite
+
+    Args:
+        url: Page URL
+
+    Returns:
+        File name such as accessibility_www.example.com.html
+    """
+    if url.startswith("file://"):
+        slug = Path(url).name
+    else:
+        slug = url.replace('https://', '').replace('http://', '').replace('/', '_')
+    # Keep file names portable
+    slug = re.sub(r'[^A-Za-z0-9._-]', '_', slug)
+    return f"accessibility_{slug}.html"
+
+
+def scan_page(driver, url, context=None, options=None, budget=DEFAULT_SCAN_BUDGET, cache=None):
+    """
+    Open a page and run an axe scan on it
+
+    Args:
+        driver: WebDriver instance
+        url: URL to scan
+        context: CSS selector to limit scan scope
+        options: Dictionary of axe options
+        budget: Seconds the scan may take before falling back to a partial scan
+        cache: Optional ScanCache to reuse results of unchanged pages
+
+    Returns:
+        Dictionary with url, results, error and elapsed seconds
+    """
+    started = time.time()
+    record = {"url": url, "results": None, "error": None}
+
+    try:
+        BasePage(driver).open(url)
+        # Results are shipped between processes, so only keep violation details
+        scanner = AccessibilityScanner(driver, compact=True, cache=cache)
+        scanner.inject_axe()
+        # A time budget keeps one pathological page from stalling the worker
+        record["results"] = scanner.run_async_scan(context=context, options=options, budget=budget)
+        if record["results"] is None:
+            record["error"] = "axe scan returned no results"
+    except Exception as e:
+        record["error"] = str(e)
+
+    record["elapsed"] = time.time() - started
+    return record
+
+
+def _worker_main(worker_id, browser, headless, context, options, task_queue, result_queue, block=None,
+                 cache_dir=None, cache_max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Worker process: scan URLs from the task queue with a private browser
+
+    Args:
+        worker_id: Number of this worker
+        browser: Browser to use
+        headless: Run in headless mode or not
+        context: CSS selector to limit scan scope
+        options: Dictionary of axe options
+        task_queue: Queue of URLs (None means stop)
+        result_queue: Queue the scan records are sent back on
+        block: Optional list of resource blocking presets
+        cache_dir: Optional scan cache directory (shared by all workers)
+        cache_max_bytes: Size cap for the scan cache
+    """
+    driver = None
+    try:
+        blocker = ResourceBlocker(block) if block else None
+        cache = ScanCache(cache_dir, cache_max_bytes) if cache_dir else None
+        driver = setup_driver(browser, headless, resource_blocker=blocker)
+        driver.set_window_size(1366, 768)
+
+        for url in iter(task_queue.get, None):
+            result_queue.put(("result", worker_id, scan_page(driver, url, context, options, cache=cache)))
+    except Exception as e:
+        result_queue.put(("error", worker_id, str(e)))
+    finally:
+        teardown_driver(driver)
+        result_queue.put(("done", worker_id, None))
+
+
+def iter_parallel_scan(urls, workers=2, browser="chrome", headless=True, context=None, options=None,
+                       block=None, cache_dir=None, cache_max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Scan URLs in parallel, yielding each page record as it comes back
+
+    Args:
+        urls: List of URLs to scan
+        workers: Number of worker processes (one browser each)
+        browser: Browser to use
+        headless: Run in headless mode or not
+        context: CSS selector to limit scan scope
+        options: Dictionary of axe options
+        block: Optional list of resource blocking presets
+        cache_dir: Optional scan cache directory (shared by all workers)
+        cache_max_bytes: Size cap for the scan cache
+
+    Yields:
+        Scan records from scan_page(), in completion order
+    """
+    urls = list(urls)
+    workers = max(1, min(int(workers), len(urls) or 1))
+
+    # Spawn gives every worker a clean interpreter without inherited browser handles
+    mp = multiprocessing.get_context("spawn")
+    task_queue = mp.Queue()
+    result_queue = mp.Queue()
+
+    for url in urls:
+        task_queue.put(url)
+    for _ in range(workers):
+        task_queue.put(None)
+
+    processes = [
+        mp.Process(
+            target=_worker_main,
+            args=(i, browser, headless, context, options, task_queue, result_queue, block,
+                  cache_dir, cache_max_bytes),
+            daemon=True,
+        )
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    finished = set()
+    seen = set()
+    try:
+        while len(finished) < workers:
+            try:
+                kind, worker_id, payload = result_queue.get(timeout=1)
+            except queue.Empty:
+                # Notice workers that died without saying goodbye
+                for i, process in enumerate(processes):
+                    if i not in finished and not process.is_alive() and result_queue.empty():
+                        print(f"Worker {i} exited unexpectedly (exit code {process.exitcode})")
+                        finished.add(i)
+                continue
+
+            if kind == "result":
+                seen.add(payload["url"])
+                yield payload
+            elif kind == "error":
+                print(f"Worker {worker_id} failed: {payload}")
+            elif kind == "done":
+                finished.add(worker_id)
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    # Anything a dead worker never got to is reported as a failure
+    for url in urls:
+        if url not in seen:
+            seen.add(url)
+            yield {"url": url, "results": None, "error": "not scanned (worker failed)", "elapsed": 0.0}
+
+
+def run_parallel_scan(urls, workers=2, browser="chrome", headless=True, context=None, options=None,
+                      output_dir="reports", block=None, cache_dir=None, cache_max_bytes=DEFAULT_MAX_BYTES,
+                      baseline=None):
+    """
+    Scan URLs in parallel, write a report per page and one dashboard
+
+    Args:
+        urls: List of URLs to scan
+        workers: Number of worker processes (one browser each)
+        browser: Browser to use
+        headless: Run in headless mode or not
+        context: CSS selector to limit scan scope
+        options: Dictionary of axe options
+        output_dir: Directory for the reports
+        block: Optional list of resource blocking presets
+        cache_dir: Optional scan cache directory (shared by all workers)
+        cache_max_bytes: Size cap for the scan cache
+        baseline: Optional BaselineStore to count new violations against
+
+    Returns:
+        Dictionary with the page records and the run summary. The records
+        are also written to results.jsonl in output_dir
+    """
+    started = time.time()
+    records = []
+
+    # Raw records are kept on disk so the run can be accepted as a baseline later
+    os.makedirs(output_dir, exist_ok=True)
+    results_file = os.path.join(output_dir, RESULTS_FILE)
+    open(results_file, "w").close()
+
+    for record in iter_parallel_scan(urls, workers, browser, headless, context, options, block,
+                                     cache_dir, cache_max_bytes):
+        records.append(record)
+        save_record(record, results_file)
+
+        if record["error"]:
+            print(f"[{len(records)}/{len(urls)}] {record['url']}: ERROR {record['error']}")
+            continue
+
+        violations = record["results"].get('violations', [])
+        print(f"[{len(records)}/{len(urls)}] {record['url']}: {len(violations)} violations ({record['elapsed']:.1f}s)")
+
+        # Big runs keep every page in memory until the reports are written
+        record["results"] = ScanResult.from_axe(record["results"])
+
+    # Reports are written by the parent only, after all workers are done
+    summary = write_run_reports(records, output_dir, {
+        "Workers": max(1, min(int(workers), len(urls) or 1)),
+        "Elapsed": f"{time.time() - started:.1f}s",
+    }, baseline=baseline)
+
+    return {"records": records, "summary": summary}
+
+
+def aggregate_rule_timings(records):
+    """
+    Add up per-rule axe timings over all pages of a run
+
+    Args:
+        records: Scan records from scan_page()
+
+    Returns:
+        List of {rule, total, mean, max, pages} dictionaries, slowest total first
+    """
+    totals = {}
+    for record in records:
+        results = record["results"]
+        if isinstance(results, ScanResult):
+            stats = results.stats
+        else:
+            stats = (results or {}).get("scanStats") or {}
+        timings = stats.get("ruleTimings") or {}
+        for rule, seconds in timings.items():
+            entry = totals.setdefault(rule, {"rule": rule, "total": 0.0, "max": 0.0, "pages": 0})
+            entry["total"] += seconds
+            entry["max"] = max(entry["max"], seconds)
+            entry["pages"] += 1
+
+    for entry in totals.values():
+        entry["mean"] = entry["total"] / entry["pages"]
+    return sorted(totals.values(), key=lambda entry: entry["total"], reverse=True)
+
+
+def write_run_reports(records, output_dir="reports", extra_summary=None, min_shared_pages=MIN_SHARED_PAGES,
+                      baseline=None):
+    """
+    Write a report for every scanned page and one dashboard for the run
+
+    Violations found on several pages (a shared header, say) are taken out
+    of the page reports and written once to the component issues report.
+
+    Args:
+        records: Scan records from scan_page() (results as dictionaries or ScanResult)
+        output_dir: Directory for the reports
+        extra_summary: Optional extra dashboard summary entries
+        min_shared_pages: Pages a violation must be on to count as a shared issue
+        baseline: Optional BaselineStore; violations not in it are counted as
+            new and listed in new_violations.json
+
+    Returns:
+        Run summary dictionary shown on the dashboard
+    """
+    blocking = []
+    cached = []
+    index = IssueIndex()
+    new_violations = {}
+    for record in records:
+        if not record["results"]:
+            continue
+        index.add(record["url"], record["results"])
+        if baseline is not None:
+            page_new = baseline.new_violations(record["url"], record["results"])
+            if page_new:
+                new_violations[record["url"]] = page_new
+        results = record["results"]
+        extra = results.extra if isinstance(results, ScanResult) else results
+        stats = results.stats if isinstance(results, ScanResult) else results.get("scanStats", {})
+        if "resourceBlocking" in extra:
+            blocking.append(extra["resourceBlocking"])
+        if "cached" in stats:
+            cached.append(stats["cached"])
+
+    for record in records:
+        if not record["results"]:
+            continue
+        # Expanded one page at a time so the whole run is never held as dicts
+        results, shared = index.page_results(record["results"], min_shared_pages)
+        generate_simple_report(results, os.path.join(output_dir, page_report_name(record["url"])), shared)
+
+    shared_issues = index.shared_issues(min_shared_pages)
+    generate_component_report(shared_issues, os.path.join(output_dir, COMPONENT_REPORT_FILE))
+    with open(os.path.join(output_dir, "component_issues.json"), "w") as f:
+        json.dump([issue.to_dict() for issue in shared_issues], f, indent=2)
+
+    summary = {
+        "Pages scanned": len(records),
+        "Pages failed": sum(1 for record in records if record["error"]),
+    }
+
+    # Resource blocking counters are per page, add them up for the run
+    if blocking:
+        summary["Blocked requests"] = sum(b["blockedRequests"] for b in blocking)
+        summary["Transferred MB"] = round(sum(b["transferredBytes"] for b in blocking) / 1e6, 1)
+
+    # Each worker has its own cache counters, so count hits from the results
+    if cached:
+        summary["Cache hits"] = sum(cached)
+        summary["Cache misses"] = len(cached) - sum(cached)
+        summary["Cache hit rate"] = f"{sum(cached) / len(cached):.0%}"
+
+    issue_counts = index.summary(min_shared_pages)
+    summary["Unique issues"] = issue_counts["uniqueIssues"]
+    summary["Shared issues"] = issue_counts["sharedIssues"]
+
+    if baseline is not None:
+        summary["New violations"] = sum(len(page_new) for page_new in new_violations.values())
+        summary["Pages with new violations"] = len(new_violations)
+        with open(os.path.join(output_dir, "new_violations.json"), "w") as f:
+            json.dump(new_violations, f, indent=2)
+    summary.update(extra_summary or {})
+
+    create_dashboard(output_dir, os.path.join(output_dir, "dashboard.html"), run_summary=summary,
+                     rule_timings=aggregate_rule_timings(records), component_issues=shared_issues)
+    return summary
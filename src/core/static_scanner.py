@@ -0,0 +1,314 @@
+# Browser-free pre-scanner that checks raw HTML for common problems
+# Used to triage many pages quickly before deciding which ones get a full browser scan
+# Runs the same registered checks as the browser, on a DomSnapshot built from the HTML
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+
+from src.core.dom_snapshot import DomSnapshot, FieldInfo, HeadingInfo, ImageInfo, LinkInfo, TableInfo
+from src.core.page_checks import run_checks
+
+
+# Form controls checked for labels, like the DOM snapshot's "input, select, textarea"
+FORM_FIELD_TAGS = ("input", "select", "textarea")
+
+HEADING_TAGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+
+# Elements that can't have content, so they are never left open
+VOID_TAGS = frozenset(("area", "base", "br", "col", "embed", "hr", "img", "input",
+                       "link", "meta", "param", "source", "track", "wbr"))
+
+# Elements whose text the snapshot needs (elements with an id are added too,
+# because aria-labelledby can point at them)
+TEXT_TAGS = frozenset(HEADING_TAGS + ("a", "caption", "label", "title"))
+
+# Table parts counted like table.querySelectorAll('th'), table.rows and table.caption
+TABLE_PART_TAGS = ("th", "tr", "caption")
+
+# Ids that can go in a CSS selector as they are
+PLAIN_ID = re.compile(r"^[A-Za-z_][\w-]*$")
+
+# Below this many files the process pool costs more than it saves
+MIN_FILES_PER_POOL = 50
+
+
+class StaticPageParser(HTMLParser):
+    """
+    Builds the same DomSnapshot from raw HTML that take_snapshot() reads from a browser
+
+    The document is read in one streaming pass. Selectors are built like
+    a11yCssPath() in the browser, from the open elements, and the source line
+    of every element is kept by selector. Labels and text are resolved at the
+    end because a label can come after its field.
+    """
+
+    def __init__(self):
+        """
+        Initialize the parser
+        """
+        super().__init__(convert_charrefs=True)
+        self.lines = {}
+        self._images = []
+        self._fields = []
+        self._headings = []
+        self._links = []
+        self._tables = []
+        self._labels_for = {}
+        self._ids = {}
+        self._title = None
+        self._count = 0
+        self._open = [self._new_element(None, {}, "")]
+
+    def handle_starttag(self, tag, attrs):
+        """
+        Record the elements the checks need
+        """
+        attributes = dict(attrs)
+        parent = self._open[-1]
+        parent["children"] += 1
+
+        element_id = attributes.get("id")
+        if element_id and element_id not in self._ids:
+            selector = "#" + element_id if PLAIN_ID.match(element_id) else f'[id="{element_id}"]'
+        elif parent["selector"]:
+            selector = f"{parent['selector']} > {tag}:nth-child({parent['children']})"
+        else:
+            selector = tag
+
+        element = self._new_element(tag, attributes, selector)
+        if element_id and element_id not in self._ids:
+            self._ids[element_id] = element
+        self.lines.setdefault(selector, self.getpos()[0])
+        html = self.get_starttag_text()
+
+        if tag == "img":
+            # <img alt> has an empty alt, like getAttribute() returns
+            has_alt = "alt" in attributes
+            alt = (attributes["alt"] or "") if has_alt else None
+            self._images.append(ImageInfo(has_alt, alt, selector, html))
+        elif tag in FORM_FIELD_TAGS:
+            # Hidden inputs are never shown, so they don't need a label
+            if not (tag == "input" and (attributes.get("type") or "").lower() == "hidden"):
+                self._fields.append({"element": element, "html": html, "wrapping": self._wrapping_label()})
+        elif tag == "label":
+            if attributes.get("for"):
+                self._labels_for.setdefault(attributes["for"], []).append(element)
+        elif tag in HEADING_TAGS:
+            self._headings.append(element)
+        elif tag == "a" and "href" in attributes:
+            self._links.append((element, html))
+        elif tag == "table":
+            element.update(caption=None, header_cells=0, rows=0)
+            self._tables.append(element)
+        elif tag == "title" and self._title is None:
+            self._title = element
+        elif tag in TABLE_PART_TAGS:
+            self._count_table_part(tag, element)
+
+        if tag not in VOID_TAGS:
+            self._open.append(element)
+
+    def _count_table_part(self, tag, element):
+        """
+        Count a header cell, row or caption towards the tables it is in
+        """
+        tables = [open_element for open_element in self._open if open_element["tag"] == "table"]
+        if tables:
+            if tag == "th":
+                for table in tables:
+                    table["header_cells"] += 1
+            elif tag == "tr":
+                tables[-1]["rows"] += 1
+            elif tag == "caption" and tables[-1]["caption"] is None:
+                tables[-1]["caption"] = element
+
+    def handle_endtag(self, tag):
+        """
+        Close the element, and any elements left open inside it
+        """
+        for i in range(len(self._open) - 1, 0, -1):
+            if self._open[i]["tag"] == tag:
+                del self._open[i:]
+                break
+
+    def handle_data(self, data):
+        """
+        Add text to every open element that needs it
+        """
+        for element in self._open:
+            if element["text"] is not None:
+                element["text"].append(data)
+
+    def snapshot(self):
+        """
+        Build the snapshot of everything read so far
+
+        Returns:
+            DomSnapshot (without a URL)
+        """
+        return DomSnapshot(
+            None,
+            _text(self._title) if self._title else "",
+            tuple(self._images),
+            tuple(self._field_info(field) for field in self._fields),
+            tuple(HeadingInfo(int(heading["tag"][1]), _text(heading), heading["selector"])
+                  for heading in self._headings),
+            tuple(LinkInfo(link["attrs"]["href"], _text(link) or (link["attrs"].get("aria-label") or "").strip(),
+                           link["selector"], html)
+                  for link, html in self._links),
+            tuple(TableInfo(table["selector"], _text(table["caption"]) if table["caption"] else None,
+                            table["header_cells"], table["rows"])
+                  for table in self._tables),
+            0.0,
+        )
+
+    def _new_element(self, tag, attributes, selector):
+        """
+        Keep what later steps need to know about an element
+        """
+        self._count += 1
+        collects_text = tag in TEXT_TAGS or bool(attributes.get("id"))
+        return {"tag": tag, "attrs": attributes, "selector": selector, "children": 0,
+                "order": self._count, "text": [] if collects_text else None}
+
+    def _wrapping_label(self):
+        """
+        The open <label> that labels the field starting now, if any
+
+        A label without "for" labels the first field inside it only.
+        """
+        for element in reversed(self._open):
+            if element["tag"] == "label":
+                if element["attrs"].get("for") or element.get("wrapped"):
+                    return None
+                element["wrapped"] = True
+                return element
+        return None
+
+    def _field_info(self, field):
+        """
+        Resolve the label of a field the way fieldLabel() does in the browser
+        """
+        element = field["element"]
+        attrs = element["attrs"]
+        field_id = attrs.get("id")
+
+        labelled_by = [self._ids[ref] for ref in (attrs.get("aria-labelledby") or "").split() if ref in self._ids]
+        aria_label = (attrs.get("aria-label") or "").strip()
+        # label[for] only names the first element with that id
+        labels = list(self._labels_for.get(field_id, ())) if self._ids.get(field_id) is element else []
+        if field["wrapping"] is not None:
+            labels = sorted(labels + [field["wrapping"]], key=lambda label: label["order"])
+
+        if labelled_by:
+            source, label = "aria-labelledby", " ".join(_text(ref) for ref in labelled_by)
+        elif aria_label:
+            source, label = "aria-label", aria_label
+        elif labels:
+            source, label = "label", " ".join(_text(label) for label in labels)
+        else:
+            source, label = None, ""
+        return FieldInfo(field_id or None, source, label, element["selector"], field["html"])
+
+
+def _text(element):
+    """
+    Text of an element with whitespace collapsed, like text() in the snapshot script
+    """
+    return " ".join("".join(element["text"]).split())
+
+
+def _add_lines(results, lines):
+    """
+    Add the source line to every problem in the check results
+    """
+    for result in results.values():
+        for value in result.values():
+            if isinstance(value, list):
+                for problem in value:
+                    if isinstance(problem, dict) and "element" in problem:
+                        problem["line"] = lines.get(problem.get("selector"))
+
+
+def scan_html(html):
+    """
+    Run every registered check on an HTML document
+
+    Args:
+        html: HTML source
+
+    Returns:
+        Dictionary of check name to results, like
+        AccessibilityTestPage.run_manual_accessibility_checks() (problems also
+        have the source "line"), plus issue_count
+    """
+    parser = StaticPageParser()
+    parser.feed(html)
+    parser.close()
+
+    results, _ = run_checks(parser.snapshot())
+    _add_lines(results, parser.lines)
+    results["issue_count"] = (
+        results["image_alt_text"].get("missing_alt", 0)
+        + results["form_labels"].get("fields_without_labels", 0)
+        + len(results["heading_structure"].get("issues", []))
+    )
+    return results
+
+
+def scan_file(path):
+    """
+    Run every static check on an HTML file
+
+    Args:
+        path: Path to the HTML file
+
+    Returns:
+        Results from scan_html(), or a dictionary with "error"
+    """
+    try:
+        with open(path, encoding="utf8", errors="replace") as f:
+            return scan_html(f.read())
+    except OSError as e:
+        return {"error": str(e), "issue_count": 0}
+
+
+def scan_files(paths, workers=None):
+    """
+    Scan many HTML files, spread over a process pool
+
+    Args:
+        paths: Paths to HTML files
+        workers: Number of processes (default: one per CPU)
+
+    Returns:
+        Dictionary of path to results
+    """
+    paths = list(paths)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(paths) < MIN_FILES_PER_POOL:
+        return {path: scan_file(path) for path in paths}
+
+    # Big chunks keep the inter-process overhead small next to the parsing
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(paths, pool.map(scan_file, paths, chunksize=chunksize)))
+
+
+def triage(results, min_issues=1):
+    """
+    Pick the pages worth a full browser scan
+
+    Args:
+        results: Dictionary of path to results from scan_files()
+        min_issues: Static issues a page needs to be picked
+
+    Returns:
+        Paths with at least min_issues issues (or a read error), most issues first
+    """
+    picked = [path for path, result in results.items()
+              if result.get("error") or result["issue_count"] >= min_issues]
+    return sorted(picked, key=lambda path: results[path]["issue_count"], reverse=True)
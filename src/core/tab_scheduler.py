@@ -0,0 +1,330 @@
+# Scans several pages per browser by spreading them over multiple tabs
+# While one tab is still loading, another tab that is ready gets scanned
+
+import time
+from collections import deque
+
+from src.core.accessibility_scanner import AccessibilityScanner
+from src.core.webdriver_manager import setup_driver, teardown_driver
+from src.pages.base_page import BasePage
+
+
+class TabScheduler:
+    """
+    Runs accessibility scans for a list of URLs using K tabs in one browser
+
+    Navigation is started in every free tab without waiting for it to finish.
+    The scheduler then visits the tabs in turn and scans each page as soon as
+    it has loaded, so network and render time in one tab overlaps with axe
+    running in another.
+    """
+
+    def __init__(self, driver, tabs=4, page_timeout=30, poll_interval=0.05, new_tabs=False,
+                 compact=False, viewports=None):
+        """
+        Initialize the scheduler
+
+        Args:
+            driver: WebDriver instance to open the tabs in
+            tabs: Number of tabs to use at the same time
+            page_timeout: Seconds to wait for a page to load before giving up
+            poll_interval: Seconds to sleep when no tab is ready yet
+            new_tabs: Leave the tabs that are already open alone. Fresh tabs
+                are opened for the scan and closed again when it is done
+            compact: Scan in compact mode (see AccessibilityScanner)
+            viewports: Optional dictionary of URL to (width, height). The tab
+                emulates that viewport while the URL is loaded and scanned
+                (Chrome only)
+        """
+        self.driver = driver
+        self.tabs = max(1, int(tabs))
+        self.page_timeout = page_timeout
+        self.poll_interval = poll_interval
+        self.new_tabs = new_tabs
+        self.compact = compact
+        self.viewports = viewports or {}
+
+        # Per-URL timings from the last run: {"load": seconds, "scan": seconds}
+        self.page_timings = {}
+        self.stats = {}
+
+    def scan_urls(self, urls, context=None, options=None):
+        """
+        Scan all URLs and collect the results
+
+        Args:
+            urls: List of URLs to scan
+            context: CSS selector to limit scan scope
+            options: Dictionary of axe options
+
+        Returns:
+            Dictionary of URL to axe results (None if the page failed)
+        """
+        return dict(self.iter_scan(urls, context, options))
+
+    def iter_scan(self, urls, context=None, options=None, while_loading=None):
+        """
+        Scan all URLs, yielding each result as soon as it is ready
+
+        Args:
+            urls: List of URLs to scan
+            context: CSS selector to limit scan scope
+            options: Dictionary of axe options
+            while_loading: Optional callable run in the original window once
+                every tab has started loading, to use the wait for other work
+
+        Yields:
+            (url, results) tuples in completion order
+        """
+        pending = deque(urls)
+        if not pending:
+            self.page_timings = {}
+            self.stats = dict(_throughput_stats(0, 0.0), tabs=0)
+            return
+
+        origin = self.driver.current_window_handle
+        handles = self._open_tabs(min(self.tabs, len(pending)))
+        try:
+            yield from self._scan_tabs(handles, pending, context, options, origin, while_loading)
+        finally:
+            if self.new_tabs:
+                self._close_tabs(handles)
+                self.driver.switch_to.window(origin)
+
+    def _scan_tabs(self, handles, pending, context, options, origin, while_loading):
+        """
+        Visit the tabs in turn and scan each page once it has loaded
+
+        Args:
+            handles: Window handles to use
+            pending: Deque of URLs still to scan
+            context: CSS selector to limit scan scope
+            options: Dictionary of axe options
+            origin: Window handle that was active before the scan
+            while_loading: Optional callable run once all tabs are loading
+
+        Yields:
+            (url, results) tuples in completion order
+        """
+        # Each tab keeps its own page object, which tracks that tab's navigation
+        pages = {handle: BasePage(self.driver) for handle in handles}
+        scanner = AccessibilityScanner(self.driver, compact=self.compact)
+
+        # handle -> (url, navigation start time)
+        active = {}
+        self.page_timings = {}
+        started = time.time()
+        scanned = 0
+
+        # Start loading a page in every tab
+        for handle in handles:
+            if not pending:
+                break
+            active[handle] = self._start(handle, pending.popleft(), pages[handle])
+
+        if while_loading is not None:
+            self.driver.switch_to.window(origin)
+            while_loading()
+
+        while active:
+            progressed = False
+
+            for handle in list(active):
+                url, nav_started = active[handle]
+                self.driver.switch_to.window(handle)
+
+                try:
+                    loaded = pages[handle].is_loaded()
+                except Exception:
+                    # The document can be swapped out between switch and script
+                    loaded = False
+
+                timed_out = time.time() - nav_started > self.page_timeout
+                if not loaded and not timed_out:
+                    continue
+
+                progressed = True
+                load_time = time.time() - nav_started
+                results = None
+
+                if loaded:
+                    scan_started = time.time()
+                    try:
+                        scanner.inject_axe()
+                        results = scanner.run_custom_scan(context=context, options=options)
+                    except Exception as e:
+                        print(f"Error scanning {url}: {e}")
+                    self.page_timings[url] = {"load": load_time, "scan": time.time() - scan_started}
+                else:
+                    print(f"Timed out loading {url} after {self.page_timeout} seconds")
+                    self.page_timings[url] = {"load": load_time, "scan": 0.0}
+
+                scanned += 1
+                yield url, results
+
+                # Reuse the tab for the next URL
+                if pending:
+                    active[handle] = self._start(handle, pending.popleft(), pages[handle])
+                else:
+                    del active[handle]
+
+            if not progressed:
+                time.sleep(self.poll_interval)
+
+        elapsed = time.time() - started
+        self.stats = _throughput_stats(scanned, elapsed, browsers=1)
+        self.stats["tabs"] = len(handles)
+
+    def _open_tabs(self, count):
+        """
+        Make sure the browser has `count` tabs open
+
+        Args:
+            count: Number of tabs needed
+
+        Returns:
+            List of window handles to use
+        """
+        handles = [] if self.new_tabs else list(self.driver.window_handles)
+        blocker = getattr(self.driver, "resource_blocker", None)
+        while len(handles) < count:
+            self.driver.switch_to.new_window("tab")
+            handles.append(self.driver.current_window_handle)
+            # DevTools blocking is per window, so new tabs need it too
+            if blocker is not None:
+                blocker.attach(self.driver)
+        return handles[:max(1, count)]
+
+    def _close_tabs(self, handles):
+        """
+        Close tabs opened for this scan
+
+        Args:
+            handles: Window handles to close
+        """
+        blocker = getattr(self.driver, "resource_blocker", None)
+        for handle in handles:
+            try:
+                if blocker is not None:
+                    blocker.detach(handle)
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            except Exception as e:
+                print(f"Could not close tab: {e}")
+
+    def _start(self, handle, url, page):
+        """
+        Start navigating a tab to a URL without waiting for it
+
+        Args:
+            handle: Window handle of the tab
+            url: URL to open
+            page: BasePage of the tab
+
+        Returns:
+            (url, start time) tuple
+        """
+        self.driver.switch_to.window(handle)
+        if self.viewports and hasattr(self.driver, "execute_cdp_cmd"):
+            self._emulate_viewport(self.viewports.get(url))
+        page.open(url, wait=False)
+        return url, time.time()
+
+    def _emulate_viewport(self, size):
+        """
+        Give the current tab its own viewport size, or clear the one it had
+
+        Args:
+            size: (width, height) in CSS pixels, or None for the window size
+        """
+        if size and all(size):
+            width, height = size
+            self.driver.execute_cdp_cmd("Emulation.setDeviceMetricsOverride", {
+                "width": int(width), "height": int(height), "deviceScaleFactor": 0, "mobile": False
+            })
+        else:
+            self.driver.execute_cdp_cmd("Emulation.clearDeviceMetricsOverride", {})
+
+
+def _throughput_stats(pages, elapsed, browsers=1):
+    """
+    Build a throughput summary
+
+    Args:
+        pages: Number of pages scanned
+        elapsed: Wall clock time in seconds
+        browsers: Number of browser processes used
+
+    Returns:
+        Dictionary with pages, elapsed and pages per browser per minute
+    """
+    per_minute = (pages / elapsed * 60 / browsers) if elapsed > 0 else 0.0
+    return {
+        "pages": pages,
+        "elapsed": round(elapsed, 2),
+        "pages_per_browser_minute": round(per_minute, 1),
+    }
+
+
+def scan_one_page_per_session(urls, browser="chrome", headless=True, context=None, options=None):
+    """
+    Scan URLs the way the test suite does: a new browser for every page
+
+    Args:
+        urls: List of URLs to scan
+        browser: Browser to use
+        headless: Run in headless mode or not
+        context: CSS selector to limit scan scope
+        options: Dictionary of axe options
+
+    Returns:
+        Throughput summary dictionary
+    """
+    started = time.time()
+    for url in urls:
+        driver = setup_driver(browser, headless)
+        try:
+            BasePage(driver).open(url)
+            scanner = AccessibilityScanner(driver)
+            scanner.inject_axe()
+            scanner.run_custom_scan(context=context, options=options)
+        finally:
+            teardown_driver(driver)
+
+    # Every page gets its own browser, so per-browser throughput is per page
+    return _throughput_stats(len(urls), time.time() - started, browsers=1)
+
+
+def compare_throughput(urls, tabs=4, browser="chrome", headless=True, context=None, options=None):
+    """
+    Compare the tab scheduler against one page per browser session
+
+    Args:
+        urls: List of URLs to scan
+        tabs: Number of tabs for the scheduler
+        browser: Browser to use
+        headless: Run in headless mode or not
+        context: CSS selector to limit scan scope
+        options: Dictionary of axe options
+
+    Returns:
+        Dictionary with "single_session" and "tabs" throughput summaries
+    """
+    baseline = scan_one_page_per_session(urls, browser, headless, context, options)
+
+    driver = setup_driver(browser, headless)
+    try:
+        scheduler = TabScheduler(driver, tabs=tabs)
+        scheduler.scan_urls(urls, context, options)
+    finally:
+        teardown_driver(driver)
+
+    comparison = {"single_session": baseline, "tabs": scheduler.stats}
+    if baseline["pages_per_browser_minute"]:
+        comparison["speedup"] = round(
+            scheduler.stats["pages_per_browser_minute"] / baseline["pages_per_browser_minute"], 2
+        )
+
+    print(f"One page per session: {baseline['pages_per_browser_minute']} pages/browser/minute")
+    print(f"{scheduler.stats['tabs']} tabs per session: {scheduler.stats['pages_per_browser_minute']} pages/browser/minute")
+    return comparison
@@ -1,23 +1,27 @@
 # This is the main file for our webdriver setup
 # It handles browser setup and configuration
 
-import os
-import platform
+import atexit
+import queue
 import sys
+import threading
+import time
+from contextlib import contextmanager
 from selenium import webdriver
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.firefox.service import Service as FirefoxService
+from src.core.driver_resolver import resolve_driver_path
 
 
-def setup_driver(browser="chrome", headless=False):
+def setup_driver(browser="chrome", headless=False, driver_path=None, resource_blocker=None):
     """
     Setup and configure WebDriver
     
     Args:
         browser: Browser to use (chrome or firefox)
         headless: Run in headless mode or not
+        driver_path: Explicit driver binary path (skips driver resolution)
+        resource_blocker: Optional ResourceBlocker to apply (Chrome only)
     
     Returns:
         WebDriver instance
@@ -34,25 +38,23 @@ def setup_driver(browser="chrome", headless=False):
         options.add_argument("--no-sandbox")
         options.add_argument("--disable-dev-shm-usage")
         options.add_argument("--disable-gpu")
+        
+        if resource_blocker:
+            resource_blocker.configure_options(options)
 
         try:
-            # For Mac with Apple Silicon (M1/M2/M3)
-            if platform.system() == "Darwin" and platform.machine() == "arm64":
-                print("Detected Mac with Apple Silicon. Setting up appropriate ChromeDriver.")
-                # Use Chrome driver directly without webdriver_manager
-                # Try to find the chromedriver binary directly 
-                chrome_service = ChromeService("/opt/homebrew/bin/chromedriver")
-                driver = webdriver.Chrome(service=chrome_service, options=options)
-            else:
-                # Standard setup for other platforms
-                chrome_service = ChromeService(ChromeDriverManager().install())
-                driver = webdriver.Chrome(service=chrome_service, options=options)
+            # Driver path comes from the local manifest unless overridden
+            chrome_service = ChromeService(resolve_driver_path("chrome", driver_path))
+            driver = webdriver.Chrome(service=chrome_service, options=options)
+            
+            if resource_blocker:
+                resource_blocker.attach(driver)
             
             return driver
         except Exception as e:
             print(f"Error setting up Chrome: {e}")
             print("Trying Firefox instead...")
-            return setup_driver("firefox", headless)
+            return setup_driver("firefox", headless, resource_blocker=resource_blocker)
     
     elif browser.lower() == "firefox":
         # Setup Firefox options
@@ -62,9 +64,13 @@ def setup_driver(browser="chrome", headless=False):
         if headless:
             options.add_argument("--headless")
         
+        if resource_blocker:
+            print("Resource blocking is only supported on Chrome, loading all resources.")
+        
         try:
             # Setup and return the driver
-            driver = webdriver.Firefox(service=FirefoxService(GeckoDriverManager().install()), options=options)
+            firefox_service = FirefoxService(resolve_driver_path("firefox", driver_path))
+            driver = webdriver.Firefox(service=firefox_service, options=options)
             return driver
         except Exception as e:
             print(f"Error setting up Firefox: {e}")
@@ -74,7 +80,7 @@ def setup_driver(browser="chrome", headless=False):
     else:
         # If we get an unsupported browser, default to Chrome
         print(f"Browser {browser} not supported. Using Chrome instead.")
-        return setup_driver("chrome", headless)
+        return setup_driver("chrome", headless, driver_path, resource_blocker)
 
 
 def teardown_driver(driver):
@@ -85,4 +91,247 @@ def teardown_driver(driver):
         driver: WebDriver instance to clean up
     """
     if driver:
-        driver.quit()
\ No newline at end of file
+        driver.quit()
+
+
+class DriverPool:
+    """
+    Pool of warm WebDriver sessions that are leased out and returned
+
+    Starting a browser is the slowest part of a scan, so the pool keeps up
+    to `size` sessions alive and hands them out one at a time. Every session
+    is reset (cookies, storage, extra windows, about:blank) when it comes
+    back so the next lease starts from a clean state.
+    """
+
+    def __init__(self, size=2, browser="chrome", headless=False, window_size=(1366, 768), **driver_kwargs):
+        """
+        Initialize the pool (browsers are started lazily on first lease)
+
+        Args:
+            size: Maximum number of browser sessions to keep
+            browser: Browser to use (chrome or firefox)
+            headless: Run in headless mode or not
+            window_size: (width, height) restored on every lease
+            driver_kwargs: Extra keyword arguments passed to setup_driver
+        """
+        self.size = max(1, int(size))
+        self.browser = browser
+        self.headless = headless
+        self.window_size = window_size
+        self.driver_kwargs = driver_kwargs
+
+        self._idle = queue.Queue()
+        self._drivers = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+        # Make sure browsers don't outlive the process if close() is never called
+        atexit.register(self.close)
+
+    def warm_up(self, count=None):
+        """
+        Start browser sessions ahead of time
+
+        Args:
+            count: Number of sessions to start (defaults to the pool size)
+        """
+        count = self.size if count is None else min(count, self.size)
+        while len(self._drivers) < count:
+            driver = self._create_driver()
+            if driver is None:
+                break
+            self._idle.put(driver)
+
+    def lease(self, timeout=None):
+        """
+        Take a browser session out of the pool
+
+        Args:
+            timeout: Seconds to wait for a free session (None waits forever)
+
+        Returns:
+            WebDriver instance
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self._closed:
+                raise RuntimeError("DriverPool is closed")
+
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                driver = None
+            if driver is not None:
+                return driver
+
+            # Start a new browser if we are still below the pool size
+            driver = self._create_driver()
+            if driver is not None:
+                return driver
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise TimeoutError(f"No WebDriver session became free within {timeout} seconds")
+            try:
+                driver = self._idle.get(timeout=remaining)
+            except queue.Empty:
+                raise TimeoutError(f"No WebDriver session became free within {timeout} seconds")
+            if driver is not None:
+                return driver
+            # None means a discarded session freed its slot, go round and start a replacement
+
+    def release(self, driver):
+        """
+        Reset a leased session and put it back into the pool
+
+        Args:
+            driver: WebDriver instance returned by lease()
+        """
+        if driver is None:
+            return
+
+        if self._closed:
+            self._discard(driver)
+            return
+
+        try:
+            reset_driver_state(driver, self.window_size)
+        except Exception as e:
+            # A session that can't be reset is probably dead, replace it later
+            print(f"Discarding WebDriver session that failed to reset: {e}")
+            self._discard(driver)
+            return
+
+        self._idle.put(driver)
+
+    @contextmanager
+    def session(self, timeout=None):
+        """
+        Lease a session for the duration of a with-block
+
+        Args:
+            timeout: Seconds to wait for a free session
+
+        Yields:
+            WebDriver instance
+        """
+        driver = self.lease(timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def close(self):
+        """
+        Quit every browser session owned by the pool
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            drivers = [driver for driver in self._drivers if driver is not None]
+            self._drivers.clear()
+
+        # Let the pool be garbage collected once it is closed
+        atexit.unregister(self.close)
+
+        for driver in drivers:
+            try:
+                teardown_driver(driver)
+            except Exception as e:
+                print(f"Error closing WebDriver session: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _create_driver(self):
+        """
+        Start a new session if the pool has room for one
+
+        Returns:
+            WebDriver instance or None if the pool is full
+        """
+        with self._lock:
+            if len(self._drivers) >= self.size:
+                return None
+            # Reserve the slot before the slow browser start
+            self._drivers.append(None)
+
+        try:
+            driver = setup_driver(self.browser, self.headless, **self.driver_kwargs)
+            driver.set_window_size(*self.window_size)
+        except BaseException:
+            with self._lock:
+                self._drivers.remove(None)
+            raise
+
+        with self._lock:
+            self._drivers[self._drivers.index(None)] = driver
+        return driver
+
+    def _discard(self, driver):
+        """
+        Quit a session and free its slot in the pool
+
+        Args:
+            driver: WebDriver instance to drop
+        """
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+        try:
+            teardown_driver(driver)
+        except Exception:
+            pass
+
+        # Wake a lease() waiting for a session so it starts the replacement
+        self._idle.put(None)
+
+
+def reset_driver_state(driver, window_size=None):
+    """
+    Clear cookies, storage and extra windows so a session can be reused
+
+    Args:
+        driver: WebDriver instance to reset
+        window_size: Optional (width, height) to restore
+    """
+    # Close any extra tabs/windows and go back to the first one
+    handles = driver.window_handles
+    blocker = getattr(driver, "resource_blocker", None)
+    for handle in handles[1:]:
+        if blocker is not None:
+            blocker.detach(handle)
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
+
+    # axe registered for new documents (inject_axe(frames=True)) would load
+    # into every page the next lease opens
+    script_ids = getattr(driver, "axe_script_ids", None) or {}
+    script_id = script_ids.get(handles[0])
+    if script_id:
+        driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": script_id})
+    script_ids.clear()
+
+    # Storage can only be cleared from the page's own origin
+    driver.execute_script(
+        "try { window.localStorage.clear(); } catch (e) {}"
+        "try { window.sessionStorage.clear(); } catch (e) {}"
+    )
+
+    if hasattr(driver, "execute_cdp_cmd"):
+        # Chrome can clear cookies and cache for every origin in one go
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+    else:
+        driver.delete_all_cookies()
+
+    driver.get("about:blank")
+
+    if window_size:
+        driver.set_window_size(*window_size)
@@ -1,11 +1,21 @@
 # Custom page object for testing demo pages
 # This extends the BasePage class with specific methods for accessibility testing
 
+import time
+
+from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
+from src.core.axe_scripts import TAB_FOCUS_STEP_SCRIPT, TAB_SEQUENCE_SCRIPT
+from src.core.dom_snapshot import DomSnapshot, take_snapshot
+from src.core.page_checks import CHECKS, run_checks
 from src.pages.base_page import BasePage
 
 
+# Places in the computed tab order that are checked with a real key press
+DEFAULT_TAB_SAMPLE = 10
+
+
 class AccessibilityTestPage(BasePage):
     """
     Page object for accessibility testing with additional methods
@@ -26,10 +36,111 @@ class AccessibilityTestPage(BasePage):
             "tables": (By.TAG_NAME, "table"),
         }
     
-    def test_keyboard_navigation(self):
+    def test_keyboard_navigation(self, mode="computed", sample=DEFAULT_TAB_SAMPLE):
         """
         Test keyboard navigation (WCAG 2.1.1)
         
+        The computed mode works out the whole tab order in one script and
+        only presses Tab to confirm a sample of it and look for traps. The
+        keys mode presses Tab once per element, up to 50 elements.
+        
+        Args:
+            mode: "computed" or "keys"
+            sample: Number of places in the tab order checked with a real key press (computed mode)
+        
+        Returns:
+            Dictionary with results
+        """
+        if mode == "keys":
+            return self._tab_through_with_keys()
+        if mode != "computed":
+            raise ValueError(f"Unknown keyboard navigation mode: {mode}")
+        
+        results = {
+            "can_tab_through": False,
+            "focusable_elements": 0,
+            "tab_trap": False,
+            "errors": [],
+            "tab_order": [],
+            "confirmed": 0,
+            "order_mismatches": []
+        }
+        
+        start_time = time.time()
+        try:
+            computed = self.driver.execute_script(TAB_SEQUENCE_SCRIPT)
+            sequence = computed["sequence"]
+            results["tab_order"] = sequence
+            results["focusable_elements"] = len(sequence)
+            results["can_tab_through"] = len(sequence) > 0
+            
+            if sequence:
+                self._confirm_tab_order(sequence, sample, results)
+        
+        except Exception as e:
+            results["errors"].append(f"Error during keyboard navigation test: {str(e)}")
+        
+        results["elapsed"] = time.time() - start_time
+        return results
+    
+    def _confirm_tab_order(self, sequence, sample, results):
+        """
+        Press Tab at sample places in the computed order and check where focus goes
+        
+        Each check focuses an element of the sequence, presses Tab and reads
+        the focused element, using two calls per check. Focus that stays put
+        or goes back to an earlier element counts as a tab trap; after the
+        last element, focus going anywhere but out of the page or back to the
+        first element does too.
+        
+        Args:
+            sequence: Selectors of the computed tab order
+            sample: Number of places to check
+            results: Results dictionary to fill in
+        """
+        last = len(sequence) - 1
+        count = max(1, min(sample, len(sequence)))
+        # Evenly spread over the sequence, always including the first and last element
+        places = sorted({round(i * last / max(1, count - 1)) for i in range(count)})
+        
+        actions = ActionChains(self.driver)
+        self.driver.execute_script(TAB_FOCUS_STEP_SCRIPT, places[0])
+        for i, place in enumerate(places):
+            actions.send_keys(Keys.TAB).perform()
+            next_place = places[i + 1] if i + 1 < len(places) else -1
+            focused = self.driver.execute_script(TAB_FOCUS_STEP_SCRIPT, next_place)
+            
+            if place == last:
+                # Past the last element focus leaves the page (or wraps to the first element)
+                if focused["index"] > 0:
+                    results["tab_trap"] = True
+                    results["errors"].append(f"Tab trap detected: focus went back to {sequence[focused['index']]}")
+                else:
+                    results["confirmed"] += 1
+                continue
+            
+            expected = place + 1
+            if focused["index"] == expected:
+                results["confirmed"] += 1
+                continue
+            
+            if focused["index"] >= 0:
+                actual = sequence[focused["index"]]
+            else:
+                actual = "element outside the computed order" if focused["onElement"] else None
+            results["order_mismatches"].append({
+                "after": sequence[place],
+                "expected": sequence[expected],
+                "actual": actual
+            })
+            if 0 <= focused["index"] <= place:
+                results["tab_trap"] = True
+                results["errors"].append(f"Tab trap detected after {sequence[place]}")
+    
+    def _tab_through_with_keys(self):
+        """
+        Press Tab once per element, up to 50 elements
+        
         Returns:
             Dictionary with results
         """
@@ -79,182 +190,96 @@ class AccessibilityTestPage(BasePage):
         
         return results
     
-    def check_image_alt_text(self):
+    def take_snapshot(self):
         """
-        Check for images without alt text (WCAG 1.1.1)
+        Collect the images, form fields, headings, links and tables of the page in one call
         
         Returns:
-            Dictionary with results
+            DomSnapshot the manual checks run on
         """
-        results = {
-            "total_images": 0,
-            "missing_alt": 0,
-            "empty_alt": 0,
-            "images_with_valid_alt": 0,
-            "problem_images": []
-        }
-        
-        try:
-            # Find all images
-            images = self.find_elements(*self.locators["images"])
-            results["total_images"] = len(images)
-            
-            # Check each image
-            for img in images:
-                # Check if alt attribute exists
-                if not img.get_attribute("alt"):
-                    if img.get_attribute("alt") == "":
-                        # Empty alt is ok for decorative images, but we'll count them
-                        results["empty_alt"] += 1
-                    else:
-                        # Missing alt attribute
-                        results["missing_alt"] += 1
-                        results["problem_images"].append({
-                            "element": img,
-                            "issue": "Missing alt attribute",
-                            "html": img.get_attribute("outerHTML")
-                        })
-                else:
-                    # Has alt text, check if it's just "image" or similar
-                    alt_text = img.get_attribute("alt").lower()
-                    if alt_text in ["image", "photo", "picture", "img"]:
-                        results["missing_alt"] += 1
-                        results["problem_images"].append({
-                            "element": img,
-                            "issue": f"Generic alt text: {alt_text}",
-                            "html": img.get_attribute("outerHTML")
-                        })
-                    else:
-                        results["images_with_valid_alt"] += 1
+        return take_snapshot(self.driver)
+    
+    def check_image_alt_text(self, snapshot=None):
+        """
+        Check for images without alt text (WCAG 1.1.1)
         
-        except Exception as e:
-            results["error"] = f"Error checking alt text: {str(e)}"
+        Args:
+            snapshot: DomSnapshot to check (taken now if not given)
         
-        return results
+        Returns:
+            Dictionary with results
+        """
+        return self._run_snapshot_check("image_alt_text", snapshot)
     
-    def check_form_labels(self):
+    def check_form_labels(self, snapshot=None):
         """
         Check for form controls without labels (WCAG 3.3.2)
         
+        Args:
+            snapshot: DomSnapshot to check (taken now if not given)
+        
         Returns:
             Dictionary with results
         """
-        results = {
-            "total_form_fields": 0,
-            "fields_without_labels": 0,
-            "fields_with_labels": 0,
-            "problem_fields": []
-        }
-        
-        try:
-            # Find all form fields
-            form_fields = self.find_elements(*self.locators["form_fields"])
-            results["total_form_fields"] = len(form_fields)
-            
-            # Check each field
-            for field in form_fields:
-                field_id = field.get_attribute("id")
-                
-                if not field_id:
-                    # If no ID, can't have a proper label
-                    results["fields_without_labels"] += 1
-                    results["problem_fields"].append({
-                        "element": field,
-                        "issue": "No ID attribute for label association",
-                        "html": field.get_attribute("outerHTML")
-                    })
-                    continue
-                
-                # Check if there's a label with for=id
-                label_selector = f"label[for='{field_id}']"
-                labels = self.driver.find_elements(By.CSS_SELECTOR, label_selector)
-                
-                if not labels:
-                    # No label found
-                    results["fields_without_labels"] += 1
-                    results["problem_fields"].append({
-                        "element": field,
-                        "issue": f"No label found for field with ID '{field_id}'",
-                        "html": field.get_attribute("outerHTML")
-                    })
-                else:
-                    results["fields_with_labels"] += 1
-        
-        except Exception as e:
-            results["error"] = f"Error checking form labels: {str(e)}"
-        
-        return results
+        return self._run_snapshot_check("form_labels", snapshot)
     
-    def check_heading_structure(self):
+    def check_heading_structure(self, snapshot=None):
         """
         Check for proper heading structure (WCAG 1.3.1)
         
+        Args:
+            snapshot: DomSnapshot to check (taken now if not given)
+        
         Returns:
             Dictionary with results
         """
-        results = {
-            "total_headings": 0,
-            "heading_levels_used": [],
-            "has_h1": False,
-            "proper_sequence": True,
-            "issues": []
-        }
-        
+        return self._run_snapshot_check("heading_structure", snapshot)
+    
+    def _run_snapshot_check(self, name, snapshot):
+        """
+        Run one registered check, with the default results and an error if the snapshot fails
+        """
         try:
-            # Find all headings
-            headings = self.find_elements(*self.locators["headings"])
-            results["total_headings"] = len(headings)
-            
-            # Track heading levels in order
-            heading_sequence = []
-            
-            # Check each heading
-            for heading in headings:
-                tag_name = heading.tag_name.lower()
-                level = int(tag_name[1])
-                
-                heading_sequence.append(level)
-                
-                # Track which levels are used
-                if level not in results["heading_levels_used"]:
-                    results["heading_levels_used"].append(level)
-            
-            # Sort heading levels
-            results["heading_levels_used"].sort()
-            
-            # Check if has h1
-            results["has_h1"] = 1 in results["heading_levels_used"]
-            
-            # Check sequence
-            prev_level = 0
-            for i, level in enumerate(heading_sequence):
-                if i == 0 and level != 1:
-                    results["proper_sequence"] = False
-                    results["issues"].append(f"First heading is not h1, found h{level}")
-                
-                if level > prev_level + 1 and prev_level > 0:
-                    results["proper_sequence"] = False
-                    results["issues"].append(f"Heading level jumped from h{prev_level} to h{level}")
-                
-                prev_level = level
-        
+            snapshot = snapshot or self.take_snapshot()
         except Exception as e:
-            results["error"] = f"Error checking heading structure: {str(e)}"
+            results = CHECKS[name](DomSnapshot.empty())
+            results["error"] = f"Error taking DOM snapshot: {str(e)}"
+            return results
         
-        return results
+        results, _ = run_checks(snapshot, [name])
+        return results[name]
     
-    def run_manual_accessibility_checks(self):
+    def run_manual_accessibility_checks(self, checks=None):
         """
         Run manual accessibility checks in addition to axe-core
         
+        The page is read once into a DomSnapshot, and every registered check
+        (see src.core.page_checks) runs on it without going back to the
+        browser. Keyboard navigation needs real key presses, so it runs on
+        the live page.
+        
+        Args:
+            checks: Names of the registered checks to run (default: all)
+        
         Returns:
-            Dictionary with all manual test results
+            Dictionary with all manual test results, and timings with the
+            seconds taken by the snapshot and by each check
         """
-        results = {
-            "keyboard_navigation": self.test_keyboard_navigation(),
-            "image_alt_text": self.check_image_alt_text(),
-            "form_labels": self.check_form_labels(),
-            "heading_structure": self.check_heading_structure()
-        }
+        start_time = time.time()
+        keyboard = self.test_keyboard_navigation()
+        timings = {"keyboard_navigation": time.time() - start_time}
         
-        return results
\ No newline at end of file
+        results = {"keyboard_navigation": keyboard}
+        try:
+            snapshot = self.take_snapshot()
+            timings["snapshot"] = snapshot.elapsed
+            check_results, check_timings = run_checks(snapshot, checks)
+            results.update(check_results)
+            timings.update(check_timings)
+        except Exception as e:
+            for name in checks or list(CHECKS):
+                results[name] = CHECKS[name](DomSnapshot.empty())
+                results[name]["error"] = f"Error taking DOM snapshot: {str(e)}"
+        
+        results["timings"] = timings
+        return results
@@ -16,15 +16,66 @@ class BasePage:
         self.driver = driver
         # Default wait time in seconds
         self.timeout = 10
+        # DevTools loader of the navigation started by open(url, wait=False)
+        self._loader_id = None
     
-    def open(self, url):
+    def open(self, url, wait=True):
         """
         Open the given URL
         
         Args:
             url: URL to open
+            wait: Block until the page has loaded. With False the navigation
+                is only started and is_loaded() tells when it has finished
         """
-        self.driver.get(url)
+        self._loader_id = None
+        if wait:
+            self.driver.get(url)
+            return
+        
+        if hasattr(self.driver, "execute_cdp_cmd"):
+            # Chrome: browser-initiated navigation also works for file:// URLs.
+            # loaderId is left out for same-document (fragment) navigations,
+            # which have nothing to wait for
+            navigation = self.driver.execute_cdp_cmd("Page.navigate", {"url": url})
+            self._loader_id = navigation.get("loaderId")
+            return
+        
+        # Mark the current document so is_loaded() can tell it apart from the new one.
+        # A fragment-only change keeps the document, so hashchange clears the mark
+        self.driver.execute_script(
+            "window.__a11yNavigating = true;"
+            "window.addEventListener('hashchange', function () { window.__a11yNavigating = false; });"
+            "window.location.href = arguments[0];",
+            url
+        )
+    
+    def is_loaded(self):
+        """
+        Check if a navigation started with open(url, wait=False) has finished
+        
+        On Chrome this only uses DevTools calls. execute_script is held back by
+        chromedriver until a pending navigation is done, which would make the
+        poll wait for the page it is polling.
+        
+        Returns:
+            True if the new document has finished loading
+        """
+        if not hasattr(self.driver, "execute_cdp_cmd"):
+            return self.driver.execute_script(
+                "return !window.__a11yNavigating && document.readyState === 'complete';"
+            )
+        
+        if self._loader_id is not None:
+            # The new document has committed once the main frame runs our loader
+            frame = self.driver.execute_cdp_cmd("Page.getFrameTree", {})["frameTree"]["frame"]
+            if frame.get("loaderId") != self._loader_id:
+                return False
+        
+        state = self.driver.execute_cdp_cmd(
+            "Runtime.evaluate", {"expression": "document.readyState", "returnByValue": True}
+        )
+        return state.get("result", {}).get("value") == "complete"
     
     def get_title(self):
         """
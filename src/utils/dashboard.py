@@ -6,14 +6,29 @@ import json
 from datetime import datetime
 from pathlib import Path
 
+from src.utils.report_utils import COMPONENT_REPORT_FILE
 
-def create_dashboard(report_dir="reports", output_file="reports/dashboard.html"):
+
+# Rows shown in the slowest rules table
+SLOWEST_RULES_SHOWN = 15
+
+# Rows shown in the shared component issues table
+COMPONENT_ISSUES_SHOWN = 15
+
+
+def create_dashboard(report_dir="reports", output_file="reports/dashboard.html", run_summary=None,
+                     rule_timings=None, component_issues=None):
     """
     Create a dashboard HTML file that links to all generated reports
     
     Args:
         report_dir: Directory containing reports
         output_file: Path for the dashboard HTML file
+        run_summary: Optional dictionary of label -> value shown as extra summary cards
+        rule_timings: Optional per-rule axe timings for the run (slowest first),
+            as returned by aggregate_rule_timings()
+        component_issues: Optional issues shared by several pages (most pages first),
+            as returned by IssueIndex.shared_issues()
     
     Returns:
         Path to the generated dashboard
@@ -151,8 +166,80 @@ def create_dashboard(report_dir="reports", output_file="reports/dashboard.html")
                     <h3>Screenshots</h3>
                     <div class="summary-value">""" + str(len(screenshots)) + """</div>
                 </div>
+    """
+    
+    # Add cards for the run summary (e.g. from the parallel scan engine)
+    for label, value in (run_summary or {}).items():
+        html += f"""
+                <div class="summary-card" style="background-color: #f3e5f5;">
+                    <h3>{label}</h3>
+                    <div class="summary-value">{value}</div>
+                </div>
+        """
+    
+    html += """
             </div>
-            
+    """
+    
+    # Where the scan time went, to help tune rule sets
+    if rule_timings:
+        html += """
+            <div class="card">
+                <h2>Slowest Rules</h2>
+                <table>
+                    <tr>
+                        <th>Rule</th>
+                        <th>Total time</th>
+                        <th>Mean per page</th>
+                        <th>Slowest page</th>
+                        <th>Pages</th>
+                    </tr>
+        """
+        for timing in rule_timings[:SLOWEST_RULES_SHOWN]:
+            html += f"""
+                    <tr>
+                        <td>{timing['rule']}</td>
+                        <td>{timing['total']:.2f}s</td>
+                        <td>{timing['mean'] * 1000:.0f} ms</td>
+                        <td>{timing['max'] * 1000:.0f} ms</td>
+                        <td>{timing['pages']}</td>
+                    </tr>
+            """
+        html += """
+                </table>
+            </div>
+        """
+    
+    # Issues in shared components, each fixed once for every page it is on
+    if component_issues:
+        html += f"""
+            <div class="card">
+                <h2>Shared Component Issues</h2>
+                <p><a href="{COMPONENT_REPORT_FILE}" target="_blank">View all shared issues</a></p>
+                <table>
+                    <tr>
+                        <th>Rule</th>
+                        <th>Impact</th>
+                        <th>Element</th>
+                        <th>Pages</th>
+                    </tr>
+        """
+        for issue in component_issues[:COMPONENT_ISSUES_SHOWN]:
+            target = " ".join(str(part) for part in issue.node.target)
+            html += f"""
+                    <tr>
+                        <td>{issue.rule.id}</td>
+                        <td>{issue.impact.to_axe() or 'unknown'}</td>
+                        <td>{target}</td>
+                        <td>{len(issue.pages)}</td>
+                    </tr>
+            """
+        html += """
+                </table>
+            </div>
+        """
+    
+    html += """
             <div class="card">
                 <h2>Test Reports by Page</h2>
                 <table>
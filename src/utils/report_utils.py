@@ -5,6 +5,12 @@ import time
 from datetime import datetime
 from selenium import webdriver
 
+from src.core.results import Violation, as_axe_results
+
+
+# Report listing the issues shared by several pages of a run, next to the page reports
+COMPONENT_REPORT_FILE = "component_issues.html"
+
 
 def take_screenshot(driver, element=None, filename=None):
     """
@@ -12,7 +18,7 @@ def take_screenshot(driver, element=None, filename=None):
     
     Args:
         driver: WebDriver instance
-        element: WebElement to screenshot (optional)
+        element: WebElement or ElementLocator to screenshot (optional)
         filename: Name for the screenshot file (optional)
     
     Returns:
@@ -36,6 +42,8 @@ def take_screenshot(driver, element=None, filename=None):
     
     try:
         if element:
+            element = _resolve_element(driver, element)
+            
             # Screenshot specific element
             element.screenshot(filepath)
         else:
@@ -55,10 +63,16 @@ def highlight_element(driver, element, color="red", border=2):
     
     Args:
         driver: WebDriver instance
-        element: WebElement to highlight
+        element: WebElement or ElementLocator to highlight
         color: Border color
         border: Border width
     """
+    try:
+        element = _resolve_element(driver, element)
+    except Exception as e:
+        print(f"Error highlighting element: {e}")
+        return
+    
     # Save original style
     original_style = element.get_attribute("style")
     
@@ -80,16 +94,40 @@ def highlight_element(driver, element, color="red", border=2):
     # )
 
 
-def format_violation_for_report(violation):
+def _resolve_element(driver, element):
+    """
+    Get the WebElement for an element from manual-check results
+
+    Args:
+        driver: WebDriver instance
+        element: WebElement, or ElementLocator to find it on the current page
+
+    Returns:
+        WebElement
+    """
+    if not hasattr(element, "resolve"):
+        return element
+    
+    found = element.resolve(driver)
+    if found is None:
+        raise LookupError(f"Element not found on the current page: {element.selector}")
+    return found
+
+
+def format_violation_for_report(violation, note=None):
     """
     Format a violation for display in the HTML report
     
     Args:
-        violation: Violation dictionary from axe scan
+        violation: Violation dictionary from axe scan, or a Violation
+        note: Optional warning shown under the violation title
     
     Returns:
         HTML string with formatted violation
     """
+    if isinstance(violation, Violation):
+        violation = violation.to_axe()
+    
     # Extract useful info from violation
     violation_id = violation.get('id', 'Unknown')
     description = violation.get('help', 'No description')
@@ -107,6 +145,9 @@ def format_violation_for_report(violation):
         <p>Elements affected: {node_count}</p>
     """
     
+    if note:
+        html += f'<p class="note">{note}</p>'
+    
     # Add node details if available
     if nodes:
         html += "<ul>"
@@ -122,13 +163,15 @@ def format_violation_for_report(violation):
     return html
 
 
-def generate_simple_report(results, output_file="reports/accessibility_report.html"):
+def generate_simple_report(results, output_file="reports/accessibility_report.html", shared_issues=0):
     """
     Generate a simple HTML report from accessibility results
     
     Args:
-        results: Results from axe scan
+        results: Results from axe scan (raw dictionary or ScanResult)
         output_file: Path to save the HTML report
+        shared_issues: Number of shared component issues taken out of the
+            results, which are listed once in the component issues report
     
     Returns:
         Path to the generated report
@@ -136,6 +179,7 @@ def generate_simple_report(results, output_file="reports/accessibility_report.ht
     if not results:
         print("No results to generate report from")
         return None
+    results = as_axe_results(results)
     
     # Extract violations
     violations = results.get('violations', [])
@@ -156,6 +200,7 @@ def generate_simple_report(results, output_file="reports/accessibility_report.ht
             .summary { background-color: #f5f5f5; padding: 10px; border-radius: 5px; }
             .violation { background-color: #fff0f0; padding: 10px; margin: 10px 0; border-left: 4px solid #ff0000; }
             .pass { background-color: #f0fff0; padding: 5px; margin: 5px 0; border-left: 4px solid #00ff00; }
+            .note { background-color: #fff8e1; padding: 5px; border-left: 4px solid #ffb300; }
         </style>
     </head>
     <body>
@@ -166,15 +211,85 @@ def generate_simple_report(results, output_file="reports/accessibility_report.ht
             <p>Test run: """ + datetime.now().strftime('%Y-%m-%d %H:%M:%S') + """</p>
             <p>Violations: """ + str(len(violations)) + """</p>
             <p>Passed tests: """ + str(len(passed)) + """</p>
+    """
+    
+    # Scan cost, recorded by AccessibilityScanner
+    stats = results.get('scanStats')
+    if stats and stats.get('cached'):
+        html += f"""
+            <p>Results reused from the scan cache (page unchanged), looked up in {stats.get('elapsed', 0) * 1000:.1f} ms</p>
+        """
+    elif stats:
+        html += f"""
+            <p>Scan time: {stats.get('elapsed', 0):.2f}s (axe: {stats.get('axeTime', 0):.2f}s)</p>
+            <p>Result transfer: {stats.get('transferBytes', 0) / 1024:.1f} KB, parsed in {stats.get('deserializeTime', 0) * 1000:.1f} ms</p>
+        """
+        slowest = sorted(stats.get('ruleTimings', {}).items(), key=lambda item: item[1], reverse=True)[:5]
+        if slowest:
+            html += "<p>Slowest rules: " + ", ".join(f"{rule} ({seconds * 1000:.0f} ms)" for rule, seconds in slowest) + "</p>"
+    
+    html += """
         </div>
     """
     
+    # Say so if the scan ran out of time and only covered part of the page
+    if results.get('partial'):
+        html += f"""
+        <div class="note">
+            <h2>Partial results</h2>
+            <p>{results.get('partialReason', 'The scan did not finish')}</p>
+        </div>
+        """
+    
+    # Warn about rules whose results may differ because resources were blocked
+    blocking = results.get('resourceBlocking')
+    affected_rules = set(blocking.get('affectedRules', [])) if blocking else set()
+    if blocking:
+        html += f"""
+        <div class="note">
+            <h2>Resource blocking</h2>
+            <p>Blocked presets: {', '.join(blocking.get('presets', [])) or 'custom patterns'}</p>
+            <p>Blocked requests: {blocking.get('blockedRequests', 0)}</p>
+            <p>Transferred bytes: {blocking.get('transferredBytes', 0)}</p>
+            <p>Rules that may be affected: {', '.join(sorted(affected_rules)) or 'none'}</p>
+        </div>
+        """
+    
+    # Frames scanned in their own tab, with where the time went
+    frames = results.get('frames')
+    if frames:
+        html += """
+        <div class="note">
+            <h2>Frames scanned separately</h2>
+        """
+        for frame in frames:
+            found = 'not scanned' if frame['violations'] is None else f"{frame['violations']} violations"
+            html += f"""
+            <p>{frame['selector']} ({frame['url']}): load {frame['load']:.2f}s, scan {frame['scan']:.2f}s, {found}</p>
+            """
+        html += """
+        </div>
+        """
+    
+    # Issues on many pages are listed once for the whole run
+    if shared_issues:
+        html += f"""
+        <div class="note">
+            <h2>Shared component issues</h2>
+            <p>{shared_issues} elements with violations are also on other pages and are listed in the
+            <a href="{COMPONENT_REPORT_FILE}">component issues report</a></p>
+        </div>
+        """
+    
     if violations:
         html += """
         <h2>Violations</h2>
         """
         for violation in violations:
-            html += format_violation_for_report(violation)
+            note = None
+            if violation.get('id') in affected_rules:
+                note = "Result may be affected by resource blocking"
+            html += format_violation_for_report(violation, note)
     else:
         html += """
         <h2>No violations found!</h2>
@@ -204,4 +319,60 @@ def generate_simple_report(results, output_file="reports/accessibility_report.ht
         f.write(html)
     
     print(f"Report generated at {output_file}")
-    return output_file
\ No newline at end of file
+    return output_file
+
+
+def generate_component_report(issues, output_file="reports/" + COMPONENT_REPORT_FILE):
+    """
+    Generate an HTML report of the issues shared by several pages
+
+    Args:
+        issues: ComponentIssue list from IssueIndex.shared_issues()
+        output_file: Path to save the HTML report
+
+    Returns:
+        Path to the generated report
+    """
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+
+    html = """
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Shared Component Issues</title>
+        <style>
+            body { font-family: Arial, sans-serif; margin: 20px; }
+            h1 { color: #333; }
+            .summary { background-color: #f5f5f5; padding: 10px; border-radius: 5px; }
+            .violation { background-color: #fff0f0; padding: 10px; margin: 10px 0; border-left: 4px solid #ff0000; }
+            .pages { margin: 0 0 20px 14px; }
+        </style>
+    </head>
+    <body>
+        <h1>Shared Component Issues</h1>
+        <div class="summary">
+            <p>Issues found on more than one page, listed once with the pages they are on</p>
+            <p>Generated: """ + datetime.now().strftime('%Y-%m-%d %H:%M:%S') + """</p>
+            <p>Shared issues: """ + str(len(issues)) + """</p>
+        </div>
+    """
+
+    for issue in issues:
+        html += format_violation_for_report(issue.to_violation(), f"Found on {len(issue.pages)} pages")
+        html += f"""
+        <details class="pages">
+            <summary>Pages</summary>
+            <ul>{"".join(f"<li>{page}</li>" for page in issue.pages)}</ul>
+        </details>
+        """
+
+    html += """
+    </body>
+    </html>
+    """
+
+    with open(output_file, 'w') as f:
+        f.write(html)
+
+    print(f"Component issues report generated at {output_file}")
+    return output_file
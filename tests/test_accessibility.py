@@ -1,15 +1,18 @@
 # Main accessibility test file
 
 import os
+import shutil
 import pytest
 import time
 from pathlib import Path
 
 # Import from our project
-from src.core.webdriver_manager import setup_driver, teardown_driver
+from src.core.webdriver_manager import setup_driver, teardown_driver, DriverPool
 from src.core.accessibility_scanner import AccessibilityScanner
+from src.core.resource_blocker import ResourceBlocker
+from src.core.scan_cache import ScanCache
 from src.pages.base_page import BasePage
-from src.pages.accessibility_test_page import AccessibilityTestPage
+from src.pages.accessibility_test_page import AccessibilityTestPage, DEFAULT_TAB_SAMPLE
 from src.utils.report_utils import take_screenshot, highlight_element, generate_simple_report
 
 # Import configuration
@@ -40,31 +43,85 @@ def setup_test_pages():
     # No cleanup needed - files will be overwritten on next run
 
 
-# Setup and teardown for webdriver
-@pytest.fixture
-def driver():
-    """Setup and teardown for WebDriver"""
-    # Check if browser is specified in environment variable
-    browser = os.environ.get("TEST_BROWSER", BROWSER)
+def make_resource_blocker():
+    """Create a ResourceBlocker if TEST_BLOCK_RESOURCES lists any presets"""
+    presets = [p for p in os.environ.get("TEST_BLOCK_RESOURCES", "").split(",") if p]
+    return ResourceBlocker(presets) if presets else None
+
+
+@pytest.fixture(scope="session")
+def scan_cache():
+    """Create a ScanCache if TEST_SCAN_CACHE names a cache directory"""
+    cache_dir = os.environ.get("TEST_SCAN_CACHE")
+    if not cache_dir:
+        yield None
+        return
     
-    # Check if headless mode is specified in environment variable
+    cache = ScanCache(cache_dir, int(os.environ.get("TEST_SCAN_CACHE_MB", "200")) * 1024 * 1024)
+    yield cache
+    
+    summary = cache.summary()
+    print(f"\nScan cache: {summary['hits']} hits, {summary['misses']} misses, "
+          f"{summary['evictions']} evictions")
+
+
+# Shared pool of warm browser sessions (only used when TEST_POOL_SIZE is set)
+@pytest.fixture(scope="session")
+def driver_pool():
+    """Create a DriverPool for the whole test session if requested"""
+    pool_size = int(os.environ.get("TEST_POOL_SIZE", "0"))
+    if pool_size <= 0:
+        yield None
+        return
+    
+    browser = os.environ.get("TEST_BROWSER", BROWSER)
     headless = os.environ.get("TEST_HEADLESS", "0") == "1" or HEADLESS
     
-    # Setup driver
-    driver = setup_driver(browser, headless)
+    pool = DriverPool(pool_size, browser, headless, resource_blocker=make_resource_blocker())
+    yield pool
+    
+    # Quit all pooled browsers at the end of the session
+    pool.close()
+
+
+def start_test_driver(driver_pool):
+    """Lease a warm session from the pool, or start a new browser if there is no pool"""
+    if driver_pool is not None:
+        driver = driver_pool.lease()
+    else:
+        # Check if browser is specified in environment variable
+        browser = os.environ.get("TEST_BROWSER", BROWSER)
+        
+        # Check if headless mode is specified in environment variable
+        headless = os.environ.get("TEST_HEADLESS", "0") == "1" or HEADLESS
+        
+        driver = setup_driver(browser, headless, resource_blocker=make_resource_blocker())
     
     # Set window size and position
     driver.set_window_size(1366, 768)
-    
+    return driver
+
+
+def stop_test_driver(driver_pool, driver):
+    """Give a session back to the pool, or quit it if there is no pool"""
+    if driver_pool is not None:
+        driver_pool.release(driver)
+    else:
+        teardown_driver(driver)
+
+
+# Setup and teardown for webdriver
+@pytest.fixture
+def driver(driver_pool):
+    """Setup and teardown for WebDriver"""
+    driver = start_test_driver(driver_pool)
     yield driver
-    
-    # Teardown
-    teardown_driver(driver)
+    stop_test_driver(driver_pool, driver)
 
 
 # Test accessibility on public sites
 @pytest.mark.parametrize("url", TEST_URLS["public"])
-def test_public_site_accessibility(driver, url):
+def test_public_site_accessibility(driver, scan_cache, url):
     """Test accessibility on public websites"""
     # Check if specific URL is specified in environment variable
     test_url = os.environ.get("TEST_URL", None)
@@ -72,7 +129,7 @@ def test_public_site_accessibility(driver, url):
         pytest.skip(f"Skipping {url}, only testing {test_url}")
     
     # Create scanner and page objects
-    scanner = AccessibilityScanner(driver)
+    scanner = AccessibilityScanner(driver, cache=scan_cache)
     page = BasePage(driver)
     
     # Navigate to the test URL
@@ -116,7 +173,7 @@ def test_public_site_accessibility(driver, url):
 
 # Test accessibility on local files
 @pytest.mark.parametrize("url", TEST_URLS["local"])
-def test_local_site_accessibility(driver, url):
+def test_local_site_accessibility(driver, scan_cache, url):
     """Test accessibility on local test pages"""
     # Check if specific URL is specified in environment variable
     test_url = os.environ.get("TEST_URL", None)
@@ -124,7 +181,7 @@ def test_local_site_accessibility(driver, url):
         pytest.skip(f"Skipping {url}, only testing {test_url}")
     
     # Create scanner and page objects
-    scanner = AccessibilityScanner(driver)
+    scanner = AccessibilityScanner(driver, cache=scan_cache)
     page = AccessibilityTestPage(driver)  # Using the extended page object
     
     # Navigate to the test URL
@@ -195,67 +252,167 @@ def test_local_site_accessibility(driver, url):
         pytest.fail(f"Error testing {url}: {e}")
 
 
+def test_image_alt_check_on_gallery_page(driver, tmp_path):
+    """check_image_alt_text reads 2,000 images in one call and classifies them all"""
+    page_file = tmp_path / "gallery.html"
+    images = "".join(
+        '<img src="p.png">' if i % 4 == 0 else
+        '<img src="p.png" alt="">' if i % 4 == 1 else
+        '<img src="p.png" alt="Photo">' if i % 4 == 2 else
+        f'<img src="p.png" alt="Product {i}">'
+        for i in range(2000)
+    )
+    page_file.write_text(f'<!DOCTYPE html><html lang="en"><head><title>Gallery</title></head><body>{images}</body></html>')
+
+    page = AccessibilityTestPage(driver)
+    page.open(f"file://{page_file}")
+    started = time.time()
+    results = page.check_image_alt_text()
+    print(f"Alt text check of {results['total_images']} images in {time.time() - started:.2f}s")
+
+    assert "error" not in results, results.get("error")
+    assert results["total_images"] == 2000
+    assert results["missing_alt"] == 1000
+    assert results["empty_alt"] == 500
+    assert results["images_with_valid_alt"] == 500
+    assert results["problem_images"][1]["issue"] == "Generic alt text: photo"
+    assert results["problem_images"][0]["selector"].endswith("img:nth-child(1)")
+    # Problem entries hold a locator, resolved only when the element is needed
+    element = results["problem_images"][0]["element"].resolve(driver)
+    assert element.get_attribute("outerHTML") == '<img src="p.png">'
+
+
+def test_form_labels_on_long_form(driver, tmp_path):
+    """check_form_labels resolves every kind of label of a 250-field form in one call"""
+    page_file = tmp_path / "long_form.html"
+    fields = []
+    for i in range(50):
+        fields.append(f'<label for="for{i}">Field {i}</label><input id="for{i}">')
+        fields.append(f'<label>Wrapped {i} <select><option>a</option></select></label>')
+        fields.append(f'<input aria-label="Aria {i}">')
+        fields.append(f'<span id="hint{i}">Hint {i}</span><textarea aria-labelledby="hint{i}"></textarea>')
+        fields.append(f'<input id="bare{i}" type="hidden"><input id="none{i}">')
+    page_file.write_text(f'<!DOCTYPE html><html lang="en"><head><title>Form</title></head>'
+                         f'<body><form>{"".join(fields)}</form></body></html>')
+
+    page = AccessibilityTestPage(driver)
+    page.open(f"file://{page_file}")
+    started = time.time()
+    results = page.check_form_labels()
+    print(f"Label check of {results['total_form_fields']} fields in {time.time() - started:.2f}s")
+
+    assert "error" not in results, results.get("error")
+    assert results["total_form_fields"] == 250
+    assert results["fields_with_labels"] == 200
+    assert results["problem_fields"][0]["issue"] == "No label found for field with ID 'none0'"
+    sources = {entry["source"] for entry in results["field_labels"]}
+    assert sources == {"label", "aria-label", "aria-labelledby", None}
+    assert results["field_labels"][3]["label"] == "Hint 0"
+
+
+def test_keyboard_navigation_on_large_page(driver, tmp_path):
+    """The computed tab order covers all 1,500 links and the sampled Tab presses agree with it"""
+    page_file = tmp_path / "many_links.html"
+    links = "".join(f'<li><a href="#item{i}">Item {i}</a></li>' for i in range(1500))
+    page_file.write_text(f'<!DOCTYPE html><html lang="en"><head><title>Links</title></head>'
+                         f'<body><button tabindex="1">First</button><ul>{links}</ul></body></html>')
+
+    page = AccessibilityTestPage(driver)
+    page.open(f"file://{page_file}")
+    results = page.test_keyboard_navigation()
+
+    print(f"Keyboard check of {results['focusable_elements']} elements in {results['elapsed']:.2f}s")
+    assert results["focusable_elements"] == 1501
+    assert len(results["tab_order"]) == 1501
+    assert results["tab_order"][0].endswith("button:nth-child(1)")
+    assert results["confirmed"] == DEFAULT_TAB_SAMPLE
+    assert not results["tab_trap"], results["errors"]
+    assert not results["order_mismatches"], results["order_mismatches"]
+
+
+def test_contrast_engine_matches_axe(driver):
+    """The batched contrast engine flags the same elements as axe on the contrast page"""
+    pytest.importorskip("numpy")
+    from src.core.contrast_engine import compare_with_axe, run_contrast_check
+
+    url = next(u for u in TEST_URLS["local"] if "contrast_issues" in u)
+    scanner = AccessibilityScanner(driver)
+    BasePage(driver).open(url)
+    scanner.inject_axe()
+
+    axe_results = scanner.run_custom_scan(options={'runOnly': {'type': 'rule', 'values': ['color-contrast']}})
+    engine_results = run_contrast_check(driver)
+    comparison = compare_with_axe(driver, engine_results, axe_results)
+
+    print(f"Contrast engine {engine_results['scanStats']['elapsed']:.2f}s, "
+          f"axe {axe_results['scanStats']['elapsed']:.2f}s")
+    assert comparison["matched"], "Both should find the low contrast text"
+    assert not comparison["engine_only"] and not comparison["axe_only"], comparison
+
+
+def selected_rules():
+    """Essential rules, limited to TEST_RULES if it is set"""
+    test_rules = os.environ.get("TEST_RULES", None)
+    return [r for r in AXE_RULES["essential"] if not test_rules or r in test_rules.split(",")]
+
+
+# Scan the page once for all selected rules, shared by all test_specific_wcag_rule cases
+@pytest.fixture(scope="module")
+def rule_batch_results(driver_pool):
+    """Scan the first local test page for every selected rule and write the per-rule reports"""
+    driver = start_test_driver(driver_pool)
+    try:
+        # Create scanner and page objects
+        scanner = AccessibilityScanner(driver)
+        page = BasePage(driver)
+        
+        # Navigate to the test URL
+        page.open(TEST_URLS["local"][0])
+        
+        # Let page load completely
+        time.sleep(1)
+        
+        # Inject axe-core and run all rules in one pass
+        scanner.inject_axe()
+        per_rule = scanner.run_rule_batch(selected_rules())
+        
+        # One screenshot of the page, copied for every rule report
+        screenshot_path = take_screenshot(driver, filename="rule_batch.png")
+    finally:
+        stop_test_driver(driver_pool, driver)
+    
+    for rule, results in per_rule.items():
+        # Generate report
+        if results is not None:
+            generate_simple_report(results, f"reports/rule_{rule}.html")
+        if screenshot_path:
+            shutil.copyfile(screenshot_path, os.path.join(os.path.dirname(screenshot_path), f"rule_{rule}.png"))
+    
+    return per_rule
+
+
 # Test specific WCAG rules
 @pytest.mark.parametrize("rule", AXE_RULES["essential"])
-def test_specific_wcag_rule(driver, rule):
+def test_specific_wcag_rule(request, rule):
     """Test specific WCAG rules across test pages"""
     # Check if specific rules are specified in environment variable
-    test_rules = os.environ.get("TEST_RULES", None)
-    if test_rules and rule not in test_rules.split(","):
-        pytest.skip(f"Skipping rule {rule}, only testing {test_rules}")
+    if rule not in selected_rules():
+        pytest.skip(f"Skipping rule {rule}, only testing {os.environ.get('TEST_RULES')}")
     
-    # Use the first local test page for this test
-    url = TEST_URLS["local"][0]
+    # Only start a browser if a selected rule needs the batch
+    results = request.getfixturevalue("rule_batch_results").get(rule)
     
-    # Create scanner and page objects
-    scanner = AccessibilityScanner(driver)
-    page = BasePage(driver)
+    # Print summary of violations
+    AccessibilityScanner.print_violation_summary(results)
     
-    # Navigate to the test URL
-    page.open(url)
+    # Count violations
+    violations = AccessibilityScanner.get_violations(results)
     
-    # Let page load completely
-    time.sleep(1)
+    # Assert that results were returned (not checking pass/fail)
+    assert results is not None, f"Should get results for rule {rule}"
     
-    # Run accessibility scan for specific rule
-    try:
-        # Inject axe-core
-        scanner.inject_axe()
-        
-        # Create a custom set of rules to check just this rule
-        custom_options = {
-            'runOnly': {
-                'type': 'rule',
-                'values': [rule]
-            }
-        }
-        
-        # Run scan with custom options
-        results = scanner.run_custom_scan(options=custom_options)
-        
-        # Generate report
-        report_path = f"reports/rule_{rule}.html"
-        generate_simple_report(results, report_path)
-        
-        # Print summary of violations
-        scanner.print_violation_summary(results)
-        
-        # Take screenshot of the page
-        screenshot_path = take_screenshot(driver, filename=f"rule_{rule}.png")
-        
-        # Count violations
-        violations = scanner.get_violations(results)
-        
-        # Assert that results were returned (not checking pass/fail)
-        assert results is not None, f"Should get results for rule {rule}"
-        
-        # Log the result
-        print(f"Tested rule {rule} with {len(violations)} violations")
-        
-    except Exception as e:
-        # If there's an error, take screenshot and fail test
-        take_screenshot(driver, filename=f"error_rule_{rule}.png")
-        pytest.fail(f"Error testing rule {rule}: {e}")
+    # Log the result
+    print(f"Tested rule {rule} with {len(violations)} violations")
 
 
 # Test for responsive design accessibility
@@ -0,0 +1,498 @@
+# Tests for AccessibilityScanner with fake drivers (no browser needed)
+
+import json
+import shutil
+import subprocess
+from types import SimpleNamespace
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from src.core.accessibility_scanner import AXE_PRESENT_SCRIPT, SLOW_RULES, AccessibilityScanner
+from src.core.axe_scripts import CHUNK_REGIONS_SCRIPT, FIND_MAIN_CONTEXT_SCRIPT
+from src.core.webdriver_manager import reset_driver_state
+
+
+def make_rule(rule_id, nodes=1):
+    """Build an axe rule result with a number of nodes"""
+    return {"id": rule_id, "nodes": [{"target": [f"#{rule_id}-{i}"]} for i in range(nodes)]}
+
+
+def test_split_results_by_rule():
+    """Each rule gets its own results with the shared page data"""
+    results = {
+        "url": "https://example.com/",
+        "scanStats": {"elapsed": 1.5},
+        "violations": [make_rule("image-alt", 2), make_rule("label")],
+        "passes": [make_rule("document-title")],
+        "incomplete": [make_rule("color-contrast")],
+        "inapplicable": [],
+    }
+
+    per_rule = AccessibilityScanner.split_results_by_rule(results, ["image-alt", "document-title", "region"])
+
+    assert set(per_rule) == {"image-alt", "document-title", "region"}
+    assert per_rule["image-alt"]["violations"] == [make_rule("image-alt", 2)]
+    assert per_rule["image-alt"]["passes"] == []
+    assert per_rule["document-title"]["passes"] == [make_rule("document-title")]
+    assert per_rule["region"]["violations"] == [] and per_rule["region"]["url"] == "https://example.com/"
+    assert per_rule["image-alt"]["scanStats"] == {"elapsed": 1.5}
+    assert AccessibilityScanner.get_violations(per_rule["image-alt"])[0]["id"] == "image-alt"
+
+
+def make_node(target):
+    """Build an axe node result for one element"""
+    return {"target": [target], "html": f"<div id='{target[1:]}'>"}
+
+
+def test_merge_incremental_keeps_drops_and_adds_nodes():
+    """Kept nodes carry over (with new selectors), gone and changed ones are replaced by the fresh scan"""
+    previous = {
+        "url": "https://example.com/",
+        "violations": [
+            {"id": "image-alt", "nodes": [make_node("#a"), make_node("#b"), make_node("#c")], "nodeCount": 3},
+            {"id": "label", "nodes": [make_node("#d")]},
+        ],
+        "incomplete": [{"id": "color-contrast", "nodes": [make_node("#e")]}],
+        "passes": [{"id": "document-title", "nodes": []}],
+        "inapplicable": [],
+    }
+    # One entry per tracked node, in the order of previous violations then incomplete
+    node_changes = [
+        {"status": "kept"},
+        {"status": "gone"},
+        {"status": "changed"},
+        {"status": "kept", "selector": "#form > #d"},
+        {"status": "kept"},
+    ]
+    fresh = {
+        "violations": [
+            {"id": "image-alt", "nodes": [make_node("#c2")], "nodeCount": 1},
+            {"id": "button-name", "nodes": [make_node("#f")]},
+        ],
+        "incomplete": [],
+        "passes": [],
+        "inapplicable": [],
+    }
+
+    merged = AccessibilityScanner(None)._merge_incremental(previous, fresh, node_changes)
+    violations = {rule["id"]: rule for rule in merged["violations"]}
+
+    assert [node["target"] for node in violations["image-alt"]["nodes"]] == [["#a"], ["#c2"]]
+    assert violations["image-alt"]["nodeCount"] == 2
+    assert violations["label"]["nodes"][0]["target"] == ["#form > #d"]
+    assert violations["button-name"]["nodes"] == [make_node("#f")]
+    assert merged["incomplete"][0]["nodes"] == [make_node("#e")]
+    assert merged["url"] == "https://example.com/"
+
+
+def test_merge_incremental_drops_a_fixed_rule():
+    """A violation whose only node changed and now passes is gone from the merged results"""
+    previous = {
+        "violations": [{"id": "label", "nodes": [make_node("#name")]}],
+        "incomplete": [],
+        "passes": [],
+        "inapplicable": [{"id": "image-alt", "nodes": []}],
+    }
+    fresh = {
+        "violations": [],
+        "incomplete": [],
+        "passes": [{"id": "label", "nodes": [make_node("#name")]}],
+        "inapplicable": [{"id": "label", "nodes": []}],
+    }
+
+    merged = AccessibilityScanner(None)._merge_incremental(previous, fresh, [{"status": "changed"}])
+
+    assert merged["violations"] == []
+    assert [rule["id"] for rule in merged["passes"]] == ["label"]
+    assert [rule["id"] for rule in merged["inapplicable"]] == ["image-alt"]
+
+
+class ChangesDriver:
+    """Driver that only answers the change collection script"""
+
+    def __init__(self, changes):
+        self.changes = changes
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        self.calls.append(args)
+        return self.changes
+
+
+def test_incremental_scan_falls_back_to_full_scan():
+    """Too many changed subtrees (reported as full) trigger a full rescan"""
+    driver = ChangesDriver({"tracking": True, "full": True, "roots": [], "nodes": []})
+    scanner = AccessibilityScanner(driver)
+    scanner._tracked_scan = (None, None, {"violations": []})
+    scanner.run_full_scan = lambda: {"violations": [], "scanStats": {}}
+
+    results = scanner.run_incremental_scan(max_subtrees=3)
+
+    assert driver.calls == [(None, 3)]
+    assert results["scanStats"]["incremental"] == {"fullRescan": True}
+
+
+def test_merge_frame_results_prefixes_frame_selector():
+    """Frame nodes get the iframe selector in front of their target and join the page's rules"""
+    results = {
+        "violations": [{"id": "image-alt", "nodes": [make_node("#logo")], "nodeCount": 1}],
+        "passes": [],
+        "incomplete": [],
+        "inapplicable": [{"id": "label", "nodes": []}],
+    }
+    frame_results = {
+        "violations": [
+            {"id": "image-alt", "nodes": [make_node("#ad")], "nodeCount": 1},
+            {"id": "label", "nodes": [make_node("#email")]},
+        ],
+        "passes": [],
+        "incomplete": [],
+        "inapplicable": [],
+    }
+
+    AccessibilityScanner(None)._merge_frame_results(results, frame_results, "#widget")
+    violations = {rule["id"]: rule for rule in results["violations"]}
+
+    assert [node["target"] for node in violations["image-alt"]["nodes"]] == [["#logo"], ["#widget", "#ad"]]
+    assert violations["image-alt"]["nodeCount"] == 2
+    assert violations["label"]["nodes"][0]["target"] == ["#widget", "#email"]
+    assert results["inapplicable"] == []
+
+
+def test_merge_frame_results_skips_page_level_rules():
+    """Rules axe only runs on the top-level document don't come in from a frame"""
+    results = {"violations": [], "passes": [], "incomplete": [], "inapplicable": []}
+    frame_results = {
+        "violations": [
+            {"id": "landmark-one-main", "nodes": [make_node("#root")]},
+            {"id": "document-title", "nodes": [make_node("#root")]},
+            {"id": "duplicate-id", "nodes": [make_node("#dup")]},
+        ],
+        "passes": [{"id": "html-has-lang", "nodes": []}],
+        "incomplete": [],
+        "inapplicable": [],
+    }
+
+    AccessibilityScanner(None)._merge_frame_results(results, frame_results, "#widget")
+
+    # Duplicate IDs only need to be unique within the frame's own document
+    assert [rule["id"] for rule in results["violations"]] == ["duplicate-id"]
+    assert results["passes"] == []
+
+
+def test_frame_scan_options_leave_out_page_level_rules():
+    """Frame scans disable page-level rules, or drop them from a runOnly rule list"""
+    scanner = AccessibilityScanner(None)
+
+    options = scanner._frame_scan_options({"rules": {"color-contrast": {"enabled": True}}})
+    assert options["rules"]["region"] == {"enabled": False}
+    assert options["rules"]["color-contrast"] == {"enabled": True}
+    assert "duplicate-id" not in options["rules"]
+
+    options = scanner._frame_scan_options({"runOnly": {"type": "rule", "values": ["bypass", "image-alt"]}})
+    assert options["runOnly"]["values"] == ["image-alt"]
+    assert scanner._frame_scan_options({"runOnly": {"type": "rule", "values": ["bypass"]}}) is None
+
+
+class InjectDriver:
+    """Chrome-like driver that records DevTools commands and uploaded scripts"""
+
+    def __init__(self, axe_loaded):
+        self.axe_loaded = axe_loaded
+        self.session_id = "session"
+        self.current_window_handle = "main"
+        self.window_handles = ["main"]
+        self.switch_to = self
+        self.cdp_calls = []
+        self.scripts = []
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp_calls.append(command)
+        return {"identifier": "axe-1"} if command == "Page.addScriptToEvaluateOnNewDocument" else {}
+
+    def execute_script(self, script, *args):
+        if script == AXE_PRESENT_SCRIPT:
+            return self.axe_loaded
+        self.scripts.append(script)
+
+    def window(self, handle):
+        self.current_window_handle = handle
+
+    def get(self, url):
+        pass
+
+
+def test_inject_axe_skips_the_upload_when_axe_is_loaded():
+    """A page that already has axe costs one presence check and no DevTools call by default"""
+    driver = InjectDriver(axe_loaded=True)
+
+    AccessibilityScanner(driver).inject_axe()
+
+    assert driver.cdp_calls == []
+    assert driver.scripts == []
+
+
+def test_inject_axe_for_frames_registers_once_and_reset_removes_it():
+    """frames=True registers axe for new documents once per window, reset_driver_state takes it out"""
+    driver = InjectDriver(axe_loaded=False)
+    scanner = AccessibilityScanner(driver)
+
+    scanner.inject_axe(frames=True)
+    driver.axe_loaded = True
+    scanner.inject_axe(frames=True)
+
+    assert driver.cdp_calls == ["Page.addScriptToEvaluateOnNewDocument"]
+    assert len(driver.scripts) == 1
+
+    reset_driver_state(driver)
+    assert "Page.removeScriptToEvaluateOnNewDocument" in driver.cdp_calls
+    assert driver.axe_script_ids == {}
+
+
+class BudgetDriver:
+    """Driver whose axe runs time out or answer from a list of canned payloads"""
+
+    def __init__(self, outcomes, main="#main"):
+        self.outcomes = list(outcomes)
+        self.main = main
+        self.timeouts = SimpleNamespace(script=30)
+        self.runs = []
+        self.actions = []
+
+    def set_script_timeout(self, seconds):
+        self.timeouts.script = seconds
+
+    def execute_async_script(self, script, context, options, post):
+        self.runs.append((context, options))
+        outcome = self.outcomes.pop(0)
+        if outcome == "timeout":
+            raise TimeoutException("script timeout")
+        return json.dumps(outcome)
+
+    def execute_script(self, script, *args):
+        if script == FIND_MAIN_CONTEXT_SCRIPT:
+            return self.main
+        return True
+
+    def execute_cdp_cmd(self, command, params):
+        self.actions.append(command)
+        return {}
+
+    def refresh(self):
+        self.actions.append("refresh")
+
+
+def axe_payload():
+    """Canned RUN_AXE_SCRIPT payload with one violation"""
+    return {"results": {"violations": [make_rule("label")], "passes": [], "incomplete": [], "inapplicable": []},
+            "axeTime": 1200}
+
+
+def test_async_scan_falls_back_after_a_timeout():
+    """A timed-out scan is stopped, the page reloaded and the slow rules skipped on the retry"""
+    driver = BudgetDriver(["timeout", axe_payload()])
+
+    results = AccessibilityScanner(driver).run_async_scan(budget=10)
+
+    assert driver.actions == ["Runtime.terminateExecution", "refresh"]
+    assert results["partial"] is True
+    assert "skipped slow rules" in results["partialReason"]
+    assert results["scanStats"]["attempts"] == 2 and results["scanStats"]["reloaded"] is True
+    retry_options = driver.runs[1][1]
+    assert all(retry_options["rules"][rule] == {"enabled": False} for rule in SLOW_RULES)
+    assert driver.timeouts.script == 30
+
+
+@pytest.mark.parametrize("run_only, expected", [
+    (None, None),
+    (["wcag2a"], {"type": "tag", "values": ["wcag2a"]}),
+    ({"type": "tags", "values": ["wcag2aa"]}, {"type": "tag", "values": ["wcag2aa"]}),
+    ({"type": "rules", "values": ["color-contrast", "label"]}, {"type": "rule", "values": ["label"]}),
+])
+def test_fallback_scans_accept_every_run_only_form(run_only, expected):
+    """Lists, tag and rule selections all get the slow rules taken out, then the main landmark"""
+    options = {"runOnly": run_only} if run_only else {}
+    scanner = AccessibilityScanner(BudgetDriver([]))
+
+    scans = list(scanner._fallback_scans("body", options))
+
+    assert [context for context, _, _ in scans] == ["body", "body", "#main"]
+    reduced = scans[1][1]
+    assert reduced.get("runOnly") == expected
+    if expected is None or expected["type"] == "tag":
+        assert set(reduced["rules"]) == set(SLOW_RULES)
+    assert scans[0][1] == options
+
+
+def test_fallback_scans_stop_when_only_slow_rules_were_selected():
+    """Nothing is left to retry when every selected rule is a slow one"""
+    scanner = AccessibilityScanner(BudgetDriver([]))
+    options = {"runOnly": {"type": "rule", "values": ["color-contrast"]}}
+
+    assert [reason for _, _, reason in scanner._fallback_scans("body", options)] == [None]
+
+
+def test_async_scan_returns_none_when_every_attempt_times_out():
+    """Full scan, reduced scan and main-only scan all run out of time"""
+    driver = BudgetDriver(["timeout", "timeout", "timeout"])
+
+    assert AccessibilityScanner(driver).run_async_scan(budget=10) is None
+    assert [context for context, _ in driver.runs] == ["body", "body", "#main"]
+    assert driver.actions.count("refresh") == 3
+
+
+class NodeDriver:
+    """Runs the scanner's async scripts in Node.js against a stub axe that returns canned results"""
+
+    def __init__(self, raw_results):
+        self.raw_results = raw_results
+        self.axe_options = None
+
+    def execute_async_script(self, script, *args):
+        program = (
+            "globalThis.window = globalThis;\n"
+            "let axeOptions = null;\n"
+            f"globalThis.axe = {{run: (context, options) => {{ axeOptions = options; "
+            f"return Promise.resolve({json.dumps(self.raw_results)}); }}}};\n"
+            "const done = (payload) => process.stdout.write(JSON.stringify({payload, axeOptions}));\n"
+            f"(function () {{\n{script}\n}}).apply(null, {json.dumps(list(args))}.concat([done]));\n"
+        )
+        output = json.loads(subprocess.run(["node", "-e", program], capture_output=True, text=True, check=True).stdout)
+        self.axe_options = output["axeOptions"]
+        return output["payload"]
+
+
+def raw_rule(rule_id, htmls):
+    """Build an uncompacted axe rule result"""
+    return {"id": rule_id, "impact": "serious", "tags": ["wcag2a"], "description": "d", "help": "h", "helpUrl": "u",
+            "nodes": [{"html": html, "target": [f"#{rule_id}"], "impact": "serious", "failureSummary": "f",
+                       "any": [{"id": "c", "impact": "serious", "message": "m", "data": None,
+                                "relatedNodes": [{"html": html}]}], "all": [], "none": []}
+                      for html in htmls]}
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs Node.js to run the browser script")
+def test_compact_scan_is_shrunk_in_the_browser():
+    """Compact scans ask axe for violation details only, cut node HTML and count passing nodes"""
+    driver = NodeDriver({
+        "violations": [raw_rule("label", ["<input " + "x" * 50 + ">"])],
+        "incomplete": [],
+        "passes": [raw_rule("document-title", ["<title>", "<title>"])],
+        "inapplicable": [raw_rule("video-caption", [])],
+    })
+    scanner = AccessibilityScanner(driver, compact=True, max_html_length=10)
+
+    results = scanner._run_axe("body", {"runOnly": ["wcag2a"]})
+
+    assert driver.axe_options["resultTypes"] == ["violations", "incomplete"]
+    node = results["violations"][0]["nodes"][0]
+    assert node["html"] == "<input xxx..."
+    assert "relatedNodes" not in node["any"][0]
+    assert results["passes"][0]["nodeCount"] == 2 and results["passes"][0]["nodes"] == []
+    assert results["inapplicable"][0]["nodeCount"] == 0
+    assert results["scanStats"]["compact"] is True
+    assert results["scanStats"]["axeTime"] >= 0
+    assert results["scanStats"]["transferBytes"] > 0 and results["scanStats"]["deserializeTime"] >= 0
+
+
+def test_axe_error_payload_raises():
+    """An axe error sent back by the browser script becomes a RuntimeError"""
+    driver = SimpleNamespace(execute_async_script=lambda *args: json.dumps({"error": "axe exploded"}))
+
+    with pytest.raises(RuntimeError, match="axe exploded"):
+        AccessibilityScanner(driver)._run_axe()
+
+
+def test_transfer_bytes_is_the_payload_size():
+    """scanStats records the size of the JSON the browser sent and the time spent parsing it"""
+    payload = json.dumps(axe_payload())
+    driver = SimpleNamespace(execute_async_script=lambda *args: payload)
+
+    results = AccessibilityScanner(driver)._run_axe()
+
+    assert results["scanStats"]["transferBytes"] == len(payload)
+    assert results["scanStats"]["axeTime"] == 1.2
+    assert results["scanStats"]["compact"] is False
+
+
+class ChunkDriver:
+    """Driver with a fixed chunk layout whose axe runs fail on some chunks"""
+
+    def __init__(self, rules, chunks, failing=()):
+        self.rules = rules
+        self.chunks = chunks
+        self.failing = set(failing)
+        self.layout_roots = None
+        self.runs = []
+
+    def execute_script(self, script, *args):
+        if script == CHUNK_REGIONS_SCRIPT:
+            self.layout_roots = args[0]
+            return {"total": sum(chunk["nodes"] for chunk in self.chunks), "chunks": self.chunks}
+        if "axe.getRules" in script:
+            return self.rules
+        return True
+
+    def execute_async_script(self, script, context, options, post):
+        self.runs.append((context, options["runOnly"]))
+        if isinstance(context, dict) and any(entry[0] in self.failing for entry in context["include"]):
+            return json.dumps({"error": "out of memory"})
+        return json.dumps(axe_payload())
+
+
+CHUNKS = [{"selectors": ["#header", "#nav"], "nodes": 40}, {"selectors": ["#main"], "nodes": 900}]
+
+
+def test_chunked_scan_splits_page_level_and_per_chunk_rules():
+    """Page-level and container rules run once over the context, the rest once per chunk"""
+    driver = ChunkDriver(["document-title", "image-alt", "label", "list"], CHUNKS)
+
+    chunks = list(AccessibilityScanner(driver).iter_chunked_scan())
+
+    assert driver.layout_roots == ["body"]
+    assert driver.runs == [
+        ("body", {"type": "rule", "values": ["document-title", "list"]}),
+        ({"include": [["#header"], ["#nav"]]}, {"type": "rule", "values": ["image-alt", "label"]}),
+        ({"include": [["#main"]]}, {"type": "rule", "values": ["image-alt", "label"]}),
+    ]
+    assert [(chunk["chunk"]["index"], chunk["chunk"]["of"]) for chunk in chunks] == [(0, 3), (1, 3), (2, 3)]
+    assert chunks[0]["chunk"]["pageLevel"] is True and chunks[0]["chunk"]["nodes"] == 940
+    assert chunks[2]["chunk"]["selectors"] == ["#main"] and chunks[2]["chunk"]["nodes"] == 900
+
+
+def test_chunked_scan_accepts_the_rules_alias():
+    """runOnly type "rules" selects rules by ID instead of looking them up as tags"""
+    driver = ChunkDriver([], CHUNKS)
+    options = {"runOnly": {"type": "rules", "values": ["region", "label"]}}
+
+    chunks = list(AccessibilityScanner(driver).iter_chunked_scan(options=options))
+
+    assert [run_only["values"] for _, run_only in driver.runs] == [["region"], ["label"], ["label"]]
+    assert len(chunks) == 3
+
+
+def test_chunked_scan_with_a_context_dictionary():
+    """A dictionary context is laid out from its roots and its exclusions carry over to every chunk"""
+    driver = ChunkDriver(["image-alt"], CHUNKS)
+    context = {"include": [["#app"]], "exclude": [["#ads"]]}
+
+    list(AccessibilityScanner(driver).iter_chunked_scan(context=context))
+
+    assert driver.layout_roots == ["#app"]
+    assert [run[0] for run in driver.runs] == [
+        {"include": [["#header"], ["#nav"]], "exclude": [["#ads"]]},
+        {"include": [["#main"]], "exclude": [["#ads"]]},
+    ]
+
+
+def test_failed_chunk_gets_an_error_entry():
+    """A chunk whose axe run fails comes back empty with the error, and the scan goes on"""
+    driver = ChunkDriver(["image-alt"], CHUNKS, failing=["#header"])
+
+    chunks = list(AccessibilityScanner(driver).iter_chunked_scan())
+
+    assert len(chunks) == 2
+    assert chunks[0]["violations"] == [] and "out of memory" in chunks[0]["chunk"]["error"]
+    assert [rule["id"] for rule in chunks[1]["violations"]] == ["label"]
+    assert "error" not in chunks[1]["chunk"]
@@ -0,0 +1,49 @@
+# Tests for non-blocking navigation in BasePage, with a fake Chrome driver (no browser needed)
+
+from src.pages.base_page import BasePage
+
+
+class FakeChrome:
+    """Answers the DevTools calls BasePage makes, and fails on execute_script"""
+
+    def __init__(self):
+        self.loader_id = "old-loader"
+        self.ready_state = "complete"
+        self.next_navigation = {"frameId": "main", "loaderId": "new-loader"}
+
+    def execute_cdp_cmd(self, command, params):
+        if command == "Page.navigate":
+            return dict(self.next_navigation)
+        if command == "Page.getFrameTree":
+            return {"frameTree": {"frame": {"id": "main", "loaderId": self.loader_id}}}
+        if command == "Runtime.evaluate":
+            return {"result": {"type": "string", "value": self.ready_state}}
+        raise AssertionError(f"Unexpected command {command}")
+
+    def execute_script(self, script, *args):
+        raise AssertionError("execute_script waits for pending navigations")
+
+
+def test_waits_for_the_new_document():
+    """The old document being complete doesn't count until the new loader has committed"""
+    driver = FakeChrome()
+    page = BasePage(driver)
+    page.open("https://example.com/next", wait=False)
+    assert not page.is_loaded()
+
+    driver.loader_id = "new-loader"
+    driver.ready_state = "interactive"
+    assert not page.is_loaded()
+
+    driver.ready_state = "complete"
+    assert page.is_loaded()
+
+
+def test_fragment_navigation_is_loaded_at_once():
+    """A same-document navigation has no loader and is ready straight away"""
+    driver = FakeChrome()
+    driver.next_navigation = {"frameId": "main"}
+    page = BasePage(driver)
+    page.open("https://example.com/#section", wait=False)
+
+    assert page.is_loaded()
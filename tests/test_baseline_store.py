@@ -0,0 +1,83 @@
+# Tests for the SQLite baseline store used for "new violations only" gating
+
+import argparse
+
+from src.core.baseline_store import BaselineStore
+from src.core.issue_index import fingerprint_node
+from src.core.results import ScanResult
+from src.core.scan_engine import RESULTS_FILE, load_records, save_record, write_run_reports
+from accessibility_cli import accept_baseline
+
+
+def make_record(url, targets):
+    """Build a scan record with one image-alt node per target"""
+    nodes = [{"html": "<img>", "target": [target], "impact": "critical"} for target in targets]
+    results = {"url": url, "violations": [{"id": "image-alt", "impact": "critical", "nodes": nodes}] if nodes else []}
+    return {"url": url, "results": results, "error": None}
+
+
+def test_only_new_violations_are_reported(tmp_path):
+    """Accepted violations pass, a new one on the same page is reported"""
+    with BaselineStore(str(tmp_path / "baseline.sqlite")) as baseline:
+        assert baseline.accept([make_record("https://x/a", ["#logo"]), make_record("https://x/b", [])]) == 1
+
+        new = baseline.diff([make_record("https://x/a", ["#logo", "#banner"]), make_record("https://x/b", ["#logo"])])
+
+        assert [v["target"] for v in new["https://x/a"]] == [["#banner"]]
+        assert [v["target"] for v in new["https://x/b"]] == [["#logo"]]
+        assert baseline.contains("https://x/a", fingerprint_node("image-alt", {"target": ["#logo"]}))
+        assert baseline.summary()["violations"] == 1
+
+
+def test_accepting_again_replaces_the_page(tmp_path):
+    """A fixed violation drops out of the baseline, other pages keep theirs"""
+    path = str(tmp_path / "baseline.sqlite")
+    with BaselineStore(path) as baseline:
+        baseline.accept([make_record("https://x/a", ["#logo"]), make_record("https://x/b", ["#logo"])])
+        baseline.accept([make_record("https://x/a", [])])
+
+    # Reopened from disk, and ScanResult records work the same as dictionaries
+    with BaselineStore(path) as baseline:
+        record = make_record("https://x/a", ["#logo"])
+        record["results"] = ScanResult.from_axe(record["results"])
+        assert baseline.new_violations("https://x/a", record["results"])
+        assert not baseline.page_fingerprints("https://x/a")
+        assert baseline.summary()["pages"] == 1
+
+
+def test_run_reports_count_new_violations(tmp_path):
+    """write_run_reports counts the violations that aren't in the baseline"""
+    with BaselineStore(str(tmp_path / "baseline.sqlite")) as baseline:
+        baseline.accept([make_record("https://x/a", ["#logo"])])
+        records = [make_record("https://x/a", ["#logo"]), make_record("https://x/b", ["#logo", "#nav"])]
+
+        summary = write_run_reports(records, str(tmp_path / "reports"), baseline=baseline)
+
+    assert summary["New violations"] == 2
+    assert summary["Pages with new violations"] == 1
+    assert (tmp_path / "reports" / "new_violations.json").exists()
+
+
+def test_accept_counts_only_inserted_rows(tmp_path):
+    """Nodes with the same fingerprint on a page are accepted once and counted once"""
+    with BaselineStore(str(tmp_path / "baseline.sqlite")) as baseline:
+        assert baseline.accept([make_record("https://x/a", ["#logo", "#logo", "#nav"])]) == 2
+        assert baseline.summary()["violations"] == 2
+
+
+def test_accept_baseline_uses_saved_results(tmp_path):
+    """--accept-baseline reads results.jsonl from the output directory instead of scanning"""
+    results_file = tmp_path / RESULTS_FILE
+    save_record(make_record("https://x/a", ["#old"]), str(results_file))
+    save_record(make_record("https://x/a", ["#logo"]), str(results_file))
+    save_record(make_record("https://x/b", ["#nav"]), str(results_file))
+    assert [record["url"] for record in load_records(str(results_file))] == ["https://x/a", "https://x/b"]
+
+    args = argparse.Namespace(output=str(tmp_path), baseline=str(tmp_path / "baseline.sqlite"))
+    assert accept_baseline(args) == 0
+    with BaselineStore(args.baseline) as baseline:
+        assert baseline.contains("https://x/a", fingerprint_node("image-alt", {"target": ["#logo"]}))
+        assert not baseline.contains("https://x/a", fingerprint_node("image-alt", {"target": ["#old"]}))
+
+    args.output = str(tmp_path / "empty")
+    assert accept_baseline(args) == 1
@@ -0,0 +1,82 @@
+# Tests for the batched contrast engine, on collected styles (no browser needed)
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.core.contrast_engine import compute_contrast, contrast_results, relative_luminance
+from src.core.results import ScanResult
+
+
+def make_styles(*elements):
+    """Build collected styles from (fg rgba, bg rgb, font size px, font weight, unknown) tuples"""
+    styles = {"selectors": [], "html": [], "colors": [], "fontSize": [], "fontWeight": [], "unknown": []}
+    for index, (fg, bg, size, weight, unknown) in enumerate(elements):
+        styles["selectors"].append(f"body > p:nth-child({index + 1})")
+        styles["html"].append(f"<p>Text {index}</p>")
+        styles["colors"].extend(list(fg) + list(bg))
+        styles["fontSize"].append(size)
+        styles["fontWeight"].append(weight)
+        styles["unknown"].append(unknown)
+    return styles
+
+
+WHITE = (255, 255, 255)
+
+
+def test_luminance_of_black_and_white():
+    """Black and white give the ends of the luminance scale"""
+    assert list(relative_luminance([(0, 0, 0), WHITE])) == pytest.approx([0, 1])
+
+
+def test_ratios_match_known_values():
+    """#777 on white just fails, #767676 on white just passes"""
+    contrast = compute_contrast(make_styles(
+        ((0x77, 0x77, 0x77, 1), WHITE, 16, 400, None),
+        ((0x76, 0x76, 0x76, 1), WHITE, 16, 400, None),
+        ((0, 0, 0, 1), WHITE, 16, 400, None),
+    ))
+
+    assert list(contrast["ratio"]) == pytest.approx([4.48, 4.54, 21], abs=0.01)
+    assert list(contrast["passed"]) == [False, True, True]
+
+
+def test_large_text_needs_less_contrast():
+    """24px text, or bold text from 18.66px, only needs 3:1"""
+    grey = (0x94, 0x94, 0x94, 1)  # about 3:1 on white
+    contrast = compute_contrast(make_styles(
+        (grey, WHITE, 16, 400, None),
+        (grey, WHITE, 24, 400, None),
+        (grey, WHITE, 18.66, 700, None),
+        (grey, WHITE, 18.66, 400, None),
+    ))
+
+    assert list(contrast["expected"]) == [4.5, 3, 3, 4.5]
+
+
+def test_see_through_text_is_blended():
+    """Half transparent black on white counts as mid grey"""
+    contrast = compute_contrast(make_styles(((0, 0, 0, 0.5), WHITE, 16, 400, None)))
+
+    assert list(contrast["fg"][0]) == pytest.approx([127.5] * 3)
+
+
+def test_results_have_the_axe_shape():
+    """Failing, passing and unknown elements end up where axe puts them"""
+    styles = make_styles(
+        ((0xaa, 0xaa, 0xaa, 1), WHITE, 16, 400, None),
+        ((0, 0, 0, 1), WHITE, 16, 400, None),
+        ((0, 0, 0, 1), (0, 0, 0), 16, 400, "bgImage"),
+    )
+    results = contrast_results(styles, compute_contrast(styles), "file:///contrast_issues.html")
+
+    violation = results["violations"][0]
+    assert violation["id"] == "color-contrast"
+    assert violation["nodes"][0]["target"] == ["body > p:nth-child(1)"]
+    assert violation["nodes"][0]["any"][0]["data"]["contrastRatio"] == 2.32
+    assert violation["nodes"][0]["any"][0]["data"]["fgColor"] == "#aaaaaa"
+    assert results["passes"][0]["nodeCount"] == 1
+    assert "background image" in results["incomplete"][0]["nodes"][0]["failureSummary"]
+
+    # The reports and result model take the results like an axe scan's
+    assert ScanResult.from_axe(results).violations[0].node_count == 1
@@ -0,0 +1,155 @@
+# Tests for the distributed scan coordinator (no browser needed)
+
+import json
+import urllib.error
+
+import pytest
+
+from src.core.coordinator import CoordinatorClient, CoordinatorServer, ScanCoordinator
+
+
+class FakeClock:
+    """Manually advanced clock for lease timeout tests"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_record(url):
+    """Build a minimal scan record"""
+    return {"url": url, "results": {"violations": []}, "error": None, "elapsed": 0.1}
+
+
+def test_leases_every_url_once():
+    """Each URL is handed out once and the coordinator finishes when all are recorded"""
+    coordinator = ScanCoordinator(["a", "b", "a"])
+
+    first = coordinator.lease("w1")
+    second = coordinator.lease("w2")
+    assert {first["url"], second["url"]} == {"a", "b"}
+    assert "wait" in coordinator.lease("w3")
+
+    assert coordinator.complete(first["lease_id"], make_record(first["url"]))
+    assert coordinator.complete(second["lease_id"], make_record(second["url"]))
+    assert coordinator.lease("w1") == {"done": True}
+    assert coordinator.is_done()
+
+
+def test_expired_lease_is_requeued():
+    """A worker that stops sending heartbeats loses its URL to another worker"""
+    clock = FakeClock()
+    coordinator = ScanCoordinator(["a"], lease_timeout=10, clock=clock)
+
+    dead = coordinator.lease("dead-worker")
+    clock.now = 5
+    assert coordinator.heartbeat(dead["lease_id"])
+    clock.now = 16
+
+    retry = coordinator.lease("live-worker")
+    assert retry["url"] == "a"
+    assert not coordinator.heartbeat(dead["lease_id"])
+
+
+def test_results_are_recorded_exactly_once(tmp_path):
+    """A late result from an expired lease and the retry only count once"""
+    clock = FakeClock()
+    results_file = tmp_path / "results.jsonl"
+    coordinator = ScanCoordinator(["a"], lease_timeout=10, clock=clock, results_file=str(results_file))
+
+    slow = coordinator.lease("slow-worker")
+    clock.now = 11
+    retry = coordinator.lease("fast-worker")
+
+    assert coordinator.complete(retry["lease_id"], make_record("a"))
+    assert not coordinator.complete(slow["lease_id"], make_record("a"))
+    assert len(results_file.read_text().splitlines()) == 1
+
+    # A restarted coordinator resumes from the results file
+    resumed = ScanCoordinator(["a", "b"], results_file=str(results_file))
+    assert resumed.lease("w")["url"] == "b"
+
+
+def test_late_result_for_requeued_url_finishes_the_crawl():
+    """A result posted after the lease expired takes the URL off the queue"""
+    clock = FakeClock()
+    coordinator = ScanCoordinator(["b"], lease_timeout=10, clock=clock)
+
+    expired = coordinator.lease("slow-worker")
+    clock.now = 11
+    assert coordinator.status()["pending"] == 1
+
+    assert coordinator.complete(expired["lease_id"], make_record("b"))
+    assert coordinator.is_done()
+    assert coordinator.lease("w") == {"done": True}
+
+
+def test_resume_drops_a_truncated_last_line(tmp_path):
+    """A coordinator killed mid-append leaves half a line, the restart drops it and rescans that URL"""
+    results_file = tmp_path / "results.jsonl"
+    results_file.write_text(json.dumps(make_record("a")) + "\n" + json.dumps(make_record("b"))[:20])
+
+    resumed = ScanCoordinator(["a", "b"], results_file=str(results_file))
+    lease = resumed.lease("w")
+    assert lease["url"] == "b"
+    assert resumed.complete(lease["lease_id"], make_record("b"))
+
+    lines = results_file.read_text().splitlines()
+    assert [json.loads(line)["url"] for line in lines] == ["a", "b"]
+
+
+def test_gives_up_after_max_attempts():
+    """A URL that keeps killing workers is recorded as failed"""
+    clock = FakeClock()
+    coordinator = ScanCoordinator(["a"], lease_timeout=1, max_attempts=2, clock=clock)
+
+    coordinator.lease("w1")
+    clock.now = 2
+    coordinator.lease("w2")
+    clock.now = 4
+
+    assert coordinator.is_done()
+    assert coordinator.results()[0]["error"] == "lease expired 2 times"
+
+
+def test_http_round_trip():
+    """Workers can lease and complete URLs over the local HTTP protocol"""
+    coordinator = ScanCoordinator(["a", "b"], options={"runOnly": {"type": "rule", "values": ["label"]}})
+    server = CoordinatorServer(coordinator)
+    client = CoordinatorClient(server.start())
+
+    try:
+        while True:
+            lease = client.lease("http-worker")
+            if lease.get("done"):
+                break
+            assert lease["options"]["runOnly"]["values"] == ["label"]
+            assert client.heartbeat(lease["lease_id"])
+            assert client.complete(lease["lease_id"], make_record(lease["url"]))
+
+        assert client.status() == {"total": 2, "recorded": 2, "pending": 0, "leased": 0}
+    finally:
+        server.stop()
+
+    assert sorted(r["url"] for r in coordinator.results()) == ["a", "b"]
+
+
+def test_http_rejects_bad_requests():
+    """Requests without the shared token get 401, non-object bodies get 400"""
+    server = CoordinatorServer(ScanCoordinator(["a"]), token="secret")
+    base_url = server.start()
+
+    try:
+        with pytest.raises(urllib.error.HTTPError) as error:
+            CoordinatorClient(base_url).lease("intruder")
+        assert error.value.code == 401
+
+        with pytest.raises(urllib.error.HTTPError) as error:
+            CoordinatorClient(base_url, token="secret")._post("/complete", [])
+        assert error.value.code == 400
+
+        assert CoordinatorClient(base_url, token="secret").lease("w")["url"] == "a"
+    finally:
+        server.stop()
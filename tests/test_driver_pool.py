@@ -0,0 +1,85 @@
+# Tests for the WebDriver session pool, with fake sessions (no browser needed)
+
+import atexit
+import threading
+
+import pytest
+
+from src.core import webdriver_manager
+from src.core.webdriver_manager import DriverPool
+
+
+class FakeDriver:
+    """Stand-in for a WebDriver session that can be made to fail its reset"""
+
+    def __init__(self, name):
+        self.name = name
+        self.broken = False
+        self.quit_called = False
+
+    @property
+    def window_handles(self):
+        if self.broken:
+            raise RuntimeError("session is gone")
+        return ["main"]
+
+    def set_window_size(self, width, height):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def fake_setup(monkeypatch):
+    """Replace setup_driver with one that hands out numbered fake sessions"""
+    created = []
+
+    def setup_driver(browser, headless, **kwargs):
+        driver = FakeDriver(f"driver-{len(created)}")
+        created.append(driver)
+        return driver
+
+    monkeypatch.setattr(webdriver_manager, "setup_driver", setup_driver)
+    monkeypatch.setattr(webdriver_manager, "reset_driver_state", lambda driver, size=None: driver.window_handles)
+    return created
+
+
+def test_waiting_lease_replaces_a_discarded_session(fake_setup):
+    """A lease blocked on a full pool starts a new session when a broken one is discarded"""
+    pool = DriverPool(size=1)
+    first = pool.lease()
+    leased = []
+    waiter = threading.Thread(target=lambda: leased.append(pool.lease(timeout=5)))
+    waiter.start()
+
+    first.broken = True
+    pool.release(first)
+    waiter.join(timeout=5)
+
+    assert not waiter.is_alive()
+    assert leased[0] is fake_setup[1]
+    assert first.quit_called
+    pool.close()
+
+
+def test_lease_times_out_when_pool_is_full(fake_setup):
+    """A full pool raises TimeoutError instead of waiting forever"""
+    pool = DriverPool(size=1)
+    pool.lease()
+
+    with pytest.raises(TimeoutError):
+        pool.lease(timeout=0.05)
+    pool.close()
+
+
+def test_close_quits_sessions_and_unregisters(fake_setup, monkeypatch):
+    """close() quits every session and drops the atexit hook"""
+    unregistered = []
+    monkeypatch.setattr(atexit, "unregister", unregistered.append)
+    pool = DriverPool(size=2)
+    pool.warm_up()
+
+    pool.close()
+    assert all(driver.quit_called for driver in fake_setup)
+    assert unregistered == [pool.close]
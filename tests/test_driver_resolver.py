@@ -0,0 +1,65 @@
+# Tests for the driver manifest, with a fake driver binary (no browser needed)
+
+import pytest
+
+from src.core import driver_resolver
+from src.core.driver_resolver import DriverResolver
+
+
+@pytest.fixture
+def resolver(tmp_path, monkeypatch):
+    """Resolver with its manifest in tmp_path and a fake webdriver_manager install"""
+    monkeypatch.delenv("CHROMEDRIVER_PATH", raising=False)
+    monkeypatch.setattr(driver_resolver, "detect_browser_version", lambda browser: "120.0.1")
+
+    binary = tmp_path / "chromedriver"
+    binary.write_bytes(b"driver v120")
+    resolver = DriverResolver(str(tmp_path / "drivers.json"))
+    resolver.installs = []
+
+    def install_driver(browser):
+        resolver.installs.append(browser)
+        return str(binary)
+
+    resolver._install_driver = install_driver
+    resolver.binary = binary
+    return resolver
+
+
+def test_manifest_miss_installs_and_records(resolver):
+    """A browser version missing from the manifest is installed and recorded"""
+    path = resolver.resolve("chrome")
+
+    assert path == str(resolver.binary)
+    assert resolver.installs == ["chrome"]
+    assert resolver.load_manifest()["chrome:120.0.1"]["path"] == path
+
+
+def test_manifest_hit_skips_install(resolver):
+    """A valid manifest entry is used by a new process without installing"""
+    resolver.resolve("chrome")
+
+    fresh = DriverResolver(resolver.manifest_path)
+    fresh._install_driver = resolver._install_driver
+    assert fresh.resolve("chrome") == str(resolver.binary)
+    assert resolver.installs == ["chrome"]
+
+
+def test_changed_binary_invalidates_entry(resolver):
+    """A driver binary that changed on disk is resolved again"""
+    resolver.resolve("chrome")
+    resolver.binary.write_bytes(b"something else entirely")
+
+    fresh = DriverResolver(resolver.manifest_path)
+    fresh._install_driver = resolver._install_driver
+    fresh.resolve("chrome")
+    assert resolver.installs == ["chrome", "chrome"]
+
+
+def test_unknown_browser_version_skips_manifest(resolver, monkeypatch):
+    """Without a browser version the manifest is neither read nor written"""
+    monkeypatch.setattr(driver_resolver, "detect_browser_version", lambda browser: None)
+
+    assert resolver.resolve("chrome") == str(resolver.binary)
+    assert resolver.installs == ["chrome"]
+    assert resolver.load_manifest() == {}
@@ -0,0 +1,78 @@
+# Tests for cross-page violation fingerprinting and the component issue index
+
+import json
+
+from src.core.issue_index import IssueIndex, fingerprint_node
+from src.core.results import ScanResult
+from src.core.scan_engine import write_run_reports
+
+
+HEADER_LINK = {"html": '<a href="/"></a>', "target": ["header > nav > a"], "impact": "serious"}
+
+
+def make_results(url, own_target=None):
+    """Build results with the shared header link and optionally one page-specific image"""
+    violations = [{
+        "id": "link-name", "impact": "serious", "tags": ["wcag2a"], "help": "Links must have discernible text",
+        "description": "", "helpUrl": "", "nodes": [dict(HEADER_LINK)],
+    }]
+    if own_target:
+        violations.append({
+            "id": "image-alt", "impact": "critical", "tags": ["wcag2a"], "help": "Images must have alternate text",
+            "description": "", "helpUrl": "", "nodes": [{"html": "<img>", "target": [own_target], "impact": "critical"}],
+        })
+    return {"url": url, "violations": violations, "incomplete": [], "passes": [], "inapplicable": []}
+
+
+def test_fingerprint_ignores_selector_spacing():
+    """The same element written with different spacing gets one fingerprint"""
+    first = fingerprint_node("link-name", {"target": ["header>nav > a"]})
+    second = fingerprint_node("link-name", {"target": ["header >  nav>a"]})
+
+    assert first == second
+    assert first != fingerprint_node("button-name", {"target": ["header > nav > a"]})
+
+
+def test_shared_issue_is_stored_once():
+    """A header violation on every page becomes one issue listing the pages"""
+    index = IssueIndex()
+    for page in range(3):
+        index.add(f"https://example.com/{page}", make_results(f"https://example.com/{page}", f"#img{page}"))
+    # ScanResult pages are indexed the same way as dictionaries
+    index.add("https://example.com/3", ScanResult.from_axe(make_results("https://example.com/3")))
+
+    shared = index.shared_issues()
+    assert len(index) == 4
+    assert len(shared) == 1
+    assert shared[0].rule.id == "link-name"
+    assert shared[0].pages == [f"https://example.com/{page}" for page in range(4)]
+    assert index.summary() == {"uniqueIssues": 4, "sharedIssues": 1, "sharedOccurrences": 4}
+
+
+def test_page_results_keep_only_own_violations():
+    """Shared nodes are taken out of a page's results and counted"""
+    index = IssueIndex()
+    pages = {url: make_results(url, f"#{name}") for name, url in (("a", "https://x/a"), ("b", "https://x/b"))}
+    for url, results in pages.items():
+        index.add(url, results)
+
+    own, shared = index.page_results(pages["https://x/a"])
+
+    assert shared == 1
+    assert [v["id"] for v in own["violations"]] == ["image-alt"]
+
+
+def test_run_reports_list_shared_issues_once(tmp_path):
+    """write_run_reports writes the shared issue to one report and counts it on the dashboard"""
+    records = [{"url": f"https://example.com/{page}", "results": make_results(f"https://example.com/{page}"),
+                "error": None} for page in range(5)]
+
+    summary = write_run_reports(records, str(tmp_path))
+
+    assert summary["Unique issues"] == 1
+    assert summary["Shared issues"] == 1
+    issues = json.loads((tmp_path / "component_issues.json").read_text())
+    assert len(issues) == 1 and len(issues[0]["pages"]) == 5
+    page_report = (tmp_path / "accessibility_example.com_0.html").read_text()
+    assert "No violations found!" in page_report
+    assert "component_issues.html" in page_report
@@ -0,0 +1,125 @@
+# Tests for the manual checks that run on a DOM snapshot (no browser needed)
+
+import dataclasses
+import pickle
+
+import pytest
+
+from src.core.dom_snapshot import DomSnapshot, ElementLocator
+from src.core.page_checks import CHECKS, register_check, run_checks
+
+
+def make_snapshot():
+    """Build a snapshot like DOM_SNAPSHOT_SCRIPT returns for a small page"""
+    return DomSnapshot.from_script({
+        "url": "file:///page.html",
+        "title": "Page",
+        "images": [
+            [False, None, "body > img:nth-child(1)", '<img src="a.png">'],
+            [True, "", "body > img:nth-child(2)", '<img src="b.png" alt="">'],
+            [True, "Photo", "body > img:nth-child(3)", '<img src="c.png" alt="Photo">'],
+            [True, "Our team", "body > img:nth-child(4)", '<img src="d.png" alt="Our team">'],
+        ],
+        "fields": [
+            ["name", "label", "Name", "#name", '<input id="name">'],
+            [None, "aria-label", "Search", "body > input:nth-child(5)", '<input aria-label="Search">'],
+            ["email", None, "", "#email", '<input id="email">'],
+            [None, None, "", "body > input:nth-child(7)", "<input>"],
+        ],
+        "headings": [[2, "Intro", "body > h2"], [4, "Details", "body > h4"]],
+        "links": [["#top", "", "body > a", '<a href="#top"></a>']],
+        "tables": [],
+    })
+
+
+def test_image_alt_text_check():
+    """Missing and generic alt texts are problems, empty alt is only counted"""
+    results, _ = run_checks(make_snapshot(), ["image_alt_text"])
+    results = results["image_alt_text"]
+
+    assert results["total_images"] == 4
+    assert results["missing_alt"] == 2
+    assert results["empty_alt"] == 1
+    assert results["images_with_valid_alt"] == 1
+    assert results["problem_images"][1] == {
+        "selector": "body > img:nth-child(3)",
+        "issue": "Generic alt text: photo",
+        "html": '<img src="c.png" alt="Photo">',
+        "element": ElementLocator("body > img:nth-child(3)", '<img src="c.png" alt="Photo">')
+    }
+
+
+def test_whitespace_alt_is_a_problem():
+    """Whitespace-only alt is reported rather than taken as decorative, and " Photo " is generic"""
+    snapshot = DomSnapshot.from_script({"images": [
+        [True, "  ", "body > img:nth-child(1)", '<img alt="  ">'],
+        [True, " Photo ", "body > img:nth-child(2)", '<img alt=" Photo ">'],
+        [True, "", "body > img:nth-child(3)", '<img alt="">'],
+    ]})
+    results, _ = run_checks(snapshot, ["image_alt_text"])
+
+    assert results["image_alt_text"]["empty_alt"] == 1
+    assert results["image_alt_text"]["missing_alt"] == 2
+    assert [p["issue"] for p in results["image_alt_text"]["problem_images"]] == [
+        "Whitespace-only alt text", "Generic alt text: photo"
+    ]
+
+
+def test_form_labels_and_headings():
+    """Unlabelled fields and heading jumps are reported from the snapshot alone"""
+    results, timings = run_checks(make_snapshot())
+
+    assert results["form_labels"]["fields_with_labels"] == 2
+    assert [p["issue"] for p in results["form_labels"]["problem_fields"]] == [
+        "No label found for field with ID 'email'", "No ID attribute for label association"
+    ]
+    assert results["heading_structure"]["issues"] == [
+        "First heading is not h1, found h2", "Heading level jumped from h2 to h4"
+    ]
+    assert set(timings) >= {"image_alt_text", "form_labels", "heading_structure"}
+
+
+def test_registered_plugin_runs_on_snapshot():
+    """A check added with register_check runs with the built-in ones"""
+    @register_check("empty_links")
+    def check_empty_links(snapshot):
+        return {"empty_links": [link.selector for link in snapshot.links if not link.text]}
+
+    try:
+        results, timings = run_checks(make_snapshot())
+        assert results["empty_links"] == {"empty_links": ["body > a"]}
+        assert "empty_links" in timings
+    finally:
+        del CHECKS["empty_links"]
+
+
+def test_failing_check_does_not_stop_the_others():
+    """An exception in one check becomes its error entry"""
+    @register_check("broken")
+    def check_broken(snapshot):
+        raise RuntimeError("boom")
+
+    try:
+        results, _ = run_checks(make_snapshot())
+        assert results["broken"] == {"error": "Error in check broken: boom"}
+        assert "error" not in results["heading_structure"]
+    finally:
+        del CHECKS["broken"]
+
+
+def test_snapshot_is_immutable_and_picklable():
+    """Snapshots can't be changed by a check and can be sent to other processes"""
+    snapshot = make_snapshot()
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        snapshot.images[0].alt = "changed"
+    assert pickle.loads(pickle.dumps(snapshot)) == snapshot
+
+
+def test_check_results_are_picklable():
+    """Problem entries hold locators, not live elements, so results can be shipped between processes"""
+    results, _ = run_checks(make_snapshot())
+
+    copied = pickle.loads(pickle.dumps(results))
+    assert copied == results
+    assert copied["form_labels"]["problem_fields"][0]["element"].selector == "#email"
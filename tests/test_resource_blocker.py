@@ -0,0 +1,109 @@
+# Tests for the resource blocking counters, with a fake performance log (no browser needed)
+
+import json
+
+from src.core.resource_blocker import (MAX_PENDING_EVENTS, ResourceBlocker, ThirdPartyInterceptor, is_third_party,
+                                        registrable_domain)
+
+
+def log_entry(method, webview, **params):
+    """Build a performance log entry the way chromedriver returns it"""
+    return {"message": json.dumps({"message": {"method": method, "params": params}, "webview": webview})}
+
+
+class FakeDriver:
+    """Driver with a session-wide performance log that is emptied on every read"""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.current_window_handle = "tab-a"
+
+    def get_log(self, log_type):
+        entries, self.entries = self.entries, []
+        return entries
+
+
+def test_counts_are_kept_per_tab():
+    """Each tab only counts its own blocked requests and bytes"""
+    driver = FakeDriver([
+        log_entry("Network.loadingFailed", "tab-a", blockedReason="inspector", type="Image"),
+        log_entry("Network.loadingFailed", "tab-b", blockedReason="inspector", type="Font"),
+        log_entry("Network.loadingFailed", "tab-a", errorText="net::ERR_FAILED", type="Script"),
+        log_entry("Network.loadingFinished", "tab-a", encodedDataLength=1000),
+        log_entry("Network.loadingFinished", "tab-b", encodedDataLength=250),
+        log_entry("Network.requestWillBeSent", "tab-a"),
+    ])
+    blocker = ResourceBlocker(["media", "fonts"])
+
+    first = blocker.collect(driver)
+    assert first == {"blockedRequests": 1, "transferredBytes": 1000, "blockedByType": {"Image": 1}}
+
+    # tab-b's events were read with tab-a's and are still counted for tab-b
+    driver.current_window_handle = "CDwindow-tab-b"
+    second = blocker.collect(driver)
+    assert second == {"blockedRequests": 1, "transferredBytes": 250, "blockedByType": {"Font": 1}}
+    assert blocker.totals["blockedRequests"] == 2
+
+
+def test_ads_social_preset_affects_widget_rules():
+    """The ads-social preset flags rules that depend on injected widgets"""
+    blocker = ResourceBlocker(["ads-social"])
+
+    assert "*doubleclick.net*" in blocker.patterns
+    assert "frame-title" in blocker.affected_rules
+
+
+def test_third_party_is_decided_by_registrable_domain():
+    """Subdomains of the page's site load, other sites and CDNs don't"""
+    page = "https://www.shop.example.co.uk/basket"
+
+    assert registrable_domain("www.shop.example.co.uk") == "example.co.uk"
+    assert not is_third_party("https://static.example.co.uk/app.js", page)
+    assert is_third_party("https://cdn.jsdelivr.net/lib.js", page)
+    assert is_third_party("https://example.com/font.woff2", page)
+    assert not is_third_party("data:image/png;base64,AAAA", page)
+    assert is_third_party("https://example.com/logo.png", "file:///tmp/page.html")
+
+
+def test_interceptor_blocks_other_sites_of_the_current_page():
+    """The main-frame document sets the site, iframe documents from other sites are blocked"""
+    interceptor = ThirdPartyInterceptor("ws://unused", "119", "tab-a")
+
+    assert not interceptor.should_block("https://example.com/", "Document", "tab-a")
+    assert not interceptor.should_block("https://img.example.com/a.png", "Image", "tab-a")
+    assert interceptor.should_block("https://ads.example.net/frame", "Document", "frame-1")
+    assert interceptor.should_block("https://fonts.gstatic.com/a.woff2", "Font", "tab-a")
+
+    # A new top-level page moves the site along
+    assert not interceptor.should_block("https://example.net/", "Document", "tab-a")
+    assert not interceptor.should_block("https://ads.example.net/a.js", "Script", "tab-a")
+
+    assert interceptor.take_counts() == {"Document": 1, "Font": 1}
+    assert interceptor.take_counts() == {}
+
+
+def test_collect_adds_intercepted_requests_of_the_tab():
+    """Requests failed by the tab's interceptor are counted with the blocked URL patterns"""
+    driver = FakeDriver([log_entry("Network.loadingFailed", "tab-a", blockedReason="inspector", type="Image")])
+    blocker = ResourceBlocker(["third-party", "media"])
+    interceptor = ThirdPartyInterceptor("ws://unused", "119", "tab-a")
+    blocker._interceptors["tab-a"] = interceptor
+    interceptor.should_block("https://example.com/", "Document", "tab-a")
+    interceptor.should_block("https://cdn.example.net/a.js", "Script", "tab-a")
+
+    page = blocker.collect(driver)
+    assert page == {"blockedRequests": 2, "transferredBytes": 0, "blockedByType": {"Image": 1, "Script": 1}}
+
+
+def test_events_of_uncollected_tabs_are_dropped():
+    """Closed tabs lose their buffered events and each tab's buffer is capped"""
+    entries = [log_entry("Network.loadingFinished", "tab-b", encodedDataLength=1)
+               for _ in range(MAX_PENDING_EVENTS + 10)]
+    driver = FakeDriver(entries + [log_entry("Network.loadingFinished", "tab-c", encodedDataLength=1)])
+    blocker = ResourceBlocker(["media"])
+
+    blocker.collect(driver)
+    assert len(blocker._pending_events["tab-b"]) == MAX_PENDING_EVENTS
+
+    blocker.detach("CDwindow-tab-c")
+    assert "tab-c" not in blocker._pending_events
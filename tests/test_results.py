@@ -0,0 +1,116 @@
+# Tests for the typed scan result model (no browser needed)
+
+import pickle
+
+from src.core.results import Impact, Node, ScanResult, Violation
+from src.utils.report_utils import format_violation_for_report
+
+
+def make_raw_results(url="https://example.com/"):
+    """Build axe results with one violation and one passed rule"""
+    return {
+        "url": url,
+        "timestamp": "2024-01-01T00:00:00.000Z",
+        "testEngine": {"name": "axe-core", "version": "3.1.1"},
+        "violations": [{
+            "id": "image-alt",
+            "impact": "critical",
+            "tags": ["wcag2a", "wcag111"],
+            "description": "Ensures <img> elements have alternate text",
+            "help": "Images must have alternate text",
+            "helpUrl": "https://dequeuniversity.com/rules/axe/3.1/image-alt",
+            "nodes": [{
+                "html": '<img src="logo.png">',
+                "target": ["#frame", "img"],
+                "impact": "critical",
+                "failureSummary": "Fix any of the following:\n  Element does not have an alt attribute",
+                "any": [{"id": "has-alt", "impact": "critical", "message": "Element does not have an alt attribute",
+                         "data": None, "relatedNodes": []}],
+                "all": [],
+                "none": [],
+            }],
+        }],
+        "incomplete": [],
+        "passes": [{
+            "id": "document-title",
+            "impact": None,
+            "tags": ["wcag2a"],
+            "description": "Ensures each HTML document contains a non-empty <title> element",
+            "help": "Documents must have <title> element",
+            "helpUrl": "https://dequeuniversity.com/rules/axe/3.1/document-title",
+            "nodes": [{"html": "<html>", "target": ["html"], "impact": None, "failureSummary": None}],
+        }],
+        "inapplicable": [],
+        "scanStats": {"elapsed": 1.5},
+        "partial": True,
+    }
+
+
+def test_round_trip_keeps_violation_details():
+    """Converting to the model and back keeps what the reports use"""
+    raw = make_raw_results()
+    back = ScanResult.from_axe(raw).to_axe()
+
+    violation = back["violations"][0]
+    assert violation["id"] == "image-alt"
+    assert violation["impact"] == "critical"
+    assert violation["tags"] == ["wcag2a", "wcag111"]
+    assert violation["nodes"][0]["target"] == ["#frame", "img"]
+    assert violation["nodes"][0]["failureSummary"] == raw["violations"][0]["nodes"][0]["failureSummary"]
+    # Check messages are kept, their data and related nodes are not
+    assert violation["nodes"][0]["any"] == [
+        {"id": "has-alt", "impact": "critical", "message": "Element does not have an alt attribute"}
+    ]
+    assert violation["nodes"][0]["none"] == []
+    assert back["scanStats"] == {"elapsed": 1.5}
+    assert back["partial"] is True
+    assert "testEngine" not in back
+
+    # Passed rules only keep their node count
+    assert back["passes"][0]["nodes"] == []
+    assert back["passes"][0]["nodeCount"] == 1
+
+
+def test_rule_texts_are_shared_between_pages():
+    """The same rule on two pages points at one RuleInfo"""
+    first = ScanResult.from_axe(make_raw_results("https://example.com/a"))
+    raw = make_raw_results("https://example.com/b")
+    # Parsed JSON gives every page its own string objects
+    node = raw["violations"][0]["nodes"][0]
+    node["failureSummary"] = "".join(list(node["failureSummary"]))
+    second = ScanResult.from_axe(raw)
+
+    assert first.violations[0].rule is second.violations[0].rule
+    assert first.violations[0].nodes[0].failure_summary is second.violations[0].nodes[0].failure_summary
+
+
+def test_results_can_be_pickled():
+    """Results survive a pickle round trip and keep sharing rule texts"""
+    result = ScanResult.from_axe(make_raw_results())
+
+    copied = pickle.loads(pickle.dumps(result))
+    assert copied == result
+    assert copied.violations[0].rule is result.violations[0].rule
+
+
+def test_node_html_is_truncated():
+    """Long node HTML is cut to the configured length"""
+    node = Node.from_axe({"html": "x" * 1000, "target": ["div"]}, max_html_length=50)
+
+    assert node.html == "x" * 50 + "..."
+    assert node.impact is Impact.NONE
+
+
+def test_impacts_compare_by_severity():
+    """Impact levels can be compared and filtered"""
+    assert Impact.from_axe("critical") > Impact.from_axe("serious") > Impact.MINOR
+    assert Impact.from_axe(None).to_axe() is None
+
+
+def test_report_accepts_violation_objects():
+    """format_violation_for_report gives the same HTML for a dict and a Violation"""
+    raw = make_raw_results()["violations"][0]
+    violation = Violation.from_axe(raw)
+
+    assert format_violation_for_report(violation) == format_violation_for_report(violation.to_axe())
+    assert "image-alt" in format_violation_for_report(violation)
@@ -0,0 +1,95 @@
+# Tests for the on-disk scan result cache (no browser needed)
+
+import os
+
+from src.core.accessibility_scanner import AccessibilityScanner
+from src.core.resource_blocker import ResourceBlocker
+from src.core.scan_cache import ScanCache, make_cache_key
+
+
+FINGERPRINT = {"hash": "0" * 28, "length": 100, "axeVersion": "3.1.1", "viewport": [1366, 768]}
+
+
+def make_results(size=0):
+    """Build minimal axe-shaped results, padded to roughly `size` bytes"""
+    return {"violations": [{"id": "image-alt", "nodes": [{"html": "x" * size}]}], "passes": []}
+
+
+def test_hit_returns_stored_results(tmp_path):
+    """Stored results come back for the same key and lookups are counted"""
+    cache = ScanCache(tmp_path)
+    key = make_cache_key(FINGERPRINT, "body", {"runOnly": ["wcag2a"]})
+
+    assert cache.get(key) is None
+    cache.put(key, make_results())
+    assert cache.get(key) == make_results()
+
+    summary = cache.summary()
+    assert (summary["hits"], summary["misses"], summary["stores"]) == (1, 1, 1)
+    assert summary["hitRate"] == 0.5
+
+
+def test_key_changes_with_page_and_options():
+    """A different DOM, axe version, viewport or option gives a different key"""
+    key = make_cache_key(FINGERPRINT, "body", {"runOnly": ["wcag2a"]})
+
+    assert key == make_cache_key(dict(FINGERPRINT), "body", {"runOnly": ["wcag2a"]})
+    assert key != make_cache_key(dict(FINGERPRINT, hash="1" * 28), "body", {"runOnly": ["wcag2a"]})
+    assert key != make_cache_key(dict(FINGERPRINT, axeVersion="4.8.0"), "body", {"runOnly": ["wcag2a"]})
+    assert key != make_cache_key(dict(FINGERPRINT, viewport=[375, 667]), "body", {"runOnly": ["wcag2a"]})
+    assert key != make_cache_key(FINGERPRINT, "body", {"runOnly": ["wcag2aa"]})
+    assert key != make_cache_key(FINGERPRINT, "main", {"runOnly": ["wcag2a"]})
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    """Going over the size cap removes the entries that were used longest ago"""
+    cache = ScanCache(tmp_path, max_bytes=2500)
+
+    for i, key in enumerate(["a", "b"]):
+        cache.put(key, make_results(1000))
+        # Make the write order visible in file modification times
+        os.utime(tmp_path / f"{key}.json", (i, i))
+
+    # Reading "a" makes "b" the least recently used entry
+    assert cache.get("a") is not None
+    cache.put("c", make_results(1000))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.summary()["evictions"] == 1
+
+
+def test_cache_is_shared_through_the_directory(tmp_path):
+    """A second cache on the same directory sees the first one's entries"""
+    ScanCache(tmp_path).put("k", make_results())
+
+    assert ScanCache(tmp_path).get("k") == make_results()
+
+
+class FingerprintDriver:
+    """Driver that only answers the page fingerprint script"""
+
+    current_url = "https://example.com/"
+
+    def execute_script(self, script, *args):
+        return FINGERPRINT
+
+
+def test_results_with_blocking_are_not_served_to_other_runs(tmp_path):
+    """A scan with blocked fonts and media has its own key, so an unblocked run misses"""
+    cache = ScanCache(tmp_path)
+    blocked_driver = FingerprintDriver()
+    blocked_driver.resource_blocker = ResourceBlocker(["fonts", "media"])
+
+    blocked_scanner = AccessibilityScanner(blocked_driver, cache=cache)
+    blocked_key, _ = blocked_scanner._cache_lookup("body", {"runOnly": ["wcag2a"]})
+    blocked_scanner._cache_store(blocked_key, dict(make_results(), scanStats={}))
+
+    unblocked_key, results = AccessibilityScanner(FingerprintDriver(), cache=cache)._cache_lookup(
+        "body", {"runOnly": ["wcag2a"]})
+    assert results is None
+    assert unblocked_key != blocked_key
+
+    _, results = AccessibilityScanner(blocked_driver, cache=cache)._cache_lookup("body", {"runOnly": ["wcag2a"]})
+    assert results["violations"] == make_results()["violations"]
@@ -0,0 +1,109 @@
+# Tests for the process-pool scan engine, with stub scans instead of browsers
+
+import multiprocessing
+import os
+from collections import Counter
+
+import pytest
+
+from src.core import scan_engine
+from src.core.accessibility_scanner import AccessibilityScanner
+from src.core.results import ScanResult
+from src.core.scan_engine import aggregate_rule_timings, iter_parallel_scan, write_run_reports
+
+
+class FakeDriver:
+    """Stand-in for the browser a worker starts"""
+
+    def set_window_size(self, width, height):
+        pass
+
+    def quit(self):
+        pass
+
+
+def fake_scan_page(driver, url, context=None, options=None, cache=None):
+    """Scan stub that kills its worker process on the "crash" page"""
+    if url.endswith("crash"):
+        os._exit(1)
+    return {"url": url, "results": {"violations": []}, "error": None, "elapsed": 0.0}
+
+
+@pytest.fixture
+def fake_workers(monkeypatch):
+    """Run workers with stub scans (forked, so they keep the monkeypatches)"""
+    if "fork" not in multiprocessing.get_all_start_methods():
+        pytest.skip("needs the fork start method")
+    fork = multiprocessing.get_context("fork")
+    monkeypatch.setattr(scan_engine.multiprocessing, "get_context", lambda method: fork)
+    monkeypatch.setattr(scan_engine, "setup_driver", lambda browser, headless, **kwargs: FakeDriver())
+    monkeypatch.setattr(scan_engine, "scan_page", fake_scan_page)
+
+
+def test_every_url_gets_one_record(fake_workers):
+    """Two workers share the queue and every page comes back exactly once"""
+    urls = [f"https://example.com/{i}" for i in range(20)]
+
+    records = list(iter_parallel_scan(urls, workers=2))
+
+    assert Counter(record["url"] for record in records) == Counter(urls)
+    assert not any(record["error"] for record in records)
+
+
+def test_crashed_worker_pages_are_reported_once(fake_workers):
+    """A worker that dies mid-page is noticed and its page is recorded as failed"""
+    # The crash page goes first, so the dying worker has no other results still buffered
+    urls = ["https://example.com/crash"] + [f"https://example.com/{i}" for i in range(10)]
+
+    records = list(iter_parallel_scan(urls, workers=2))
+
+    assert Counter(record["url"] for record in records) == Counter(urls)
+    failed = [record for record in records if record["error"]]
+    assert [record["url"] for record in failed] == ["https://example.com/crash"]
+    assert failed[0]["error"] == "not scanned (worker failed)"
+
+
+def timed_results(url, timings):
+    """Build empty axe results for a page with per-rule timings in scanStats"""
+    return {"url": url, "violations": [], "passes": [], "incomplete": [], "inapplicable": [],
+            "scanStats": {"ruleTimings": timings}}
+
+
+def timed_records():
+    """Three pages: two as raw dictionaries, one as a ScanResult, and one without timings"""
+    timings = {"a": {"color-contrast": 0.5, "label": 0.01}, "b": {"color-contrast": 1.5}, "c": {}}
+    records = []
+    for page, page_timings in timings.items():
+        url = f"https://example.com/{page}"
+        records.append({"url": url, "results": timed_results(url, page_timings), "error": None})
+    records[1]["results"] = ScanResult.from_axe(records[1]["results"])
+    return records
+
+
+def test_rule_timings_add_up_over_dict_and_scan_result_records():
+    """Timings from both result shapes are summed per rule, slowest total first"""
+    timings = aggregate_rule_timings(timed_records())
+
+    assert [entry["rule"] for entry in timings] == ["color-contrast", "label"]
+    assert timings[0] == {"rule": "color-contrast", "total": 2.0, "max": 1.5, "pages": 2, "mean": 1.0}
+    assert timings[1]["pages"] == 1
+
+
+def test_scanner_rule_timings_accept_both_result_shapes():
+    """get_rule_timings reads raw results and ScanResults alike"""
+    scanner = AccessibilityScanner(FakeDriver())
+    raw = timed_results("https://example.com/", {"label": 0.01, "color-contrast": 0.5})
+
+    assert scanner.get_rule_timings(raw) == [("color-contrast", 0.5), ("label", 0.01)]
+    assert scanner.get_rule_timings(ScanResult.from_axe(raw)) == [("color-contrast", 0.5), ("label", 0.01)]
+    assert scanner.get_rule_timings(None) == []
+
+
+def test_dashboard_lists_the_slowest_rules(tmp_path):
+    """write_run_reports puts the aggregated timings in the dashboard's Slowest Rules table"""
+    write_run_reports(timed_records(), str(tmp_path))
+
+    dashboard = (tmp_path / "dashboard.html").read_text()
+    assert "<h2>Slowest Rules</h2>" in dashboard
+    assert "<td>color-contrast</td>" in dashboard and "<td>2.00s</td>" in dashboard
+    assert dashboard.index("<td>color-contrast</td>") < dashboard.index("<td>label</td>")
@@ -0,0 +1,100 @@
+# Tests for the browser-free static pre-scanner, run on the fixture pages
+
+from src.core.page_checks import CHECKS
+from src.core.static_scanner import StaticPageParser, scan_files, scan_html, triage
+from tests.sites.test_sites import TEST_PAGES
+
+
+def test_missing_alt_page():
+    """Missing and generic alt texts are found, empty alt is only counted"""
+    results = scan_html(TEST_PAGES["missing_alt.html"])["image_alt_text"]
+
+    assert results["total_images"] == 5
+    assert results["missing_alt"] == 2
+    assert results["empty_alt"] == 2
+    assert results["images_with_valid_alt"] == 1
+    assert [p["issue"] for p in results["problem_images"]] == [
+        "Missing alt attribute", "Generic alt text: image"
+    ]
+
+
+def test_form_labels_page():
+    """Fields without a label are found, fields with label[for] pass"""
+    results = scan_html(TEST_PAGES["form_labels.html"])["form_labels"]
+
+    assert results["total_form_fields"] == 6
+    assert results["fields_without_labels"] == 3
+    assert results["fields_with_labels"] == 3
+    assert results["problem_fields"][0]["html"].startswith('<input type="text"')
+
+
+def test_other_ways_of_labelling():
+    """Wrapping labels and ARIA labels count, hidden inputs are skipped"""
+    html = """
+    <label>Name <input name="name"></label>
+    <input aria-label="Search" name="q">
+    <span id="hint">Email</span><input aria-labelledby="hint" name="email">
+    <input aria-labelledby="missing" name="phone">
+    <input type="hidden" name="token">
+    """
+    results = scan_html(html)["form_labels"]
+
+    assert results["total_form_fields"] == 4
+    assert results["fields_without_labels"] == 1
+
+
+def test_snapshot_matches_the_browser_snapshot():
+    """Selectors, label text and whitespace-only alt come out like DOM_SNAPSHOT_SCRIPT's"""
+    html = """<html><body>
+    <h1 id="top">Sign <b>up</b></h1>
+    <label>Name <input name="name"> <input name="second"></label>
+    <img alt="  "><img alt=" Photo ">
+    <input aria-labelledby="top">
+    </body></html>"""
+    parser = StaticPageParser()
+    parser.feed(html)
+    parser.close()
+    snapshot = parser.snapshot()
+
+    assert snapshot.headings[0].text == "Sign up"
+    assert [(field.label_source, field.label) for field in snapshot.fields] == [
+        ("label", "Name"), (None, ""), ("aria-labelledby", "Sign up")
+    ]
+    assert snapshot.images[0].selector == "html > body:nth-child(1) > img:nth-child(3)"
+
+    results = scan_html(html)["image_alt_text"]
+    assert results["empty_alt"] == 0
+    assert [(p["issue"], p["line"]) for p in results["problem_images"]] == [
+        ("Whitespace-only alt text", 4), ("Generic alt text: photo", 4)
+    ]
+
+
+def test_registered_checks_run_on_static_pages(monkeypatch):
+    """A check added to the registry runs in the static scan too"""
+    monkeypatch.setitem(CHECKS, "link_count", lambda snapshot: {"total_links": len(snapshot.links)})
+
+    results = scan_html('<a href="/">Home</a><img alt="Logo">')
+
+    assert results["link_count"] == {"total_links": 1}
+
+
+def test_heading_structure():
+    """Skipped heading levels and a missing h1 are reported"""
+    results = scan_html("<h2>Intro</h2><h4>Details</h4>")["heading_structure"]
+
+    assert not results["has_h1"]
+    assert not results["proper_sequence"]
+    assert results["issues"] == ["First heading is not h1, found h2", "Heading level jumped from h2 to h4"]
+
+
+def test_triage_picks_pages_with_issues(tmp_path):
+    """Only fixture pages with static issues are picked, most issues first"""
+    paths = []
+    for name, html in TEST_PAGES.items():
+        path = tmp_path / name
+        path.write_text(html)
+        paths.append(str(path))
+
+    results = scan_files(paths, workers=1)
+
+    assert triage(results) == [str(tmp_path / "form_labels.html"), str(tmp_path / "missing_alt.html")]